@@ -1,31 +1,114 @@
-from typing import List, Callable, Optional
+from typing import List, Callable, Iterable, Optional
+import math
+import numpy as np
 from ..models import QuantumCircuit, QuantumGate
 
+def basis_state_bits(num_qubits: int) -> np.ndarray:
+    """
+    Bits of every basis state as a ``(2 ** n, n)`` uint8 array.
+
+    Row ``i`` holds the bits of state ``i`` with qubit 0 (the most significant bit) first.
+    """
+    states = np.arange(2 ** num_qubits, dtype=np.int64)
+    shifts = np.arange(num_qubits - 1, -1, -1, dtype=np.int64)
+    return ((states[:, None] >> shifts) & 1).astype(np.uint8)
+
+def find_marked_states(
+    num_qubits: int,
+    oracle_function: Callable,
+    vectorized: bool = False
+) -> np.ndarray:
+    """
+    Evaluate an oracle predicate once over all basis states.
+
+    Args:
+        num_qubits: Number of qubits in the search space
+        oracle_function: Predicate marking target states. By default it is
+            called with a list of bits per state; with ``vectorized`` it is
+            called once with the ``(2 ** n, n)`` bit array and must return a
+            boolean mask of length ``2 ** n``
+        vectorized: Whether the predicate works on the whole bit array
+
+    Returns:
+        np.ndarray: Sorted indices of the marked basis states
+    """
+    bits = basis_state_bits(num_qubits)
+    if vectorized:
+        mask = np.asarray(oracle_function(bits), dtype=bool)
+        if mask.shape != (len(bits),):
+            raise ValueError(f"Vectorized oracle must return {len(bits)} booleans, got shape {mask.shape}")
+    else:
+        mask = np.fromiter((bool(oracle_function(row)) for row in bits.tolist()), dtype=bool, count=len(bits))
+    return np.flatnonzero(mask)
+
+def _phase_flip_gates(num_qubits: int, state: int, step: int) -> List[QuantumGate]:
+    """X-conjugated multi-controlled Z that flips the phase of one basis state."""
+    zeros = [qubit for qubit in range(num_qubits) if not (state >> (num_qubits - 1 - qubit)) & 1]
+    target = num_qubits - 1
+    flips = [QuantumGate(type='X', position={'qubit': qubit, 'step': step}) for qubit in zeros]
+    mcz = QuantumGate(
+        type='MCZ',
+        position={'qubit': target, 'step': step + 1},
+        controls=list(range(target))
+    )
+    unflips = [QuantumGate(type='X', position={'qubit': qubit, 'step': step + 2}) for qubit in zeros]
+    return flips + [mcz] + unflips
+
 def create_grover_circuit(
     num_qubits: int,
-    oracle_function: Callable[[List[int]], bool],
-    num_iterations: Optional[int] = None
+    oracle_function: Optional[Callable] = None,
+    num_iterations: Optional[int] = None,
+    marked_states: Optional[Iterable[int]] = None,
+    vectorized: bool = False
 ) -> QuantumCircuit:
     """
     Create a Grover's algorithm circuit for searching marked states.
 
+    The marked set is computed once, either from ``marked_states`` or by
+    evaluating the oracle predicate over all basis states, and the resulting
+    phase oracle is reused for every iteration.
+
     Args:
         num_qubits: Number of qubits in the circuit
         oracle_function: Function that marks target states (returns True for marked states)
-        num_iterations: Optional number of Grover iterations (if None, uses optimal π/4√N)
+        num_iterations: Optional number of Grover iterations (if None, uses optimal π/4√(N/M))
+        marked_states: Basis state indices to mark, instead of an oracle function
+        vectorized: Whether oracle_function takes the array of all basis states at once
 
     Returns:
         QuantumCircuit: Circuit implementing Grover's algorithm
     """
+    if marked_states is not None:
+        marked = np.unique(np.fromiter(marked_states, dtype=np.int64))
+        if len(marked) and (marked[0] < 0 or marked[-1] >= 2 ** num_qubits):
+            raise ValueError(f"Marked states must be between 0 and {2 ** num_qubits - 1}")
+    elif oracle_function is not None:
+        marked = find_marked_states(num_qubits, oracle_function, vectorized)
+    else:
+        raise ValueError("Either oracle_function or marked_states is required")
+
     # Calculate optimal number of iterations if not specified
     if num_iterations is None:
         N = 2 ** num_qubits
-        num_iterations = int(3.14159 * (N ** 0.5) / 4)
+        num_iterations = int(math.pi / 4 * math.sqrt(N / max(len(marked), 1)))
+
+    # Oracle gates for one iteration, shifted to each iteration's steps below
+    oracle = []
+    for index, state in enumerate(marked.tolist()):
+        oracle += _phase_flip_gates(num_qubits, state, 3 * index)
+    oracle_steps = 3 * len(marked)
+    # Diffusion: H, X, MCZ, X, H
+    diffusion_steps = 5
+    diffusion = (
+        [QuantumGate(type='H', position={'qubit': qubit, 'step': 0}) for qubit in range(num_qubits)]
+        + _phase_flip_gates(num_qubits, 0, 1)
+        + [QuantumGate(type='H', position={'qubit': qubit, 'step': 4}) for qubit in range(num_qubits)]
+    )
 
     circuit = QuantumCircuit(
         gates=[],
         qubits=num_qubits,
-        steps=1 + 3 * num_iterations,  # Initial H gates + iterations * (oracle + diffusion)
+        steps=2 + num_iterations * (oracle_steps + diffusion_steps),  # Initial H gates + iterations * (oracle + diffusion) + measurement
         name="Grover Search",
         description=f"Grover's algorithm with {num_iterations} iterations on {num_qubits} qubits"
     )
@@ -39,41 +122,12 @@ def create_grover_circuit(
 
     current_step = 1
     for _ in range(num_iterations):
-        # Apply oracle (implemented as controlled-Z gates based on oracle function)
-        for state in range(2 ** num_qubits):
-            if oracle_function([int(x) for x in format(state, f'0{num_qubits}b')]):
-                # Mark state with phase flip (equivalent to controlled-Z)
-                circuit.gates.append(QuantumGate(
-                    type='X',
-                    position={'qubit': num_qubits - 1, 'step': current_step}
-                ))
-
-        current_step += 1
-
-        # Diffusion operator (Grover's diffusion)
-        for qubit in range(num_qubits):
-            # H gates before diffusion
-            circuit.gates.append(QuantumGate(
-                type='H',
-                position={'qubit': qubit, 'step': current_step}
-            ))
-
-        # Multi-controlled X gate implemented with CNOTs
-        for qubit in range(num_qubits - 1):
-            circuit.gates.append(QuantumGate(
-                type='CNOT',
-                position={'qubit': qubit + 1, 'step': current_step + 1},
-                control=qubit
-            ))
-
-        for qubit in range(num_qubits):
-            # H gates after diffusion
-            circuit.gates.append(QuantumGate(
-                type='H',
-                position={'qubit': qubit, 'step': current_step + 2}
-            ))
-
-        current_step += 3
+        for block, steps in ((oracle, oracle_steps), (diffusion, diffusion_steps)):
+            for gate in block:
+                circuit.gates.append(gate.model_copy(update={
+                    'position': {'qubit': gate.position['qubit'], 'step': gate.position['step'] + current_step}
+                }))
+            current_step += steps
 
     # Add final measurements
     for qubit in range(num_qubits):
@@ -2,54 +2,75 @@ from typing import List, Optional
 from ..models import QuantumCircuit, QuantumGate
 import numpy as np
 
-def create_qft_circuit(num_qubits: int, inverse: bool = False) -> QuantumCircuit:
+def create_qft_circuit(
+    num_qubits: int,
+    inverse: bool = False,
+    min_angle: float = 0.0,
+    swaps: bool = True
+) -> QuantumCircuit:
     """
     Create a Quantum Fourier Transform circuit.
 
+    Qubit 0 is the most significant bit. Each qubit gets a Hadamard followed by
+    controlled-phase rotations of pi / 2^k from the less significant qubits,
+    and final SWAPs reverse the output order.
+
     Args:
         num_qubits: Number of qubits in the circuit
         inverse: If True, creates inverse QFT circuit
+        min_angle: Approximate QFT: rotations with an angle below this
+            threshold are dropped. A threshold of pi / 2^m keeps at most m
+            rotations per qubit, so the gate count is O(n m) instead of O(n^2)
+        swaps: Whether to add the SWAPs that reverse the qubit order
 
     Returns:
         QuantumCircuit: Circuit implementing QFT or inverse QFT
     """
-    circuit = QuantumCircuit(
-        gates=[],
-        qubits=num_qubits,
-        steps=num_qubits * 2,  # Each qubit needs H + controlled rotations
-        name="Quantum Fourier Transform",
-        description=f"{'Inverse ' if inverse else ''}QFT on {num_qubits} qubits"
-    )
-
-    def add_qft_gates(start_qubit: int, current_step: int):
-        """Add QFT gates for a given qubit."""
-        # Hadamard gate
-        circuit.gates.append(QuantumGate(
-            type='H',
-            position={'qubit': start_qubit, 'step': current_step}
-        ))
-
-        # Controlled phase rotations
-        for target_qubit in range(start_qubit + 1, num_qubits):
-            circuit.gates.append(QuantumGate(
-                type='CNOT',  # Note: In real QFT we need controlled phase gates
-                position={'qubit': target_qubit, 'step': current_step + 1},
-                control=start_qubit
-            ))
+    # (type, qubit, control, angle) in forward QFT order
+    operations = []
+    for qubit in range(num_qubits):
+        operations.append(('H', qubit, None, None))
+        for distance in range(1, num_qubits - qubit):
+            angle = np.pi / 2 ** distance
+            if angle < min_angle:
+                # Later rotations on this qubit are smaller still
+                break
+            operations.append(('CPHASE', qubit, qubit + distance, angle))
+    if swaps:
+        for qubit in range(num_qubits // 2):
+            operations.append(('SWAP', num_qubits - 1 - qubit, qubit, None))
 
-    # Add QFT or inverse QFT gates
-    qubit_order = range(num_qubits - 1, -1, -1) if inverse else range(num_qubits)
+    if inverse:
+        # Every gate is self-inverse except the rotations, which change sign
+        operations = [
+            (gate_type, qubit, control, None if angle is None else -angle)
+            for gate_type, qubit, control, angle in reversed(operations)
+        ]
 
-    current_step = 0
-    for qubit in qubit_order:
-        add_qft_gates(qubit, current_step)
-        current_step += 2
+    gates = []
+    for step, (gate_type, qubit, control, angle) in enumerate(operations):
+        gates.append(QuantumGate(
+            type=gate_type,
+            position={'qubit': qubit, 'step': step},
+            control=control,
+            angle=angle
+        ))
 
     # Add measurements
+    current_step = len(operations)
     for qubit in range(num_qubits):
-        circuit.gates.append(QuantumGate(
+        gates.append(QuantumGate(
             type='MEASURE',
             position={'qubit': qubit, 'step': current_step}
         ))
 
-    return circuit
+    return QuantumCircuit(
+        gates=gates,
+        qubits=num_qubits,
+        steps=current_step + 1,
+        name="Quantum Fourier Transform",
+        description=(
+            f"{'Inverse ' if inverse else ''}{'Approximate ' if min_angle > 0 else ''}"
+            f"QFT on {num_qubits} qubits"
+        )
+    )
@@ -0,0 +1,145 @@
+"""
+Registry of parameterized algorithm circuits with memoized instantiation.
+
+Each template pairs a builder with a Pydantic model of its parameters. Built
+circuits are cached in compiled form, keyed by template name and validated
+parameters, so repeated requests for the same instance return the shared
+read-only arrays instead of rebuilding every gate object.
+"""
+import threading
+import typing
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+from pydantic import BaseModel, Field, ValidationError
+from ..compiler.ir import CompiledCircuit, compile_circuit
+from ..error_correction.surface_code import SurfaceCode
+from ..models import QuantumCircuit
+from .grover import create_grover_circuit
+from .qft import create_qft_circuit
+
+class QFTParameters(BaseModel):
+    qubits: int = Field(ge=1, le=64)
+    inverse: bool = False
+    min_angle: float = Field(default=0.0, ge=0)
+
+class GroverParameters(BaseModel):
+    qubits: int = Field(ge=1, le=24)
+    marked_states: List[int] = Field(min_length=1)
+    iterations: Optional[int] = Field(default=None, ge=0)
+
+class SurfaceCodeParameters(BaseModel):
+    distance: int = Field(ge=3, le=25)
+
+class AlgorithmTemplate:
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        parameters: Type[BaseModel],
+        builder: Callable[[Any], QuantumCircuit]
+    ):
+        self.name = name
+        self.description = description
+        self.parameters = parameters
+        self.builder = builder
+
+    def parse(self, values: Dict[str, Any]) -> BaseModel:
+        """Validate raw parameter values, raising ValueError on bad input."""
+        try:
+            return self.parameters.model_validate(values)
+        except ValidationError as e:
+            raise ValueError(f"Invalid parameters for {self.name}: {str(e)}")
+
+    def list_fields(self) -> List[str]:
+        """Parameters that accept several values."""
+        return [
+            name for name, field in self.parameters.model_fields.items()
+            if typing.get_origin(field.annotation) is list
+        ]
+
+class TemplateRegistry:
+    """
+    Named algorithm templates with an LRU cache of built instances.
+
+    Cached circuits have read-only arrays and are shared between callers;
+    use ``CompiledCircuit.copy()`` for a private, writable instance.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._templates: Dict[str, AlgorithmTemplate] = {}
+        # (name, canonical parameters) -> (compiled circuit, serialized model or None)
+        self._instances: "OrderedDict[Tuple[str, str], List]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def register(self, template: AlgorithmTemplate):
+        self._templates[template.name] = template
+
+    def get_template(self, name: str) -> AlgorithmTemplate:
+        template = self._templates.get(name)
+        if template is None:
+            raise KeyError(f"Unknown algorithm: {name}")
+        return template
+
+    def available(self) -> List[AlgorithmTemplate]:
+        return list(self._templates.values())
+
+    def _entry(self, name: str, values: Dict[str, Any]) -> List:
+        template = self.get_template(name)
+        params = template.parse(values)
+        key = (name, params.model_dump_json())
+        with self._lock:
+            entry = self._instances.get(key)
+            if entry is not None:
+                self._instances.move_to_end(key)
+                return entry
+
+        compiled = compile_circuit(template.builder(params))
+        for array in (
+            compiled.opcode, compiled.target, compiled.control, compiled.param, compiled.step,
+            compiled.unitaries, compiled.control_offsets, compiled.control_qubits, compiled.angles
+        ):
+            array.flags.writeable = False
+
+        with self._lock:
+            entry = self._instances.setdefault(key, [compiled, None])
+            self._instances.move_to_end(key)
+            while len(self._instances) > self.max_entries:
+                self._instances.popitem(last=False)
+        return entry
+
+    def instantiate(self, name: str, **values) -> CompiledCircuit:
+        """Return the shared compiled circuit for a template and its parameters."""
+        return self._entry(name, values)[0]
+
+    def instantiate_json(self, name: str, **values) -> str:
+        """Return the circuit serialized as a ``QuantumCircuit`` JSON document, memoized."""
+        entry = self._entry(name, values)
+        if entry[1] is None:
+            entry[1] = entry[0].to_model().model_dump_json()
+        return entry[1]
+
+def _build_surface_code(params: SurfaceCodeParameters) -> QuantumCircuit:
+    return SurfaceCode(params.distance).create_stabilizer_circuit()
+
+templates = TemplateRegistry()
+templates.register(AlgorithmTemplate(
+    "qft",
+    "Quantum Fourier Transform or its inverse",
+    QFTParameters,
+    lambda params: create_qft_circuit(params.qubits, inverse=params.inverse, min_angle=params.min_angle)
+))
+templates.register(AlgorithmTemplate(
+    "grover",
+    "Grover search for the given marked basis states",
+    GroverParameters,
+    lambda params: create_grover_circuit(
+        params.qubits, num_iterations=params.iterations, marked_states=params.marked_states
+    )
+))
+templates.register(AlgorithmTemplate(
+    "surface_code",
+    "Surface code stabilizer measurement round",
+    SurfaceCodeParameters,
+    _build_surface_code
+))
@@ -0,0 +1,7 @@
+"""
+Circuit compilation: compact intermediate representation shared by all backends.
+"""
+from .ir import CompiledCircuit, Op, compile_circuit
+from .optimizer import optimize_circuit
+
+__all__ = ['CompiledCircuit', 'Op', 'compile_circuit', 'optimize_circuit']
@@ -0,0 +1,324 @@
+"""
+Compact array-backed circuit representation.
+
+A ``CompiledCircuit`` stores a circuit as parallel NumPy arrays (opcode,
+target, control, param, step) built in a single pass over the Pydantic model.
+Every provider converter, the local simulator and validation work from these
+arrays instead of re-walking ``QuantumGate`` objects and their position dicts.
+
+``param`` indexes per-circuit operand tables: fused single-qubit gates (``U``)
+use it to look up their 2x2 matrix in ``unitaries``, rotations (``RZ``,
+``CPHASE``) their angle in ``angles``, and multi-controlled Z gates (``MCZ``)
+their control set in the CSR pair ``control_offsets`` / ``control_qubits``.
+
+Two-qubit gates keep their second qubit in ``control``; for the symmetric
+``SWAP`` it is simply the other qubit.
+"""
+from enum import IntEnum
+from typing import Iterator, List, Optional, Tuple, Union
+import hashlib
+import numpy as np
+from ..models import QuantumCircuit, QuantumGate
+
+class Op(IntEnum):
+    H = 0
+    X = 1
+    CNOT = 2
+    MEASURE = 3
+    # Fused single-qubit unitary produced by the optimizer, never parsed from requests
+    U = 4
+    # Z on the target when every control is |1>; with no controls it is a plain Z
+    MCZ = 5
+    # Rotation about Z: diag(e^{-i angle/2}, e^{i angle/2})
+    RZ = 6
+    # Phase e^{i angle} on |11> of control and target
+    CPHASE = 7
+    SWAP = 8
+
+GATE_OPCODES = {op.name: op for op in Op if op != Op.U}
+
+# Opcodes that require a control (or second) qubit
+CONTROLLED_OPS = (Op.CNOT, Op.CPHASE, Op.SWAP)
+
+# Opcodes whose angle is stored in the angles table
+ROTATION_OPS = (Op.RZ, Op.CPHASE)
+
+NO_CONTROL = -1
+NO_PARAM = -1
+
+class CompiledCircuit:
+    __slots__ = (
+        'qubits', 'steps', 'name', 'description', 'opcode', 'target', 'control', 'param', 'step', 'unitaries',
+        'control_offsets', 'control_qubits', 'angles'
+    )
+
+    def __init__(
+        self,
+        qubits: int,
+        opcode: np.ndarray,
+        target: np.ndarray,
+        control: np.ndarray,
+        step: np.ndarray,
+        steps: int = 0,
+        name: str = "",
+        description: Optional[str] = None,
+        param: Optional[np.ndarray] = None,
+        unitaries: Optional[np.ndarray] = None,
+        control_offsets: Optional[np.ndarray] = None,
+        control_qubits: Optional[np.ndarray] = None,
+        angles: Optional[np.ndarray] = None
+    ):
+        self.qubits = qubits
+        self.opcode = np.asarray(opcode, dtype=np.int8)
+        self.target = np.asarray(target, dtype=np.int32)
+        self.control = np.asarray(control, dtype=np.int32)
+        self.step = np.asarray(step, dtype=np.int32)
+        self.param = (
+            np.full(len(self.opcode), NO_PARAM, dtype=np.int32) if param is None
+            else np.asarray(param, dtype=np.int32)
+        )
+        self.unitaries = (
+            np.empty((0, 2, 2), dtype=np.complex128) if unitaries is None
+            else np.asarray(unitaries, dtype=np.complex128)
+        )
+        self.control_offsets = (
+            np.zeros(1, dtype=np.int32) if control_offsets is None
+            else np.asarray(control_offsets, dtype=np.int32)
+        )
+        self.control_qubits = (
+            np.empty(0, dtype=np.int32) if control_qubits is None
+            else np.asarray(control_qubits, dtype=np.int32)
+        )
+        self.angles = (
+            np.empty(0, dtype=np.float64) if angles is None
+            else np.asarray(angles, dtype=np.float64)
+        )
+        self.steps = steps
+        self.name = name
+        self.description = description
+
+    def __len__(self) -> int:
+        return len(self.opcode)
+
+    @property
+    def nbytes(self) -> int:
+        return (
+            self.opcode.nbytes + self.target.nbytes + self.control.nbytes
+            + self.param.nbytes + self.step.nbytes + self.unitaries.nbytes
+            + self.control_offsets.nbytes + self.control_qubits.nbytes + self.angles.nbytes
+        )
+
+    def operations(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Tuple[int, int, int, int]]:
+        """Iterate (opcode, target, control, param) as Python ints; control and param are -1 when absent."""
+        return zip(
+            self.opcode[start:stop].tolist(),
+            self.target[start:stop].tolist(),
+            self.control[start:stop].tolist(),
+            self.param[start:stop].tolist()
+        )
+
+    def head(self, stop: int) -> "CompiledCircuit":
+        """The gates before ``stop`` as a circuit sharing this circuit's arrays."""
+        return CompiledCircuit(
+            self.qubits, self.opcode[:stop], self.target[:stop], self.control[:stop], self.step[:stop],
+            steps=self.steps, name=self.name, description=self.description,
+            param=self.param[:stop], unitaries=self.unitaries,
+            control_offsets=self.control_offsets, control_qubits=self.control_qubits, angles=self.angles
+        )
+
+    def with_angles(self, angles: np.ndarray) -> "CompiledCircuit":
+        """The same circuit with a different angles table; all other arrays are shared."""
+        return CompiledCircuit(
+            self.qubits, self.opcode, self.target, self.control, self.step,
+            steps=self.steps, name=self.name, description=self.description,
+            param=self.param, unitaries=self.unitaries,
+            control_offsets=self.control_offsets, control_qubits=self.control_qubits, angles=angles
+        )
+
+    def has_fused_gates(self) -> bool:
+        return bool((self.opcode == Op.U).any())
+
+    def controls_of(self, param: int) -> List[int]:
+        """Control qubits of a multi-controlled gate."""
+        return self.control_qubits[self.control_offsets[param]:self.control_offsets[param + 1]].tolist()
+
+    def _multi_controls(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Flatten MCZ control sets into (gate index, control qubit) pairs."""
+        gates = np.flatnonzero(self.opcode == Op.MCZ)
+        starts = self.control_offsets[self.param[gates]]
+        lengths = self.control_offsets[self.param[gates] + 1] - starts
+        within = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        return np.repeat(gates, lengths), self.control_qubits[np.repeat(starts, lengths) + within]
+
+    def validate(self):
+        """Check qubit indices and control requirements for every gate at once."""
+        out_of_range = (self.target < 0) | (self.target >= self.qubits)
+        if out_of_range.any():
+            index = int(np.flatnonzero(out_of_range)[0])
+            raise ValueError(
+                f"Gate {Op(self.opcode[index]).name} targets qubit {self.target[index]} outside the circuit"
+            )
+
+        controlled = np.isin(self.opcode, CONTROLLED_OPS)
+        missing = controlled & (self.control == NO_CONTROL)
+        if missing.any():
+            raise ValueError(f"{Op(self.opcode[np.flatnonzero(missing)[0]]).name} gate requires a control qubit")
+
+        has_control = self.control != NO_CONTROL
+        bad_control = has_control & ((self.control < 0) | (self.control >= self.qubits))
+        if bad_control.any():
+            index = int(np.flatnonzero(bad_control)[0])
+            raise ValueError(f"{Op(self.opcode[index]).name} control qubit {self.control[index]} outside the circuit")
+        if (has_control & (self.control == self.target)).any():
+            raise ValueError("Control and target must be different qubits")
+
+        fused = self.opcode == Op.U
+        if ((self.param[fused] < 0) | (self.param[fused] >= len(self.unitaries))).any():
+            raise ValueError("Fused gate refers to a missing unitary")
+
+        rotations = np.isin(self.opcode, ROTATION_OPS)
+        if ((self.param[rotations] < 0) | (self.param[rotations] >= len(self.angles))).any():
+            raise ValueError("Rotation gate refers to a missing angle")
+
+        multi = self.opcode == Op.MCZ
+        if ((self.param[multi] < 0) | (self.param[multi] >= len(self.control_offsets) - 1)).any():
+            raise ValueError("MCZ gate refers to a missing control set")
+        gates, controls = self._multi_controls()
+        if ((controls < 0) | (controls >= self.qubits)).any():
+            raise ValueError("MCZ control qubit outside the circuit")
+        if (controls == self.target[gates]).any():
+            raise ValueError("Control and target must be different qubits")
+        pairs = gates.astype(np.int64) * self.qubits + controls
+        if len(np.unique(pairs)) != len(pairs):
+            raise ValueError("MCZ control qubits must be distinct")
+
+    def measured_qubits(self) -> np.ndarray:
+        """Sorted qubits with at least one measurement."""
+        return np.unique(self.target[self.opcode == Op.MEASURE])
+
+    def first_measurement(self) -> int:
+        """Index of the first measurement, or the circuit length if there is none."""
+        indices = np.flatnonzero(self.opcode == Op.MEASURE)
+        return int(indices[0]) if len(indices) else len(self)
+
+    def is_measurement_terminal(self) -> bool:
+        """Check that no gate acts on a qubit after that qubit has been measured."""
+        is_measure = self.opcode == Op.MEASURE
+        if not is_measure.any():
+            return True
+        positions = np.arange(len(self))
+        first = np.full(self.qubits, len(self), dtype=np.int64)
+        np.minimum.at(first, self.target[is_measure], positions[is_measure])
+
+        gates = ~is_measure
+        after_target = positions[gates] > first[self.target[gates]]
+        controls = self.control[gates]
+        has_control = controls != NO_CONTROL
+        after_control = has_control & (positions[gates] > first[np.where(has_control, controls, 0)])
+        multi_gates, multi_controls = self._multi_controls()
+        after_multi = multi_gates > first[multi_controls]
+        return not (after_target.any() or after_control.any() or after_multi.any())
+
+    def measurements_last(self) -> "CompiledCircuit":
+        """
+        The same gates with every measurement moved to the end, in order.
+
+        Equivalent to this circuit when it is measurement-terminal, since the
+        gates moved ahead of a measurement then act only on other qubits.
+        """
+        order = np.argsort(self.opcode == Op.MEASURE, kind='stable')
+        return CompiledCircuit(
+            self.qubits, self.opcode[order], self.target[order], self.control[order], self.step[order],
+            steps=self.steps, name=self.name, description=self.description,
+            param=self.param[order], unitaries=self.unitaries,
+            control_offsets=self.control_offsets, control_qubits=self.control_qubits, angles=self.angles
+        )
+
+    def fingerprint(self) -> str:
+        """Content hash of the circuit structure; name and description are ignored."""
+        digest = hashlib.sha256(np.int64(self.qubits).tobytes())
+        arrays = (
+            self.opcode, self.target, self.control, self.param, self.step, self.unitaries,
+            self.control_offsets, self.control_qubits, self.angles
+        )
+        for array in arrays:
+            digest.update(np.ascontiguousarray(array).tobytes())
+        return digest.hexdigest()
+
+    def copy(self) -> "CompiledCircuit":
+        return CompiledCircuit(
+            self.qubits, self.opcode.copy(), self.target.copy(), self.control.copy(), self.step.copy(),
+            steps=self.steps, name=self.name, description=self.description,
+            param=self.param.copy(), unitaries=self.unitaries.copy(),
+            control_offsets=self.control_offsets.copy(), control_qubits=self.control_qubits.copy(),
+            angles=self.angles.copy()
+        )
+
+    def to_model(self) -> QuantumCircuit:
+        """Expand back into the Pydantic circuit model."""
+        if self.has_fused_gates():
+            raise ValueError("Fused gates have no circuit model representation")
+        gates = [
+            QuantumGate(
+                type=Op(opcode).name,
+                position={'qubit': target, 'step': step},
+                control=None if control == NO_CONTROL else control,
+                controls=self.controls_of(param) if opcode == Op.MCZ else None,
+                angle=float(self.angles[param]) if opcode in ROTATION_OPS else None
+            )
+            for opcode, target, control, param, step in zip(
+                self.opcode.tolist(), self.target.tolist(), self.control.tolist(),
+                self.param.tolist(), self.step.tolist()
+            )
+        ]
+        return QuantumCircuit(
+            gates=gates, qubits=self.qubits, steps=self.steps, name=self.name, description=self.description
+        )
+
+def compile_circuit(circuit: Union[QuantumCircuit, CompiledCircuit]) -> CompiledCircuit:
+    """
+    Build the validated array representation of a circuit in a single pass.
+
+    Already compiled circuits are returned unchanged, so callers can accept either form.
+    """
+    if isinstance(circuit, CompiledCircuit):
+        return circuit
+
+    count = len(circuit.gates)
+    opcode = np.empty(count, dtype=np.int8)
+    target = np.empty(count, dtype=np.int32)
+    control = np.empty(count, dtype=np.int32)
+    step = np.empty(count, dtype=np.int32)
+    param = np.full(count, NO_PARAM, dtype=np.int32)
+    control_offsets = [0]
+    control_qubits: List[int] = []
+    angles: List[float] = []
+
+    for index, gate in enumerate(circuit.gates):
+        op = GATE_OPCODES.get(gate.type)
+        if op is None:
+            raise ValueError(f"Unsupported gate type: {gate.type}")
+        position = gate.position
+        if 'qubit' not in position:
+            raise ValueError(f"{op.name} gate position requires a qubit")
+        opcode[index] = op
+        target[index] = position['qubit']
+        step[index] = position.get('step', 0)
+        control[index] = NO_CONTROL if gate.control is None else gate.control
+        if op in ROTATION_OPS:
+            if gate.angle is None:
+                raise ValueError(f"{op.name} gate requires an angle")
+            param[index] = len(angles)
+            angles.append(gate.angle)
+        elif op == Op.MCZ:
+            control_qubits.extend(gate.controls or ())
+            param[index] = len(control_offsets) - 1
+            control_offsets.append(len(control_qubits))
+
+    compiled = CompiledCircuit(
+        circuit.qubits, opcode, target, control, step,
+        steps=circuit.steps, name=circuit.name, description=circuit.description,
+        param=param, control_offsets=control_offsets, control_qubits=control_qubits, angles=angles
+    )
+    compiled.validate()
+    return compiled
@@ -0,0 +1,269 @@
+"""
+Peephole optimization of compiled circuits.
+
+Passes run on the ``CompiledCircuit`` before any provider conversion:
+
+* adjacent self-inverse cancellation (H·H, X·X, CNOT·CNOT, SWAP·SWAP, MCZ·MCZ), looking through
+  gates that commute with the candidate so pairs separated by commuting gates
+  also cancel;
+* dead-gate removal: gates after the first measurement whose effect never
+  reaches a later measurement, for providers that read out only the measured
+  qubits;
+* single-qubit fusion: runs of single-qubit gates on one qubit become one
+  gate, either a known gate, an RZ, nothing (identity) or, for providers that
+  accept arbitrary unitaries, a ``U`` 2x2 unitary.
+
+The first measurement is a barrier for every pass, so the state before it
+is unchanged by optimization. Dead-gate removal does change the final state
+of unmeasured qubits, so it must be disabled for providers that read out
+every qubit or report the final state.
+"""
+from typing import Hashable, List, Optional, Tuple
+import numpy as np
+from ..models import OptimizationReport
+from .ir import CompiledCircuit, NO_CONTROL, NO_PARAM, Op
+
+GATE_MATRICES = {
+    Op.H: np.array([[1, 1], [1, -1]], dtype=np.complex128) / np.sqrt(2),
+    Op.X: np.array([[0, 1], [1, 0]], dtype=np.complex128),
+}
+
+SELF_INVERSE_OPS = (Op.H, Op.X, Op.CNOT, Op.SWAP, Op.MCZ)
+SINGLE_QUBIT_OPS = (Op.H, Op.X, Op.RZ, Op.U)
+DIAGONAL_OPS = (Op.RZ, Op.CPHASE, Op.MCZ)
+# Gates that act identically on all of their qubits
+SYMMETRIC_OPS = (Op.SWAP, Op.MCZ)
+
+# How many earlier gates per qubit cancellation looks through for a partner
+LOOKBACK = 16
+
+# Working form of a gate: [opcode, target, control, param, step, qubits acted on]
+Gate = list
+
+def _qubits(gate: Gate) -> Tuple[int, ...]:
+    return gate[5]
+
+def _identity(gate: Gate) -> Hashable:
+    """Key under which two gates are the same operation."""
+    if gate[0] in SYMMETRIC_OPS:
+        return gate[0], frozenset(gate[5])
+    return tuple(gate[:4])
+
+def _commutes(a: Gate, b: Gate) -> bool:
+    """Conservative commutation check for the gates that appear before fusion."""
+    if not set(_qubits(a)) & set(_qubits(b)):
+        return True
+    if Op.MEASURE in (a[0], b[0]):
+        return False
+    if _identity(a) == _identity(b):
+        return True
+    if a[0] == Op.CNOT and b[0] == Op.CNOT:
+        # CNOTs commute unless one's target is the other's control
+        return a[2] != b[1] and b[2] != a[1]
+    if {a[0], b[0]} == {Op.CNOT, Op.X}:
+        cnot, x = (a, b) if a[0] == Op.CNOT else (b, a)
+        # X on the target commutes with CNOT, X on the control does not
+        return x[1] == cnot[1]
+    if a[0] in DIAGONAL_OPS and b[0] in DIAGONAL_OPS:
+        return True
+    if Op.CNOT in (a[0], b[0]) and (a[0] in DIAGONAL_OPS or b[0] in DIAGONAL_OPS):
+        cnot, diagonal = (a, b) if a[0] == Op.CNOT else (b, a)
+        # Diagonal gates commute with CNOT unless they act on its target
+        return cnot[1] not in diagonal[5]
+    return False
+
+def _cancel_inverses(gates: List[Gate], qubits: int) -> Tuple[List[Gate], int]:
+    """Remove pairs of identical self-inverse gates separated only by commuting gates."""
+    kept: List[Optional[Gate]] = []
+    history: List[List[int]] = [[] for _ in range(qubits)]
+    removed = 0
+
+    for gate in gates:
+        involved = _qubits(gate)
+        partner = None
+        if gate[0] in SELF_INVERSE_OPS:
+            identity = _identity(gate)
+            candidates = set()
+            for qubit in involved:
+                found = None
+                for index in reversed(history[qubit][-LOOKBACK:]):
+                    other = kept[index]
+                    if _identity(other) == identity:
+                        found = index
+                        break
+                    if not _commutes(other, gate):
+                        break
+                candidates.add(found)
+            if len(candidates) == 1 and None not in candidates:
+                partner = candidates.pop()
+
+        if partner is not None:
+            kept[partner] = None
+            for qubit in involved:
+                history[qubit].remove(partner)
+            removed += 2
+            continue
+        for qubit in involved:
+            history[qubit].append(len(kept))
+        kept.append(gate)
+
+    return [gate for gate in kept if gate is not None], removed
+
+def _remove_dead_gates(gates: List[Gate]) -> Tuple[List[Gate], int]:
+    """
+    Drop gates whose qubits are never measured afterwards.
+
+    Only valid for circuits with explicit measurements, where unmeasured
+    qubits are not read out. Walking backwards, a qubit is live if a later
+    kept operation acts on it; a gate touching only dead qubits cannot change
+    any measurement outcome.
+    """
+    live = set()
+    kept = []
+    for gate in reversed(gates):
+        involved = _qubits(gate)
+        if gate[0] == Op.MEASURE or live.intersection(involved):
+            live.update(involved)
+            kept.append(gate)
+    kept.reverse()
+    return kept, len(gates) - len(kept)
+
+def _equal_up_to_phase(a: np.ndarray, b: np.ndarray) -> bool:
+    # Both are unitary, so |tr(b^dagger a)| reaches 2 exactly when a = e^{i phi} b
+    return abs(abs(np.trace(b.conj().T @ a)) - 2) < 1e-9
+
+def _fuse_single_qubit(
+    gates: List[Gate],
+    qubits: int,
+    unitaries: List[np.ndarray],
+    angles: List[float],
+    allow_unitary: bool
+) -> Tuple[List[Gate], int]:
+    """
+    Merge each run of consecutive single-qubit gates on a qubit into at most one gate.
+
+    Without ``allow_unitary``, runs whose product is not H, X, a Z rotation or
+    the identity are left alone.
+    """
+    kept: List[Optional[Gate]] = list(gates)
+    runs: List[List[int]] = [[] for _ in range(qubits)]
+    removed = 0
+
+    def flush(qubit: int):
+        nonlocal removed
+        run = runs[qubit]
+        runs[qubit] = []
+        if len(run) < 2:
+            return
+        matrix = np.eye(2, dtype=np.complex128)
+        for index in run:
+            gate = kept[index]
+            if gate[0] == Op.U:
+                gate_matrix = unitaries[gate[3]]
+            elif gate[0] == Op.RZ:
+                half = 0.5 * angles[gate[3]]
+                gate_matrix = np.diag([np.exp(-1j * half), np.exp(1j * half)])
+            else:
+                gate_matrix = GATE_MATRICES[Op(gate[0])]
+            matrix = gate_matrix @ matrix
+        # The fused gate takes the place of the last gate in the run
+        last = kept[run[-1]]
+        if _equal_up_to_phase(matrix, np.eye(2)):
+            fused = None
+        else:
+            op = next((op for op, known in GATE_MATRICES.items() if _equal_up_to_phase(matrix, known)), None)
+            if op is not None:
+                fused = [op, last[1], NO_CONTROL, NO_PARAM, last[4], last[5]]
+            elif abs(matrix[0, 1]) < 1e-12 and abs(matrix[1, 0]) < 1e-12:
+                # Diagonal up to global phase: a single Z rotation
+                angles.append(float(np.angle(matrix[1, 1]) - np.angle(matrix[0, 0])))
+                fused = [Op.RZ, last[1], NO_CONTROL, len(angles) - 1, last[4], last[5]]
+            elif allow_unitary:
+                unitaries.append(matrix)
+                fused = [Op.U, last[1], NO_CONTROL, len(unitaries) - 1, last[4], last[5]]
+            else:
+                return
+
+        for index in run[:-1]:
+            kept[index] = None
+        kept[run[-1]] = fused
+        removed += len(run) - (fused is not None)
+
+    for index, gate in enumerate(gates):
+        if gate[0] in SINGLE_QUBIT_OPS:
+            runs[gate[1]].append(index)
+        else:
+            for qubit in _qubits(gate):
+                flush(qubit)
+    for qubit in range(qubits):
+        flush(qubit)
+
+    return [gate for gate in kept if gate is not None], removed
+
+def optimize_circuit(
+    circuit: CompiledCircuit,
+    fuse: bool = True,
+    remove_dead: bool = True
+) -> Tuple[CompiledCircuit, OptimizationReport]:
+    """
+    Run the optimization passes and report how many gates each removed.
+
+    Args:
+        circuit: Compiled circuit to optimize; it is not modified
+        fuse: Whether single-qubit runs may become ``U`` gates, which only
+            providers that accept arbitrary unitaries can execute
+        remove_dead: Whether gates that cannot affect a measurement may be
+            dropped, which is only valid if unmeasured qubits are not read out
+    """
+    gates = []
+    for opcode, target, control, param, step in zip(
+        circuit.opcode.tolist(), circuit.target.tolist(), circuit.control.tolist(),
+        circuit.param.tolist(), circuit.step.tolist()
+    ):
+        if opcode == Op.MCZ:
+            involved = tuple(circuit.controls_of(param)) + (target,)
+        else:
+            involved = (target,) if control == NO_CONTROL else (control, target)
+        gates.append([opcode, target, control, param, step, involved])
+    unitaries = list(circuit.unitaries)
+    angles = circuit.angles.tolist()
+    first = circuit.first_measurement()
+    prefix, suffix = gates[:first], gates[first:]
+
+    cancelled = 0
+    for segment in (prefix, suffix):
+        optimized, count = _cancel_inverses(segment, circuit.qubits)
+        segment[:] = optimized
+        cancelled += count
+
+    # The suffix starts at the first measurement, so it is empty unless the circuit measures explicitly
+    dead = 0
+    if remove_dead:
+        suffix, dead = _remove_dead_gates(suffix)
+
+    fused = 0
+    for segment in (prefix, suffix):
+        optimized, count = _fuse_single_qubit(segment, circuit.qubits, unitaries, angles, allow_unitary=fuse)
+        segment[:] = optimized
+        fused += count
+
+    gates = [gate[:5] for gate in prefix + suffix]
+    columns = np.array(gates, dtype=np.int64).reshape(-1, 5).T
+    optimized = CompiledCircuit(
+        circuit.qubits, columns[0], columns[1], columns[2], columns[4],
+        steps=circuit.steps, name=circuit.name, description=circuit.description,
+        param=columns[3],
+        unitaries=np.array(unitaries, dtype=np.complex128).reshape(-1, 2, 2),
+        control_offsets=circuit.control_offsets,
+        control_qubits=circuit.control_qubits,
+        angles=angles
+    )
+    report = OptimizationReport(
+        original_gates=len(circuit),
+        optimized_gates=len(optimized),
+        gates_removed=len(circuit) - len(optimized),
+        cancelled=cancelled,
+        fused=fused,
+        dead=dead
+    )
+    return optimized, report
@@ -0,0 +1,262 @@
+"""
+Monte Carlo estimation of surface code logical error rates.
+
+Each shot applies independent depolarizing noise to the data qubits before
+every syndrome round and flips each syndrome bit with the measurement error
+rate; the last round is read out perfectly, as the final data-qubit
+measurement would be. Detection events (changes between consecutive rounds)
+are decoded on the space-time graph of each stabilizer type, whose edges are
+data-qubit errors within a round and measurement errors between rounds, with
+the same union-find decoder the code uses for single rounds. With a perfect
+readout there is one round and this is the code-capacity model.
+
+Shots are sampled and decoded in NumPy batches. Batches of every point of a
+sweep are spread over a process pool, and estimates are yielded as batches
+finish so long sweeps report progress.
+"""
+import threading
+from itertools import zip_longest
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from statistics import NormalDist
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+from ..models import LogicalErrorEstimate, LogicalErrorSweepRequest
+from .surface_code import SurfaceCode, UnionFindDecoder
+
+# Shots sampled and decoded together by one task
+DEFAULT_BATCH_SHOTS = 10000
+
+_decoders: Dict[Tuple[int, int], Tuple[UnionFindDecoder, UnionFindDecoder]] = {}
+_decoders_lock = threading.Lock()
+
+def wilson_interval(failures: int, shots: int, confidence: float = 0.95) -> Tuple[float, float]:
+    """
+    Wilson score interval for a binomial proportion.
+
+    Unlike the normal approximation it stays inside [0, 1] and is not empty
+    when no failures were observed.
+    """
+    if shots == 0:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    rate = failures / shots
+    denominator = 1 + z ** 2 / shots
+    center = (rate + z ** 2 / (2 * shots)) / denominator
+    margin = z * np.sqrt(rate * (1 - rate) / shots + z ** 2 / (4 * shots ** 2)) / denominator
+    return max(0.0, float(center - margin)), min(1.0, float(center + margin))
+
+def _space_time_incidence(checks: np.ndarray, rounds: int) -> np.ndarray:
+    """
+    Detection events flipped by every error mechanism over ``rounds`` rounds.
+
+    Columns are the data-qubit errors of each round followed by the readout
+    errors of each stabilizer in every round but the last.
+    """
+    num_checks, num_data_qubits = checks.shape
+    incidence = np.zeros(
+        (num_checks * rounds, num_data_qubits * rounds + num_checks * (rounds - 1)), dtype=np.uint8
+    )
+    for layer in range(rounds):
+        incidence[
+            layer * num_checks:(layer + 1) * num_checks,
+            layer * num_data_qubits:(layer + 1) * num_data_qubits
+        ] = checks
+    readout = np.arange(num_checks * (rounds - 1))
+    incidence[readout, num_data_qubits * rounds + readout] = 1
+    incidence[readout + num_checks, num_data_qubits * rounds + readout] = 1
+    return incidence
+
+def _space_time_decoders(code: SurfaceCode, rounds: int) -> Tuple[UnionFindDecoder, UnionFindDecoder]:
+    """(X error, Z error) decoders for ``rounds`` rounds, built once per process."""
+    key = (code.distance, rounds)
+    with _decoders_lock:
+        if key not in _decoders:
+            _decoders[key] = (
+                UnionFindDecoder(_space_time_incidence(code.incidence[code.z_stabilizers], rounds)),
+                UnionFindDecoder(_space_time_incidence(code.incidence[code.x_stabilizers], rounds))
+            )
+        return _decoders[key]
+
+def sample_logical_failures(
+    distance: int,
+    physical_error_rate: float,
+    shots: int,
+    measurement_error_rate: float = 0.0,
+    rounds: int = 1,
+    seed: Optional[np.random.SeedSequence] = None
+) -> int:
+    """
+    Sample noisy shots, decode them and count logical failures.
+
+    A shot fails when the residual error after correction flips logical X,
+    logical Z or both.
+    """
+    code = SurfaceCode(distance)
+    rng = np.random.default_rng(seed)
+    num_data_qubits = code.num_data_qubits
+    x_errors = np.zeros((shots, num_data_qubits), dtype=np.uint8)
+    z_errors = np.zeros((shots, num_data_qubits), dtype=np.uint8)
+    previous = np.zeros((shots, code.num_measure_qubits), dtype=np.uint8)
+    events = []
+    for layer in range(rounds):
+        # Depolarizing: X, Y and Z each with probability p / 3
+        draw = rng.random((shots, num_data_qubits))
+        x_errors ^= draw < 2 * physical_error_rate / 3
+        z_errors ^= (draw >= physical_error_rate / 3) & (draw < physical_error_rate)
+        syndromes = code.syndromes(x_errors, z_errors)
+        if layer < rounds - 1 and measurement_error_rate > 0:
+            syndromes ^= rng.random(syndromes.shape) < measurement_error_rate
+        events.append(syndromes ^ previous)
+        previous = syndromes
+
+    x_decoder, z_decoder = _space_time_decoders(code, rounds)
+    residuals = []
+    for errors, decoder, stabilizers in (
+        (x_errors, x_decoder, code.z_stabilizers),
+        (z_errors, z_decoder, code.x_stabilizers)
+    ):
+        corrections = decoder.decode_batch(np.hstack([layer[:, stabilizers] for layer in events]))
+        data_corrections = corrections[:, :num_data_qubits * rounds].reshape(shots, rounds, num_data_qubits)
+        residuals.append(errors ^ np.bitwise_xor.reduce(data_corrections, axis=1))
+    x_flips, z_flips = code.logical_errors(*residuals)
+    return int(np.count_nonzero(x_flips | z_flips))
+
+class _SweepPoint:
+    """Running totals for one (distance, physical error rate) pair."""
+
+    def __init__(self, distance: int, physical_error_rate: float, rounds: int):
+        self.distance = distance
+        self.physical_error_rate = physical_error_rate
+        self.rounds = rounds
+        self.shots = 0
+        self.failures = 0
+        self.pending = 0
+
+    def estimate(self, request: LogicalErrorSweepRequest, complete: bool) -> LogicalErrorEstimate:
+        low, high = wilson_interval(self.failures, self.shots, request.confidence)
+        return LogicalErrorEstimate(
+            distance=self.distance,
+            physical_error_rate=self.physical_error_rate,
+            measurement_error_rate=request.measurement_error_rate,
+            rounds=self.rounds,
+            shots=self.shots,
+            failures=self.failures,
+            logical_error_rate=self.failures / self.shots if self.shots else 0.0,
+            confidence_interval=[low, high],
+            complete=complete
+        )
+
+def validate_sweep(request: LogicalErrorSweepRequest, max_total_shots: Optional[int] = None):
+    """
+    Check sweep parameters before any sampling starts.
+
+    Raises:
+        ValueError: If a parameter is invalid or the sweep exceeds ``max_total_shots``
+    """
+    if not request.distances or not request.physical_error_rates:
+        raise ValueError("A sweep needs at least one distance and one physical error rate")
+    for distance in request.distances:
+        SurfaceCode(distance)
+    for rate in list(request.physical_error_rates) + [request.measurement_error_rate]:
+        if not 0 <= rate <= 1:
+            raise ValueError("Error rates must be between 0 and 1")
+    if request.shots < 1:
+        raise ValueError("Shots must be positive")
+    if request.rounds is not None and request.rounds < 1:
+        raise ValueError("Rounds must be positive")
+    if not 0 < request.confidence < 1:
+        raise ValueError("Confidence must be between 0 and 1")
+    total = request.shots * len(request.distances) * len(request.physical_error_rates)
+    if max_total_shots is not None and total > max_total_shots:
+        raise ValueError(f"Sweep of {total} shots exceeds the limit of {max_total_shots}")
+
+def estimate_logical_error_rates(
+    request: LogicalErrorSweepRequest,
+    max_workers: Optional[int] = None,
+    batch_shots: int = DEFAULT_BATCH_SHOTS
+) -> Iterator[LogicalErrorEstimate]:
+    """
+    Estimate logical error rates over every distance and physical error rate.
+
+    Yields a partial estimate each time a batch of a point finishes and a
+    final one (``complete=True``) when the point has all its shots or reached
+    ``max_failures``. Seeded sweeps give the same totals for any number of
+    workers, unless ``max_failures`` stops points early.
+
+    Args:
+        request: Sweep parameters
+        max_workers: Worker processes; 0 samples in the calling process
+        batch_shots: Shots per task
+
+    Raises:
+        ValueError: If the sweep parameters are invalid
+    """
+    validate_sweep(request)
+    root = np.random.SeedSequence(request.seed)
+    points: List[_SweepPoint] = []
+    tasks = []
+    for distance in request.distances:
+        rounds = request.rounds or (distance if request.measurement_error_rate > 0 else 1)
+        for rate, seed in zip(request.physical_error_rates, root.spawn(len(request.physical_error_rates))):
+            point = _SweepPoint(distance, rate, rounds)
+            points.append(point)
+            sizes = [batch_shots] * (request.shots // batch_shots)
+            if request.shots % batch_shots:
+                sizes.append(request.shots % batch_shots)
+            point.pending = len(sizes)
+            tasks.append([(point, size, child) for size, child in zip(sizes, seed.spawn(len(sizes)))])
+    # Interleave points so every one of them makes early progress
+    order = [task for batch in zip_longest(*tasks) for task in batch if task is not None]
+
+    def finished(point: _SweepPoint) -> bool:
+        return point.pending == 0 or (
+            request.max_failures is not None and point.failures >= request.max_failures
+        )
+
+    def record(point: _SweepPoint, shots: int, failures: int) -> Optional[LogicalErrorEstimate]:
+        if finished(point):
+            # Late batch of a point that already stopped early
+            return None
+        point.shots += shots
+        point.failures += failures
+        point.pending -= 1
+        return point.estimate(request, complete=finished(point))
+
+    if max_workers == 0:
+        for point, shots, seed in order:
+            if not finished(point):
+                failures = sample_logical_failures(
+                    point.distance, point.physical_error_rate, shots,
+                    request.measurement_error_rate, point.rounds, seed
+                )
+                estimate = record(point, shots, failures)
+                if estimate is not None:
+                    yield estimate
+        return
+
+    pool = ProcessPoolExecutor(max_workers=max_workers)
+    try:
+        futures: Dict[Future, Tuple[_SweepPoint, int]] = {}
+        for point, shots, seed in order:
+            future = pool.submit(
+                sample_logical_failures, point.distance, point.physical_error_rate, shots,
+                request.measurement_error_rate, point.rounds, seed
+            )
+            futures[future] = (point, shots)
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                point, shots = futures.pop(future)
+                if future.cancelled():
+                    continue
+                estimate = record(point, shots, future.result())
+                if estimate is None:
+                    continue
+                if estimate.complete:
+                    for other, (owner, _) in list(futures.items()):
+                        if owner is point and other.cancel():
+                            del futures[other]
+                yield estimate
+    finally:
+        # Also reached when the consumer stops early, e.g. a closed stream
+        pool.shutdown(wait=False, cancel_futures=True)
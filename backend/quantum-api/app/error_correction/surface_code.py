@@ -1,6 +1,253 @@
-from typing import List, Tuple, Optional
+"""
+Quantum error correction module providing error detection and correction capabilities.
+
+The surface code is the rotated layout: ``d x d`` data qubits (qubit
+``row * d + col``) and ``d^2 - 1`` measurement qubits, one per stabilizer.
+Weight-4 plaquettes alternate between X and Z type in a checkerboard, and
+weight-2 X stabilizers close the top and bottom edges while weight-2 Z
+stabilizers close the left and right edges. Logical X runs down column 0 and
+logical Z along row 0.
+
+The layout, its stabilizer/data-qubit incidence matrix and the decoding
+graphs are built once per distance and shared by every ``SurfaceCode`` of
+that distance. Syndromes are decoded in batches: each distinct syndrome in a
+batch is decoded once by a union-find decoder (Delfosse and Nickerson,
+"Almost-linear time decoding algorithm for topological codes", 2021) and the
+result is broadcast to every shot that produced it.
+"""
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
 from ..models import QuantumCircuit, QuantumGate
 
+# Plaquette corners as (row offset, column offset), in the order their CNOTs
+# are scheduled. The X order ("Z" shape) and the Z order ("N" shape) never
+# touch the same data qubit in the same layer and keep hook errors
+# perpendicular to the logical operators they could shorten.
+_X_SCHEDULE = ((0, 0), (0, 1), (1, 0), (1, 1))
+_Z_SCHEDULE = ((0, 0), (1, 0), (0, 1), (1, 1))
+
+# Decoded syndromes remembered per decoder before the memo is reset
+_MEMO_LIMIT = 1 << 16
+
+class UnionFindDecoder:
+    """
+    Union-find decoder for one stabilizer type of a code.
+
+    Every data qubit is an edge of the decoding graph between the (one or
+    two) stabilizers of this type that it touches; a qubit touching a single
+    stabilizer is an edge to a shared virtual boundary vertex. Odd clusters of
+    fired stabilizers grow by half edges until every cluster has even parity
+    or reaches the boundary, and each cluster's spanning tree is then peeled
+    into a correction.
+    """
+
+    def __init__(self, incidence: np.ndarray):
+        """
+        Build the decoding graph.
+
+        Args:
+            incidence: ``(stabilizers, data qubits)`` 0/1 matrix; every column
+                must have one or two nonzero entries
+        """
+        self.num_checks, self.num_data_qubits = incidence.shape
+        boundary = self.num_checks
+        self.edges: List[Tuple[int, int]] = []
+        self.adjacency: List[List[Tuple[int, int]]] = [[] for _ in range(boundary + 1)]
+        for qubit in range(self.num_data_qubits):
+            checks = np.flatnonzero(incidence[:, qubit]).tolist()
+            if not 1 <= len(checks) <= 2:
+                raise ValueError(f"Data qubit {qubit} must touch one or two stabilizers of each type")
+            first, second = checks if len(checks) == 2 else (checks[0], boundary)
+            self.edges.append((first, second))
+            self.adjacency[first].append((qubit, second))
+            self.adjacency[second].append((qubit, first))
+        self._memo: Dict[bytes, np.ndarray] = {}
+        self._memo_lock = threading.Lock()
+
+    def decode(self, defects: Sequence[int]) -> List[int]:
+        """
+        Decode one syndrome.
+
+        Args:
+            defects: Indices of the stabilizers that fired
+
+        Returns:
+            Data qubits to flip
+        """
+        defects = [int(defect) for defect in defects]
+        if not defects:
+            return []
+        boundary = self.num_checks
+        parent = list(range(boundary + 1))
+        odd = [False] * (boundary + 1)
+        for defect in defects:
+            odd[defect] = not odd[defect]
+        touches_boundary = [False] * (boundary + 1)
+        touches_boundary[boundary] = True
+        members: Dict[int, List[int]] = {}
+        support = [0] * self.num_data_qubits
+
+        def find(vertex: int) -> int:
+            while parent[vertex] != vertex:
+                parent[vertex] = parent[parent[vertex]]
+                vertex = parent[vertex]
+            return vertex
+
+        # Grow every odd cluster by half an edge per round
+        active = [defect for defect in set(defects) if odd[defect]]
+        while active:
+            fused = []
+            for root in active:
+                for vertex in members.get(root, [root]):
+                    for edge, _ in self.adjacency[vertex]:
+                        if support[edge] < 2:
+                            support[edge] += 1
+                            if support[edge] == 2:
+                                fused.append(edge)
+            for edge in fused:
+                first, second = (find(vertex) for vertex in self.edges[edge])
+                if first == second:
+                    continue
+                first_members = members.pop(first, [first])
+                second_members = members.pop(second, [second])
+                if len(first_members) < len(second_members):
+                    first, second = second, first
+                    first_members, second_members = second_members, first_members
+                parent[second] = first
+                first_members.extend(second_members)
+                members[first] = first_members
+                odd[first] ^= odd[second]
+                touches_boundary[first] |= touches_boundary[second]
+            active = list({
+                root for root in (find(vertex) for vertex in active)
+                if odd[root] and not touches_boundary[root]
+            })
+
+        # Spanning forest of the fully grown edges; trees reaching the
+        # boundary are rooted there so it can absorb an odd parity
+        tree: Dict[int, List[Tuple[int, int]]] = {}
+        for edge, grown in enumerate(support):
+            if grown == 2:
+                first, second = self.edges[edge]
+                tree.setdefault(first, []).append((edge, second))
+                tree.setdefault(second, []).append((edge, first))
+        order: List[int] = []
+        parent_edge: Dict[int, Tuple[int, int]] = {}
+        visited = set()
+        for root in [boundary] + defects:
+            if root in visited or (root == boundary and boundary not in tree):
+                continue
+            visited.add(root)
+            queue = deque([root])
+            while queue:
+                vertex = queue.popleft()
+                order.append(vertex)
+                for edge, neighbour in tree.get(vertex, []):
+                    if neighbour not in visited:
+                        visited.add(neighbour)
+                        parent_edge[neighbour] = (edge, vertex)
+                        queue.append(neighbour)
+
+        marked = [False] * (boundary + 1)
+        for defect in defects:
+            marked[defect] = not marked[defect]
+        correction = []
+        for vertex in reversed(order):
+            if marked[vertex] and vertex in parent_edge:
+                edge, towards = parent_edge[vertex]
+                correction.append(edge)
+                marked[towards] = not marked[towards]
+        return sorted(correction)
+
+    def decode_batch(self, syndromes: np.ndarray) -> np.ndarray:
+        """
+        Decode many syndromes at once.
+
+        Args:
+            syndromes: ``(shots, stabilizers)`` 0/1 matrix
+
+        Returns:
+            ``(shots, data qubits)`` uint8 matrix of data qubits to flip
+        """
+        syndromes = np.asarray(syndromes, dtype=np.uint8)
+        if syndromes.ndim != 2 or syndromes.shape[1] != self.num_checks:
+            raise ValueError(f"Syndromes must be a (shots, {self.num_checks}) matrix")
+        if syndromes.shape[0] == 0:
+            return np.zeros((0, self.num_data_qubits), dtype=np.uint8)
+        packed = np.ascontiguousarray(np.packbits(syndromes, axis=1))
+        keys = packed.view(np.dtype((np.void, packed.shape[1]))).ravel()
+        unique, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+
+        table = np.zeros((len(unique), self.num_data_qubits), dtype=np.uint8)
+        for row, (key, index) in enumerate(zip(unique, first)):
+            key = key.tobytes()
+            correction = self._memo.get(key)
+            if correction is None:
+                correction = np.zeros(self.num_data_qubits, dtype=np.uint8)
+                correction[self.decode(np.flatnonzero(syndromes[index]))] = 1
+                with self._memo_lock:
+                    if len(self._memo) >= _MEMO_LIMIT:
+                        self._memo.clear()
+                    self._memo[key] = correction
+            table[row] = correction
+        return table[inverse.ravel()]
+
+class _SurfaceCodeLayout:
+    """Stabilizers, incidence matrices and decoders of one code distance."""
+
+    def __init__(self, distance: int):
+        self.distance = distance
+        num_data_qubits = distance ** 2
+        # (type, plaquette row, plaquette column) per measurement qubit
+        self.stabilizers: List[Tuple[str, int, int]] = []
+        for row in range(-1, distance):
+            for col in range(-1, distance):
+                kind = 'X' if (row + col) % 2 == 0 else 'Z'
+                bulk_row, bulk_col = 0 <= row < distance - 1, 0 <= col < distance - 1
+                # Boundary plaquettes only exist as X on the top and bottom
+                # edges and as Z on the left and right edges
+                if (bulk_row and bulk_col) or (kind == 'X' and bulk_col) or (kind == 'Z' and bulk_row):
+                    self.stabilizers.append((kind, row, col))
+
+        self.schedules: List[List[Optional[int]]] = []
+        self.incidence = np.zeros((len(self.stabilizers), num_data_qubits), dtype=np.uint8)
+        for index, (kind, row, col) in enumerate(self.stabilizers):
+            schedule = []
+            for row_offset, col_offset in (_X_SCHEDULE if kind == 'X' else _Z_SCHEDULE):
+                data_row, data_col = row + row_offset, col + col_offset
+                if 0 <= data_row < distance and 0 <= data_col < distance:
+                    schedule.append(data_row * distance + data_col)
+                    self.incidence[index, schedule[-1]] = 1
+                else:
+                    schedule.append(None)
+            self.schedules.append(schedule)
+        self.incidence.setflags(write=False)
+
+        kinds = np.array([kind for kind, _, _ in self.stabilizers])
+        self.x_stabilizers = np.flatnonzero(kinds == 'X')
+        self.z_stabilizers = np.flatnonzero(kinds == 'Z')
+        # Z stabilizers detect X errors and X stabilizers detect Z errors
+        self.x_decoder = UnionFindDecoder(self.incidence[self.z_stabilizers])
+        self.z_decoder = UnionFindDecoder(self.incidence[self.x_stabilizers])
+
+        self.logical_x = np.zeros(num_data_qubits, dtype=np.uint8)
+        self.logical_x[np.arange(distance) * distance] = 1
+        self.logical_z = np.zeros(num_data_qubits, dtype=np.uint8)
+        self.logical_z[:distance] = 1
+        for array in (self.x_stabilizers, self.z_stabilizers, self.logical_x, self.logical_z):
+            array.setflags(write=False)
+
+_layouts: Dict[int, _SurfaceCodeLayout] = {}
+_layouts_lock = threading.Lock()
+
+def _layout(distance: int) -> _SurfaceCodeLayout:
+    with _layouts_lock:
+        if distance not in _layouts:
+            _layouts[distance] = _SurfaceCodeLayout(distance)
+        return _layouts[distance]
+
 class SurfaceCode:
     def __init__(self, distance: int):
         """
@@ -13,7 +260,37 @@ class SurfaceCode:
             raise ValueError("Distance must be an odd integer ≥ 3")
         self.distance = distance
         self.num_data_qubits = distance ** 2
-        self.num_measure_qubits = 2 * (distance - 1) ** 2
+        self.num_measure_qubits = distance ** 2 - 1
+        self._layout = _layout(distance)
+
+    @property
+    def incidence(self) -> np.ndarray:
+        """Read-only ``(measurement qubits, data qubits)`` stabilizer support matrix."""
+        return self._layout.incidence
+
+    @property
+    def x_stabilizers(self) -> np.ndarray:
+        """Syndrome columns of the X-type stabilizers."""
+        return self._layout.x_stabilizers
+
+    @property
+    def z_stabilizers(self) -> np.ndarray:
+        """Syndrome columns of the Z-type stabilizers."""
+        return self._layout.z_stabilizers
+
+    @property
+    def logical_x(self) -> np.ndarray:
+        """Data qubits of the logical X operator."""
+        return self._layout.logical_x
+
+    @property
+    def logical_z(self) -> np.ndarray:
+        """Data qubits of the logical Z operator."""
+        return self._layout.logical_z
+
+    def stabilizer_type(self, measure_qubit: int) -> str:
+        """'X' or 'Z' for the stabilizer measured by a measurement qubit."""
+        return self._layout.stabilizers[measure_qubit - self.num_data_qubits][0]
 
     def create_stabilizer_circuit(self) -> QuantumCircuit:
         """Create a circuit for measuring surface code stabilizers."""
@@ -21,64 +298,97 @@ class SurfaceCode:
         circuit = QuantumCircuit(
             gates=[],
             qubits=total_qubits,
-            steps=6,  # Initialize + 4 CNOT layers + measure
+            steps=7,  # H + 4 CNOT layers + H + measure
             name="Surface Code Stabilizers",
             description=f"Surface code stabilizer measurements with distance {self.distance}"
         )
+        x_measure_qubits = [self.num_data_qubits + int(index) for index in self.x_stabilizers]
 
-        # Initialize measurement qubits in superposition
-        for qubit in range(self.num_data_qubits, total_qubits):
-            circuit.gates.append(QuantumGate(
-                type='H',
-                position={'qubit': qubit, 'step': 0}
-            ))
+        # X stabilizers are measured in the Hadamard basis
+        for qubit in x_measure_qubits:
+            circuit.gates.append(QuantumGate(type='H', position={'qubit': qubit, 'step': 0}))
+
+        for layer in range(4):
+            for index, schedule in enumerate(self._layout.schedules):
+                data_qubit = schedule[layer]
+                if data_qubit is None:
+                    continue
+                measure_qubit = self.num_data_qubits + index
+                if self._layout.stabilizers[index][0] == 'X':
+                    target, control = data_qubit, measure_qubit
+                else:
+                    target, control = measure_qubit, data_qubit
+                circuit.gates.append(QuantumGate(
+                    type='CNOT',
+                    position={'qubit': target, 'step': layer + 1},
+                    control=control
+                ))
 
-        # Add CNOT gates for stabilizer measurements
-        current_step = 1
-        for layer in range(4):  # 4 CNOT layers for each stabilizer
-            for measure_qubit in range(self.num_data_qubits, total_qubits):
-                data_qubits = self._get_data_qubits_for_stabilizer(measure_qubit)
-                if data_qubits:
-                    circuit.gates.append(QuantumGate(
-                        type='CNOT',
-                        position={'qubit': data_qubits[layer % len(data_qubits)], 'step': current_step},
-                        control=measure_qubit
-                    ))
-            current_step += 1
+        for qubit in x_measure_qubits:
+            circuit.gates.append(QuantumGate(type='H', position={'qubit': qubit, 'step': 5}))
 
         # Measure syndrome qubits
         for qubit in range(self.num_data_qubits, total_qubits):
             circuit.gates.append(QuantumGate(
                 type='MEASURE',
-                position={'qubit': qubit, 'step': current_step}
+                position={'qubit': qubit, 'step': 6}
             ))
 
         return circuit
 
     def _get_data_qubits_for_stabilizer(self, measure_qubit: int) -> List[int]:
         """Get the data qubits involved in a stabilizer measurement."""
-        # This is a simplified version - real surface codes need more complex connectivity
-        measure_index = measure_qubit - self.num_data_qubits
-        row = measure_index // (self.distance - 1)
-        col = measure_index % (self.distance - 1)
-
-        data_qubits = []
-        if row % 2 == 0 and col % 2 == 0:  # X-stabilizer
-            data_qubits = [
-                row * self.distance + col,
-                row * self.distance + col + 1,
-                (row + 1) * self.distance + col,
-                (row + 1) * self.distance + col + 1
-            ]
-        elif row % 2 == 1 and col % 2 == 1:  # Z-stabilizer
-            data_qubits = [
-                row * self.distance + col,
-                row * self.distance + col + 1,
-                (row + 1) * self.distance + col,
-                (row + 1) * self.distance + col + 1
-            ]
-
-        return [q for q in data_qubits if q < self.num_data_qubits]
+        return np.flatnonzero(self.incidence[measure_qubit - self.num_data_qubits]).tolist()
+
+    def syndromes(self, x_errors: np.ndarray, z_errors: np.ndarray) -> np.ndarray:
+        """
+        Syndromes produced by batches of Pauli errors on the data qubits.
+
+        Args:
+            x_errors: ``(shots, data qubits)`` 0/1 matrix of X errors
+            z_errors: ``(shots, data qubits)`` 0/1 matrix of Z errors
+
+        Returns:
+            ``(shots, measurement qubits)`` uint8 syndrome matrix
+        """
+        x_errors = np.atleast_2d(np.asarray(x_errors, dtype=np.uint8))
+        z_errors = np.atleast_2d(np.asarray(z_errors, dtype=np.uint8))
+        incidence = self.incidence
+        syndromes = np.zeros((x_errors.shape[0], self.num_measure_qubits), dtype=np.uint8)
+        syndromes[:, self.x_stabilizers] = (z_errors @ incidence[self.x_stabilizers].T) & 1
+        syndromes[:, self.z_stabilizers] = (x_errors @ incidence[self.z_stabilizers].T) & 1
+        return syndromes
+
+    def decode_batch(self, syndromes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Decode a batch of syndromes.
+
+        Args:
+            syndromes: ``(shots, measurement qubits)`` 0/1 matrix, columns in
+                measurement qubit order
+
+        Returns:
+            ``(x_corrections, z_corrections)``, each a ``(shots, data qubits)``
+            uint8 matrix of data qubits to flip
+        """
+        syndromes = np.atleast_2d(np.asarray(syndromes, dtype=np.uint8))
+        if syndromes.ndim != 2 or syndromes.shape[1] != self.num_measure_qubits:
+            raise ValueError(f"Syndromes must be a (shots, {self.num_measure_qubits}) matrix")
+        x_corrections = self._layout.x_decoder.decode_batch(syndromes[:, self.z_stabilizers])
+        z_corrections = self._layout.z_decoder.decode_batch(syndromes[:, self.x_stabilizers])
+        return x_corrections, z_corrections
+
+    def logical_errors(self, x_residual: np.ndarray, z_residual: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Logical flips left by residual errors (errors combined with corrections).
+
+        Residuals must have a trivial syndrome. Returns boolean ``(x_flips,
+        z_flips)`` per shot: a residual X chain flips logical X when it
+        anticommutes with logical Z, and vice versa.
+        """
+        x_flips = ((np.atleast_2d(x_residual) @ self.logical_z) & 1).astype(bool)
+        z_flips = ((np.atleast_2d(z_residual) @ self.logical_x) & 1).astype(bool)
+        return x_flips, z_flips
 
     def decode_syndrome(self, syndrome: List[int]) -> List[Tuple[str, int]]:
         """
@@ -90,13 +400,7 @@ class SurfaceCode:
         Returns:
             List of (operation, qubit) tuples for error correction
         """
-        # Simplified minimum weight perfect matching decoder
-        corrections = []
-        for i, measurement in enumerate(syndrome):
-            if measurement == 1:  # Error detected
-                data_qubits = self._get_data_qubits_for_stabilizer(i + self.num_data_qubits)
-                if data_qubits:
-                    # Simple correction: apply X or Z to first connected data qubit
-                    op_type = 'X' if (i // (self.distance - 1)) % 2 == 0 else 'Z'
-                    corrections.append((op_type, data_qubits[0]))
+        x_corrections, z_corrections = self.decode_batch(np.asarray([syndrome]))
+        corrections = [('X', int(qubit)) for qubit in np.flatnonzero(x_corrections[0])]
+        corrections += [('Z', int(qubit)) for qubit in np.flatnonzero(z_corrections[0])]
         return corrections
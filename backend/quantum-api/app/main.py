@@ -1,20 +1,30 @@
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import (
+    FastAPI, HTTPException, Depends, Header, Query, Request, Response,
+    WebSocket, WebSocketDisconnect, status
+)
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordRequestForm
 from .models import (
     ExecutionRequest, ExecutionResult, ProviderType,
-    ChatMessage, ChatSession, QuantumCircuit
+    ChatMessage, ChatSession, QuantumCircuit, JobInfo, ExecutorMetrics,
+    BatchExecutionRequest, LogicalErrorSweepRequest
 )
-from .providers.ibm import IBMQuantumProvider
-from .providers.rigetti import RigettiQuantumProvider
-from .providers.google import GoogleQuantumProvider
-from .providers.microsoft import MicrosoftQuantumProvider
+from .providers.registry import create_providers, initialize_configured
+from .compiler import compile_circuit
+from .algorithms.templates import templates
 from .services.openai_service import OpenAIService
+from .services.executors import ProviderExecutors
+from .services.job_queue import JobQueue
+from .services.result_cache import ExecutionCache, is_simulator_request
+from .services.batch import expand_batch, run_batch
+from .error_correction.monte_carlo import estimate_logical_error_rates, validate_sweep
 from .security.auth import (
-    Token, User, create_access_token, get_current_user,
+    Token, User, create_access_token, get_current_user, user_from_token, check_scopes,
     verify_scope, get_password_hash, verify_password, get_user
 )
 from datetime import timedelta
+from typing import Dict, List, Optional
 import os
 from dotenv import load_dotenv
 
@@ -31,28 +41,37 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize providers
-ibm_provider = IBMQuantumProvider()
-rigetti_provider = RigettiQuantumProvider()
-google_provider = GoogleQuantumProvider()
-microsoft_provider = MicrosoftQuantumProvider()
+# Providers import their SDK on first use, so unconfigured vendors cost nothing at startup
+providers = create_providers()
+# Blocking SDK work runs on per-provider executors configured via
+# <PROVIDER>_EXECUTOR, <PROVIDER>_MAX_WORKERS and <PROVIDER>_MAX_CONCURRENCY
+executors = ProviderExecutors(providers)
+job_queue = JobQueue(executors)
+
+# Simulator results are served from memory (and optionally disk) for repeated runs
+execution_cache = ExecutionCache(
+    max_entries=int(os.getenv("EXECUTION_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("EXECUTION_CACHE_TTL", "3600")),
+    disk_path=os.getenv("EXECUTION_CACHE_DIR")
+)
+
+# Upper bound on executions per batch request, including sweep points
+max_batch_size = int(os.getenv("EXECUTION_BATCH_MAX", "1000"))
+
+# Logical error rate sweeps: worker processes (unset: one per CPU, 0: in-process) and total shot budget
+error_rate_workers = int(os.environ["ERROR_RATE_MAX_WORKERS"]) if os.getenv("ERROR_RATE_MAX_WORKERS") else None
+max_error_rate_shots = int(os.getenv("ERROR_RATE_MAX_SHOTS", "100000000"))
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize quantum providers on startup."""
-    ibm_token = os.getenv("IBM_QUANTUM_TOKEN")
-    rigetti_token = os.getenv("RIGETTI_API_KEY")
-    google_creds = os.getenv("GOOGLE_QUANTUM_CREDENTIALS")
-    ms_workspace = os.getenv("MICROSOFT_QUANTUM_WORKSPACE")
-
-    if ibm_token:
-        await ibm_provider.initialize(ibm_token)
-    if rigetti_token:
-        await rigetti_provider.initialize(rigetti_token)
-    if google_creds:
-        await google_provider.initialize(google_creds)
-    if ms_workspace:
-        await microsoft_provider.initialize(ms_workspace)
+    """Initialize the quantum providers that have credentials configured."""
+    await initialize_configured(providers)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background jobs and provider executors."""
+    job_queue.shutdown()
+    executors.shutdown()
 
 @app.post("/token", response_model=Token)
 async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends()):
@@ -74,42 +93,233 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
 @app.post("/api/execute", response_model=ExecutionResult)
 async def execute_circuit(
     request: ExecutionRequest,
+    response: Response,
+    cache_control: Optional[str] = Header(None),
     user: User = Depends(verify_scope(["execute"]))
 ) -> ExecutionResult:
-    """Execute a quantum circuit on the specified provider."""
+    """
+    Execute a quantum circuit on the specified provider.
+
+    Simulator results are cached; the X-Cache response header reports HIT,
+    MISS or BYPASS. Send ``Cache-Control: no-cache`` to force a fresh run.
+    """
+    if request.provider not in executors:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Provider {request.provider} not implemented yet"
+        )
+    try:
+        circuit = compile_circuit(request.circuit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    cacheable = is_simulator_request(request)
+    use_cache = cacheable and "no-cache" not in (cache_control or "").lower()
+    cache_key = execution_cache.key(request, circuit) if cacheable else None
+    if use_cache:
+        cached = execution_cache.get(cache_key)
+        if cached is not None:
+            response.headers["X-Cache"] = "HIT"
+            return cached
+
     try:
-        if request.provider == ProviderType.IBM:
-            return await ibm_provider.execute_circuit(
-                request.circuit,
-                shots=request.shots,
-                backend_name=request.backend_name
-            )
-        elif request.provider == ProviderType.RIGETTI:
-            return await rigetti_provider.execute_circuit(
-                request.circuit,
-                shots=request.shots,
-                backend_name=request.backend_name
-            )
-        elif request.provider == ProviderType.GOOGLE:
-            return await google_provider.execute_circuit(
-                request.circuit,
-                shots=request.shots,
-                backend_name=request.backend_name
-            )
-        elif request.provider == ProviderType.MICROSOFT:
-            return await microsoft_provider.execute_circuit(
-                request.circuit,
-                shots=request.shots,
-                backend_name=request.backend_name
-            )
-        else:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Provider {request.provider} not implemented yet"
-            )
+        result = await executors.run(request, circuit)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    if cacheable:
+        execution_cache.put(cache_key, result)
+    response.headers["X-Cache"] = "MISS" if use_cache else "BYPASS"
+    return result
+
+@app.post("/api/execute/batch")
+async def execute_batch(
+    batch: BatchExecutionRequest,
+    cache_control: Optional[str] = Header(None),
+    user: User = Depends(verify_scope(["execute"]))
+) -> StreamingResponse:
+    """
+    Execute many circuits, or one circuit over a parameter sweep, concurrently.
+
+    Results stream back as NDJSON, one ``BatchItemResult`` per line in
+    completion order; ``index`` refers to the position in ``requests``
+    followed by the sweep points. Identical executions run once.
+    """
+    try:
+        items = expand_batch(batch, max_items=max_batch_size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    unknown = {item.request.provider for item in items if item.request.provider not in executors}
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Provider {', '.join(sorted(p.value for p in unknown))} not implemented yet"
+        )
+
+    use_cache = "no-cache" not in (cache_control or "").lower()
+
+    async def result_stream():
+        async for item in run_batch(items, executors, execution_cache, use_cache=use_cache):
+            yield item.model_dump_json() + "\n"
+
+    return StreamingResponse(result_stream(), media_type="application/x-ndjson")
+
+@app.post("/api/jobs", response_model=JobInfo, status_code=status.HTTP_202_ACCEPTED)
+async def submit_job(
+    request: ExecutionRequest,
+    progress_interval: Optional[int] = Query(None, ge=1),
+    user: User = Depends(verify_scope(["execute"]))
+) -> JobInfo:
+    """
+    Queue a circuit for background execution and return the job immediately.
+
+    With ``progress_interval``, the job's event stream includes partial
+    counts every ``progress_interval`` shots.
+    """
+    try:
+        return job_queue.submit(request, owner=user.username, progress_interval=progress_interval)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.websocket("/api/jobs/ws")
+async def stream_jobs(
+    websocket: WebSocket,
+    token: str = Query(...),
+    progress_interval: int = Query(1024, ge=1)
+):
+    """
+    Submit circuits and stream their job events over a WebSocket.
+
+    Browsers cannot set headers on WebSocket requests, so the access token is
+    passed as a query parameter. Each client message is an ExecutionRequest;
+    the server replies with JobEvent messages (queued, compiling, running,
+    progress, then completed or failed) and then accepts the next request.
+    Events are only produced as fast as the client reads them: undelivered
+    partial counts are replaced by newer ones.
+    """
+    try:
+        user = check_scopes(user_from_token(token), ["execute"])
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    try:
+        while True:
+            message = await websocket.receive_text()
+            try:
+                request = ExecutionRequest.model_validate_json(message)
+                job = job_queue.submit(request, owner=user.username, progress_interval=progress_interval)
+            except ValueError as e:
+                await websocket.send_json({"type": "error", "detail": str(e)})
+                continue
+            async for event in job_queue.subscribe(job.id):
+                await websocket.send_text(event.model_dump_json())
+    except WebSocketDisconnect:
+        # The job keeps running and stays available from /api/jobs/{job_id}
+        pass
+
+def _get_owned_job(job_id: str, user: User) -> JobInfo:
+    job = job_queue.get(job_id)
+    if job is None or job.owner != user.username:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+@app.get("/api/jobs/{job_id}", response_model=JobInfo)
+async def get_job(
+    job_id: str,
+    user: User = Depends(verify_scope(["execute"]))
+) -> JobInfo:
+    """Get the status and, once finished, the result of a job."""
+    return _get_owned_job(job_id, user)
+
+@app.get("/api/jobs/{job_id}/events")
+async def stream_job_events(
+    job_id: str,
+    user: User = Depends(verify_scope(["execute"]))
+) -> StreamingResponse:
+    """Stream job status and progress updates as server-sent events until the job finishes."""
+    _get_owned_job(job_id, user)
+
+    async def event_stream():
+        async for event in job_queue.subscribe(job_id):
+            yield f"event: {event.type.value}\ndata: {event.job.model_dump_json()}\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+@app.get("/api/metrics/executors", response_model=List[ExecutorMetrics])
+async def executor_metrics(
+    user: User = Depends(verify_scope(["read"]))
+) -> List[ExecutorMetrics]:
+    """Queue depth, load and wait times of every provider executor."""
+    return executors.metrics()
+
+@app.get("/api/algorithms")
+async def list_algorithms(
+    user: User = Depends(verify_scope(["read"]))
+) -> List[Dict]:
+    """List the algorithm templates and the JSON schema of their parameters."""
+    return [
+        {
+            "name": template.name,
+            "description": template.description,
+            "parameters": template.parameters.model_json_schema()
+        }
+        for template in templates.available()
+    ]
+
+@app.get("/api/algorithms/{name}", response_model=QuantumCircuit)
+async def get_algorithm(
+    name: str,
+    request: Request,
+    user: User = Depends(verify_scope(["read"]))
+) -> Response:
+    """
+    Instantiate an algorithm template from query parameters.
+
+    Repeated parameters give list values, e.g. ``?qubits=3&marked_states=1&marked_states=6``.
+    Instances are memoized, so identical requests reuse the same circuit.
+    """
+    try:
+        template = templates.get_template(name)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+
+    list_fields = template.list_fields()
+    values = {
+        key: request.query_params.getlist(key) if key in list_fields else request.query_params[key]
+        for key in request.query_params.keys()
+    }
+    try:
+        content = templates.instantiate_json(name, **values)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return Response(content=content, media_type="application/json")
+
+@app.post("/api/error-correction/logical-error-rates")
+async def logical_error_rates(
+    sweep: LogicalErrorSweepRequest,
+    user: User = Depends(verify_scope(["execute"]))
+) -> StreamingResponse:
+    """
+    Estimate surface code logical error rates by Monte Carlo sampling.
+
+    Estimates stream back as NDJSON, one ``LogicalErrorEstimate`` per line:
+    partial ones as batches of a point finish, then a final one with
+    ``complete`` set. Sampling runs on a process pool.
+    """
+    try:
+        validate_sweep(sweep, max_total_shots=max_error_rate_shots)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def estimate_stream():
+        for estimate in estimate_logical_error_rates(sweep, max_workers=error_rate_workers):
+            yield estimate.model_dump_json() + "\n"
+
+    # Iterated on a worker thread, so waiting on the pool does not block the event loop
+    return StreamingResponse(estimate_stream(), media_type="application/x-ndjson")
+
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint."""
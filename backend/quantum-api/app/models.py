@@ -9,11 +9,18 @@ class ProviderType(str, Enum):
     RIGETTI = "rigetti"
     GOOGLE = "google"
     MICROSOFT = "microsoft"
+    LOCAL = "local"
 
 class QuantumGate(BaseModel):
     type: str
     position: Dict[str, int]
     control: Optional[int] = None
+    # Control qubits of multi-controlled gates such as MCZ
+    controls: Optional[List[int]] = None
+    # Rotation angle in radians for parameterized gates such as RZ and CPHASE
+    angle: Optional[float] = None
+    # Name of a sweep parameter that supplies the angle in batch executions
+    parameter: Optional[str] = None
 
 class QuantumCircuit(BaseModel):
     gates: List[QuantumGate]
@@ -27,6 +34,24 @@ class ExecutionRequest(BaseModel):
     provider: ProviderType
     shots: int = 1024
     backend_name: Optional[str] = None
+    seed: Optional[int] = None
+    optimize: bool = True
+    # Skip per-qubit state extraction when the client only needs counts
+    include_states: bool = True
+
+class BatchExecutionRequest(BaseModel):
+    requests: List[ExecutionRequest] = []
+    # Executed once per sweep point, with each named parameter's angle taken from `sweep`
+    base: Optional[ExecutionRequest] = None
+    sweep: Dict[str, List[float]] = {}
+
+class OptimizationReport(BaseModel):
+    original_gates: int
+    optimized_gates: int
+    gates_removed: int
+    cancelled: int
+    fused: int
+    dead: int
 
 class ExecutionResult(BaseModel):
     measurements: Dict[str, int]
@@ -34,6 +59,87 @@ class ExecutionResult(BaseModel):
     provider: ProviderType
     backend_used: str
     execution_time: float
+    optimization: Optional[OptimizationReport] = None
+
+class BatchItemResult(BaseModel):
+    index: int
+    parameters: Optional[Dict[str, float]] = None
+    result: Optional[ExecutionResult] = None
+    error: Optional[str] = None
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    COMPILING = "compiling"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+class JobProgress(BaseModel):
+    shots_completed: int
+    shots_total: int
+    counts: Dict[str, int]
+
+class JobInfo(BaseModel):
+    id: str
+    status: JobStatus
+    provider: ProviderType
+    owner: str
+    submitted_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    progress: Optional[JobProgress] = None
+    result: Optional[ExecutionResult] = None
+    error: Optional[str] = None
+
+class JobEventType(str, Enum):
+    QUEUED = "queued"
+    COMPILING = "compiling"
+    RUNNING = "running"
+    PROGRESS = "progress"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+class JobEvent(BaseModel):
+    type: JobEventType
+    job: JobInfo
+
+class ExecutorMetrics(BaseModel):
+    provider: ProviderType
+    kind: str
+    max_workers: int
+    max_concurrency: int
+    queue_depth: int
+    running: int
+    completed: int
+    failed: int
+    average_wait_time: float
+    max_wait_time: float
+
+class LogicalErrorSweepRequest(BaseModel):
+    distances: List[int]
+    physical_error_rates: List[float]
+    shots: int = 100000
+    # Syndrome readout flip probability; 0 gives a single perfect round (code capacity)
+    measurement_error_rate: float = 0.0
+    # Noisy syndrome rounds per shot; defaults to the distance when readout is noisy
+    rounds: Optional[int] = None
+    # Stop sampling a point once this many logical failures were seen
+    max_failures: Optional[int] = None
+    confidence: float = 0.95
+    seed: Optional[int] = None
+
+class LogicalErrorEstimate(BaseModel):
+    distance: int
+    physical_error_rate: float
+    measurement_error_rate: float
+    rounds: int
+    shots: int
+    failures: int
+    logical_error_rate: float
+    # Wilson score interval [low, high] at the requested confidence
+    confidence_interval: List[float]
+    # False for partial estimates streamed while the point is still sampling
+    complete: bool = False
 
 class ChatMessage(BaseModel):
     role: str
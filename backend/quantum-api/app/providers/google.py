@@ -1,98 +1,141 @@
 import cirq
 import cirq_google
 from ..models import QuantumCircuit, ExecutionResult, ProviderType
+from ..compiler.ir import CompiledCircuit, Op, compile_circuit
+from ..simulation.histogram import counts_from_bits
+from ..simulation.sampling import ProgressCallback, sample_counts
+from ..simulation.state_analysis import qubit_states
 import numpy as np
 import time
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Union
 from google.auth import credentials
+from .pool import BackendPool
 import os
 
 class GoogleQuantumProvider:
     def __init__(self):
         self._engine = None
-        self._processor = None
+        # Processor handles are fetched from the Engine once per name and reused
+        self._processors = BackendPool(
+            lambda name: self._engine.get_processor(name),
+            health_check=lambda processor: processor.health() == 'OK'
+        )
 
     async def initialize(self, credentials_path: str):
         """Initialize the Google Quantum provider with authentication."""
         os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = credentials_path
         self._engine = cirq_google.Engine()
+        self._processors.clear()
 
     async def get_backend(self, backend_name: Optional[str] = None) -> str:
         """Get the quantum backend to use for execution."""
         if backend_name:
-            self._processor = self._engine.get_processor(backend_name)
+            if self._engine is None:
+                raise ValueError("Provider not initialized. Call initialize() first.")
             return backend_name
         return "simulator"
 
-    def convert_circuit(self, circuit: QuantumCircuit) -> cirq.Circuit:
+    def convert_circuit(self, circuit: Union[QuantumCircuit, CompiledCircuit]) -> cirq.Circuit:
         """Convert our circuit format to Cirq's format."""
-        qubits = [cirq.LineQubit(i) for i in range(circuit.qubits)]
-        cirq_circuit = cirq.Circuit()
+        circuit = compile_circuit(circuit)
+        qubits = cirq.LineQubit.range(circuit.qubits)
+        operations = []
 
-        for gate in circuit.gates:
-            if gate.type == 'H':
-                cirq_circuit.append(cirq.H(qubits[gate.position['qubit']]))
-            elif gate.type == 'X':
-                cirq_circuit.append(cirq.X(qubits[gate.position['qubit']]))
-            elif gate.type == 'CNOT':
-                if gate.control is None:
-                    raise ValueError("CNOT gate requires a control qubit")
-                cirq_circuit.append(cirq.CNOT(
-                    qubits[gate.control],
-                    qubits[gate.position['qubit']]
-                ))
-            elif gate.type == 'MEASURE':
-                cirq_circuit.append(cirq.measure(
-                    qubits[gate.position['qubit']],
-                    key=f'q{gate.position["qubit"]}'
+        for opcode, target, control, param in circuit.operations():
+            if opcode == Op.H:
+                operations.append(cirq.H(qubits[target]))
+            elif opcode == Op.X:
+                operations.append(cirq.X(qubits[target]))
+            elif opcode == Op.CNOT:
+                operations.append(cirq.CNOT(qubits[control], qubits[target]))
+            elif opcode == Op.RZ:
+                operations.append(cirq.rz(circuit.angles[param])(qubits[target]))
+            elif opcode == Op.CPHASE:
+                # CZ**t applies a phase of e^{i pi t} to |11>
+                operations.append(cirq.CZPowGate(exponent=circuit.angles[param] / np.pi)(qubits[control], qubits[target]))
+            elif opcode == Op.SWAP:
+                operations.append(cirq.SWAP(qubits[control], qubits[target]))
+            elif opcode == Op.MCZ:
+                operations.append(cirq.Z(qubits[target]).controlled_by(
+                    *(qubits[q] for q in circuit.controls_of(param))
                 ))
+            elif opcode == Op.MEASURE:
+                operations.append(cirq.measure(qubits[target], key=f'q{target}'))
+            elif opcode == Op.U:
+                raise ValueError("Fused gates are not supported on Google backends")
 
-        return cirq_circuit
+        return cirq.Circuit(operations)
 
     def _process_results(self, result: cirq.Result, num_qubits: int) -> Dict[str, int]:
         """Process measurement results into counts dictionary."""
-        counts = {}
-        for measurement in result.measurements.values():
-            # Convert measurement array to binary string
-            binary = ''.join(str(int(bit)) for bit in measurement[0])
-            counts[binary] = counts.get(binary, 0) + 1
-        return counts
+        # Assemble every measurement key into one (shots, qubits) register matrix
+        shots = next(iter(result.measurements.values())).shape[0] if result.measurements else 0
+        bits = np.zeros((shots, num_qubits), dtype=np.uint8)
+        for key, measurement in result.measurements.items():
+            # Keys are 'q<index>' as assigned in convert_circuit
+            bits[:, int(key[1:])] = measurement[:, -1]
+        return counts_from_bits(bits)
+
+    async def execute_circuit(
+        self,
+        circuit: Union[QuantumCircuit, CompiledCircuit],
+        shots: int = 1024,
+        backend_name: Optional[str] = None,
+        seed: Optional[int] = None,
+        include_states: bool = True,
+        progress: Optional[ProgressCallback] = None,
+        progress_interval: int = 1024
+    ) -> ExecutionResult:
+        """
+        Execute a quantum circuit on Google Quantum hardware or simulator.
 
-    async def execute_circuit(self, circuit: QuantumCircuit, shots: int = 1024, backend_name: Optional[str] = None) -> ExecutionResult:
-        """Execute a quantum circuit on Google Quantum hardware or simulator."""
+        On the simulator, circuits whose measurements are all terminal are
+        simulated once: states and counts both come from the final state, and
+        ``progress`` receives the cumulative counts every ``progress_interval``
+        shots. Other runs return all shots at once.
+        """
         start_time = time.time()
 
         try:
             backend = await self.get_backend(backend_name)
+            circuit = compile_circuit(circuit)
             cirq_circuit = self.convert_circuit(circuit)
 
             if backend == "simulator":
                 # Use Cirq's simulator
-                simulator = cirq.Simulator()
-                result = simulator.run(cirq_circuit, repetitions=shots)
-
-                # For simulator, we can get the final state
-                final_state_vector = simulator.simulate(cirq_circuit).final_state_vector
+                simulator = cirq.Simulator(seed=seed)
+                terminal = circuit.is_measurement_terminal()
                 states = []
-                for i in range(circuit.qubits):
-                    # Calculate single-qubit state from state vector
-                    qubit_state = final_state_vector[i*2:(i+1)*2]
-                    states.append({
-                        'qubit': i,
-                        'state': {
-                            'alpha': float(np.abs(qubit_state[0])),
-                            'beta': float(np.abs(qubit_state[1]))
-                        }
-                    })
+                if include_states or terminal:
+                    # State before the first measurement; big-endian over all qubits.
+                    # In a terminal circuit gates after a measurement act on other
+                    # qubits, so they are moved ahead of it
+                    ordered = circuit.measurements_last() if terminal else circuit
+                    prefix = self.convert_circuit(ordered.head(ordered.first_measurement()))
+                    final_state_vector = simulator.simulate(
+                        prefix, qubit_order=cirq.LineQubit.range(circuit.qubits)
+                    ).final_state_vector
+                    if include_states:
+                        states = qubit_states(final_state_vector)
+
+                if terminal:
+                    # Sample every shot from the simulated state instead of re-running the circuit
+                    probabilities = (np.abs(final_state_vector) ** 2).reshape((2,) * circuit.qubits)
+                    measured = circuit.measured_qubits().tolist() or list(range(circuit.qubits))
+                    counts = sample_counts(
+                        probabilities, measured, shots, np.random.default_rng(seed), progress, progress_interval
+                    )
+                else:
+                    counts = self._process_results(simulator.run(cirq_circuit, repetitions=shots), circuit.qubits)
             else:
                 # Use Google Quantum hardware
-                result = self._processor.run(
-                    program=cirq_circuit,
-                    repetitions=shots,
-                )
+                with self._processors.lease(backend) as processor:
+                    result = processor.run(
+                        program=cirq_circuit,
+                        repetitions=shots,
+                    )
                 states = []  # Hardware execution doesn't provide state vector
-
-            counts = self._process_results(result, circuit.qubits)
+                counts = self._process_results(result, circuit.qubits)
 
             return ExecutionResult(
                 measurements=counts,
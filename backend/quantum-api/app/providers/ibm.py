@@ -1,73 +1,115 @@
 from qiskit import IBMQ, QuantumCircuit as QiskitCircuit, QuantumRegister, ClassicalRegister
 from qiskit.providers.ibmq import IBMQBackend
 from ..models import QuantumCircuit, ExecutionResult, ProviderType
+from ..compiler.ir import CompiledCircuit, Op, compile_circuit
+from ..simulation.sampling import ProgressCallback
+from ..simulation.state_analysis import qubit_states
+from .pool import BackendPool
+import numpy as np
 import time
-from typing import Optional
+from typing import Optional, Union
 
 class IBMQuantumProvider:
+    # Qiskit transpiles arbitrary single-qubit unitaries for any backend
+    SUPPORTS_FUSED_GATES = True
+
     def __init__(self):
         self._provider = None
+        # Backend lookups query the account's backend list, so handles are reused per name
+        self._backends = BackendPool(
+            lambda name: self._provider.get_backend(name),
+            health_check=lambda backend: backend.status().operational
+        )
 
     async def initialize(self, token: str):
         """Initialize the IBM Quantum provider with authentication token."""
         IBMQ.save_account(token, overwrite=True)
         self._provider = IBMQ.load_account()
+        self._backends.clear()
 
     async def get_backend(self, backend_name: Optional[str] = None) -> IBMQBackend:
         """Get the quantum backend to use for execution."""
         if not self._provider:
             raise ValueError("Provider not initialized. Call initialize() first.")
 
-        if backend_name:
-            return self._provider.get_backend(backend_name)
-        return self._provider.get_backend('ibmq_qasm_simulator')
+        name = backend_name or 'ibmq_qasm_simulator'
+        backend = self._backends.acquire(name)
+        # Backends are safe to share between jobs, so the handle goes straight back
+        self._backends.release(name, backend)
+        return backend
 
-    def convert_circuit(self, circuit: QuantumCircuit) -> QiskitCircuit:
+    def convert_circuit(self, circuit: Union[QuantumCircuit, CompiledCircuit]) -> QiskitCircuit:
         """Convert our circuit format to Qiskit's format."""
+        circuit = compile_circuit(circuit)
         qr = QuantumRegister(circuit.qubits)
         cr = ClassicalRegister(circuit.qubits)
         qc = QiskitCircuit(qr, cr)
 
-        for gate in circuit.gates:
-            if gate.type == 'H':
-                qc.h(gate.position['qubit'])
-            elif gate.type == 'X':
-                qc.x(gate.position['qubit'])
-            elif gate.type == 'CNOT':
-                if gate.control is None:
-                    raise ValueError("CNOT gate requires a control qubit")
-                qc.cx(gate.control, gate.position['qubit'])
-            elif gate.type == 'MEASURE':
-                qc.measure(gate.position['qubit'], gate.position['qubit'])
+        for opcode, target, control, param in circuit.operations():
+            if opcode == Op.H:
+                qc.h(target)
+            elif opcode == Op.X:
+                qc.x(target)
+            elif opcode == Op.CNOT:
+                qc.cx(control, target)
+            elif opcode == Op.RZ:
+                qc.rz(float(circuit.angles[param]), target)
+            elif opcode == Op.CPHASE:
+                qc.cp(float(circuit.angles[param]), control, target)
+            elif opcode == Op.SWAP:
+                qc.swap(control, target)
+            elif opcode == Op.MCZ:
+                controls = circuit.controls_of(param)
+                if controls:
+                    qc.h(target)
+                    qc.mcx(controls, target)
+                    qc.h(target)
+                else:
+                    qc.z(target)
+            elif opcode == Op.MEASURE:
+                qc.measure(target, target)
+            elif opcode == Op.U:
+                qc.unitary(circuit.unitaries[param], [target])
 
         return qc
 
-    async def execute_circuit(self, circuit: QuantumCircuit, shots: int = 1024, backend_name: Optional[str] = None) -> ExecutionResult:
-        """Execute a quantum circuit on IBM Quantum hardware or simulator."""
+    async def execute_circuit(
+        self,
+        circuit: Union[QuantumCircuit, CompiledCircuit],
+        shots: int = 1024,
+        backend_name: Optional[str] = None,
+        seed: Optional[int] = None,
+        include_states: bool = True,
+        progress: Optional[ProgressCallback] = None,
+        progress_interval: int = 1024
+    ) -> ExecutionResult:
+        """
+        Execute a quantum circuit on IBM Quantum hardware or simulator.
+
+        Jobs return every shot at once, so ``progress`` is never called;
+        job lifecycle events are still reported by the job queue.
+        """
         start_time = time.time()
 
         backend = await self.get_backend(backend_name)
+        circuit = compile_circuit(circuit)
         qiskit_circuit = self.convert_circuit(circuit)
 
-        job = backend.run(qiskit_circuit, shots=shots)
+        run_options = {'seed_simulator': seed} if seed is not None else {}
+        job = backend.run(qiskit_circuit, shots=shots, **run_options)
         result = job.result()
 
         counts = result.get_counts()
         statevector = None
-        if hasattr(result, 'get_statevector'):
+        if include_states and hasattr(result, 'get_statevector'):
             statevector = result.get_statevector()
 
         # Convert results to our format
         states = []
-        if statevector:
-            for i in range(circuit.qubits):
-                states.append({
-                    'qubit': i,
-                    'state': {
-                        'alpha': abs(statevector[i*2]),
-                        'beta': abs(statevector[i*2 + 1])
-                    }
-                })
+        if statevector is not None:
+            # Qiskit orders amplitudes with qubit 0 as the least significant bit
+            tensor = np.asarray(statevector).reshape((2,) * circuit.qubits).transpose()
+            states = qubit_states(tensor)
 
         return ExecutionResult(
             measurements=counts,
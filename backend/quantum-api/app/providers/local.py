@@ -0,0 +1,219 @@
+from ..models import QuantumCircuit, ExecutionResult, ProviderType
+from ..compiler.ir import CompiledCircuit, Op, compile_circuit
+from ..simulation.statevector import StatevectorSimulator
+from ..simulation.sparse import SparseStatevectorSimulator
+from ..simulation.stabilizer import StabilizerSimulator, is_clifford
+from ..simulation.sampling import ProgressCallback
+import numpy as np
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Union
+
+Simulator = Union[StatevectorSimulator, SparseStatevectorSimulator, StabilizerSimulator]
+
+class LocalStatevectorProvider:
+    """
+    Built-in NumPy statevector simulator that needs no vendor SDK.
+
+    The "statevector" backend always stores all ``2^n`` amplitudes and
+    "sparse" only the nonzero ones. "stabilizer" simulates Clifford circuits
+    in polynomial time and memory, at any width up to ``max_qubits``. "auto"
+    (the default) picks the stabilizer engine for Clifford circuits of at
+    least ``stabilizer_min_qubits`` qubits; otherwise it starts sparse and
+    switches to a dense vector once more than ``sparse_density`` of the basis
+    states are occupied.
+    """
+
+    BACKENDS = ("auto", "statevector", "sparse", "stabilizer")
+    # The simulator applies fused single-qubit unitaries directly
+    SUPPORTS_FUSED_GATES = True
+
+    def __init__(
+        self,
+        max_qubits: int = 4096,
+        state_cache_bytes: int = 256 * 2 ** 20,
+        max_dense_qubits: int = 28,
+        sparse_density: float = 1 / 16,
+        max_sparse_amplitudes: int = 2 ** 24,
+        stabilizer_min_qubits: int = 16
+    ):
+        self.max_qubits = max_qubits
+        self.state_cache_bytes = state_cache_bytes
+        self.max_dense_qubits = max_dense_qubits
+        self.sparse_density = sparse_density
+        self.max_sparse_amplitudes = max_sparse_amplitudes
+        self.stabilizer_min_qubits = stabilizer_min_qubits
+        # Circuit fingerprint -> simulated pre-measurement state, in LRU order
+        self._states: "OrderedDict[str, Simulator]" = OrderedDict()
+        self._cached_bytes = 0
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Process-pool workers start with an empty cache and their own lock
+        return {
+            'max_qubits': self.max_qubits,
+            'state_cache_bytes': self.state_cache_bytes,
+            'max_dense_qubits': self.max_dense_qubits,
+            'sparse_density': self.sparse_density,
+            'max_sparse_amplitudes': self.max_sparse_amplitudes,
+            'stabilizer_min_qubits': self.stabilizer_min_qubits
+        }
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    async def initialize(self, *args, **kwargs):
+        """The local simulator needs no authentication."""
+
+    async def get_backend(self, backend_name: Optional[str] = None) -> str:
+        """Get the simulation backend to use for execution."""
+        if backend_name and backend_name not in self.BACKENDS:
+            raise ValueError(f"Unknown local backend: {backend_name}")
+        return backend_name or "auto"
+
+    def convert_circuit(self, circuit: Union[QuantumCircuit, CompiledCircuit]) -> CompiledCircuit:
+        """Compile and validate the circuit for the local simulator."""
+        compiled = compile_circuit(circuit)
+        if compiled.qubits > self.max_qubits:
+            raise ValueError(
+                f"Circuit has {compiled.qubits} qubits; the local simulator supports at most {self.max_qubits}"
+            )
+        return compiled
+
+    def _simulate(self, circuit: CompiledCircuit, stop: int, backend: str) -> Simulator:
+        """Simulate the gates before ``stop`` with the engine selected by ``backend``."""
+        if backend == "auto" and circuit.qubits >= self.stabilizer_min_qubits and is_clifford(circuit):
+            backend = "stabilizer"
+        if backend == "stabilizer":
+            return StabilizerSimulator(circuit, stop)
+        if backend == "auto" and 2.0 ** -circuit.qubits >= self.sparse_density:
+            # Even |0...0> alone is too dense for the register to be worth tracking sparsely
+            backend = "statevector"
+        if backend == "statevector":
+            if circuit.qubits > self.max_dense_qubits:
+                raise ValueError(
+                    f"Circuit has {circuit.qubits} qubits; dense statevector simulation "
+                    f"supports at most {self.max_dense_qubits}"
+                )
+            simulator = StatevectorSimulator(circuit.qubits)
+            simulator.apply(circuit.operations(0, stop), circuit)
+            return simulator
+
+        may_densify = backend == "auto" and circuit.qubits <= self.max_dense_qubits
+        operations = list(circuit.operations(0, stop))
+        simulator = SparseStatevectorSimulator(circuit.qubits)
+        for index, operation in enumerate(operations):
+            simulator.apply([operation], circuit)
+            if may_densify and simulator.density > self.sparse_density:
+                dense = simulator.to_dense()
+                dense.apply(operations[index + 1:], circuit)
+                return dense
+            if simulator.nnz > self.max_sparse_amplitudes:
+                raise ValueError(
+                    f"State has more than {self.max_sparse_amplitudes} nonzero amplitudes; "
+                    f"too dense for sparse simulation of {circuit.qubits} qubits"
+                )
+        return simulator
+
+    def _prepare_state(self, circuit: CompiledCircuit, stop: int, backend: str = "auto") -> Simulator:
+        """Simulate the gates before ``stop``, reusing the exact state of an identical earlier circuit."""
+        fingerprint = circuit.fingerprint()
+        key = fingerprint if backend == "auto" else f"{backend}:{fingerprint}"
+        with self._lock:
+            cached = self._states.get(key)
+            if cached is not None:
+                self._states.move_to_end(key)
+                return cached
+
+        simulator = self._simulate(circuit, stop, backend)
+
+        size = simulator.nbytes
+        if size <= self.state_cache_bytes:
+            with self._lock:
+                if key not in self._states:
+                    self._states[key] = simulator
+                    self._cached_bytes += size
+                while self._cached_bytes > self.state_cache_bytes:
+                    _, evicted = self._states.popitem(last=False)
+                    self._cached_bytes -= evicted.nbytes
+        return simulator
+
+    def _run_trajectories(
+        self,
+        prefix: Simulator,
+        circuit: CompiledCircuit,
+        start: int,
+        shots: int,
+        rng: np.random.Generator,
+        progress: Optional[ProgressCallback] = None,
+        progress_interval: int = 1024
+    ) -> Dict[str, int]:
+        """Re-simulate the circuit from ``start`` (the first measurement) once per shot."""
+        suffix = list(circuit.operations(start))
+        counts = {}
+        for shot in range(1, shots + 1):
+            simulator = prefix.copy()
+            register = ['0'] * circuit.qubits
+            for operation in suffix:
+                if operation[0] == Op.MEASURE:
+                    register[operation[1]] = str(simulator.measure(operation[1], rng))
+                else:
+                    simulator.apply([operation], circuit)
+            binary = ''.join(register)
+            counts[binary] = counts.get(binary, 0) + 1
+            if progress is not None and (shot % progress_interval == 0 or shot == shots):
+                progress(dict(counts), shot)
+        return counts
+
+    async def execute_circuit(
+        self,
+        circuit: Union[QuantumCircuit, CompiledCircuit],
+        shots: int = 1024,
+        backend_name: Optional[str] = None,
+        seed: Optional[int] = None,
+        include_states: bool = True,
+        progress: Optional[ProgressCallback] = None,
+        progress_interval: int = 1024
+    ) -> ExecutionResult:
+        """
+        Execute a quantum circuit on the local statevector simulator.
+
+        ``progress`` receives the cumulative counts every ``progress_interval`` shots.
+        """
+        start_time = time.time()
+
+        try:
+            backend = await self.get_backend(backend_name)
+            compiled = self.convert_circuit(circuit)
+            rng = np.random.default_rng(seed)
+
+            terminal = compiled.is_measurement_terminal()
+            if terminal:
+                # Gates after a measurement act on other qubits and commute past it
+                compiled = compiled.measurements_last()
+            first_measurement = compiled.first_measurement()
+            # Cached states are shared: sampling reads them and trajectories copy them
+            simulator = self._prepare_state(compiled, first_measurement, backend)
+            states = simulator.qubit_states() if include_states else []
+
+            if terminal or simulator.METHOD == "stabilizer":
+                # All measurements are terminal: simulate once and sample every shot.
+                # The stabilizer engine samples mid-circuit measurements itself
+                measured = compiled.measured_qubits().tolist() or list(range(compiled.qubits))
+                counts = simulator.sample_counts(measured, shots, rng, progress, progress_interval)
+            else:
+                counts = self._run_trajectories(
+                    simulator, compiled, first_measurement, shots, rng, progress, progress_interval
+                )
+
+            return ExecutionResult(
+                measurements=counts,
+                states=states,
+                provider=ProviderType.LOCAL,
+                backend_used=simulator.METHOD,
+                execution_time=time.time() - start_time
+            )
+
+        except Exception as e:
+            raise Exception(f"Local simulator execution error: {str(e)}")
@@ -1,109 +1,256 @@
 import qsharp
 from ..models import QuantumCircuit, ExecutionResult, ProviderType
+from ..compiler.ir import CompiledCircuit, Op, compile_circuit
+from ..simulation.sampling import ProgressCallback, sample_counts
+from ..simulation.state_analysis import qubit_states
 import numpy as np
+import os
+import shutil
+import tempfile
+import threading
 import time
-from typing import Optional, Dict, List
+from collections import OrderedDict
+from typing import Optional, Dict, List, Union
 import json
 
 class MicrosoftQuantumProvider:
-    def __init__(self):
+    # Every qubit is measured and the final state is reported, so gates on
+    # qubits without an explicit measurement are observable
+    READS_ALL_QUBITS = True
+
+    def __init__(self, max_cached_operations: int = 64):
         self._workspace = None
+        self.max_cached_operations = max_cached_operations
+        # Circuit fingerprint -> Q# namespace of the compiled operations, in LRU order
+        self._compiled: "OrderedDict[str, str]" = OrderedDict()
+        self._compile_count = 0
+        # The Q# interpreter is process-global, so compilation and simulation are serialized
+        self._lock = threading.RLock()
+        # Thread that created the current interpreter, or None before the first run
+        self._interpreter_thread: Optional[int] = None
+        self._source_dir = tempfile.mkdtemp(prefix=f"qsharp-{os.getpid()}-")
 
     async def initialize(self, workspace_path: Optional[str] = None):
-        """Initialize the Microsoft Quantum provider."""
+        """
+        Initialize the Microsoft Quantum provider.
+
+        The Q# interpreter itself is created on the first execution, on the
+        thread that runs it.
+        """
         if workspace_path:
             self._workspace = workspace_path
-        # Initialize Q# runtime
+        with self._lock:
+            self._interpreter_thread = None
+
+    def _ensure_interpreter(self):
+        """
+        Create the Q# interpreter on the calling thread unless it already owns it.
+
+        The interpreter is a pyo3 object bound to the thread that created it and
+        panics when used from any other, so it cannot be created in
+        ``initialize`` on the event loop and used from an executor thread.
+        """
+        thread = threading.get_ident()
+        if self._interpreter_thread == thread:
+            return
         qsharp.init()
+        # Re-initializing drops every previously compiled operation
+        self._compiled.clear()
+        shutil.rmtree(self._source_dir, ignore_errors=True)
+        os.makedirs(self._source_dir, exist_ok=True)
+        self._interpreter_thread = thread
 
-    def _generate_qsharp_operation(self, circuit: QuantumCircuit) -> str:
-        """Generate Q# operation from circuit."""
+    def _generate_qsharp_operation(self, circuit: Union[QuantumCircuit, CompiledCircuit], namespace: str = "QuantumCircuit") -> str:
+        """
+        Generate Q# operations from circuit.
+
+        PrepareCircuit applies the gates before the first measurement, which
+        is the state reported back; RunCircuit continues from there, measuring
+        in place so mid-circuit measurements collapse the state, and finally
+        reads out every qubit.
+        """
+        circuit = compile_circuit(circuit)
+        # In a terminal circuit gates after a measurement act on other qubits,
+        # so moving measurements last leaves the whole circuit in PrepareCircuit
+        if circuit.is_measurement_terminal():
+            circuit = circuit.measurements_last()
+        first = circuit.first_measurement()
         operation = """
-namespace QuantumCircuit {
+namespace %s {
     open Microsoft.Quantum.Canon;
     open Microsoft.Quantum.Intrinsic;
     open Microsoft.Quantum.Measurement;
 
-    operation RunCircuit() : (Result[], Double[]) {
+    operation PrepareCircuit(qubits : Qubit[]) : Unit {
+        // Apply circuit operations
+""" % namespace
+        operation += self._qsharp_statements(circuit, 0, first)
+
+        # Add the state dump and measuring entry points
+        operation += """
+    }
+
+    operation DumpState() : Unit {
         use qubits = Qubit[%d];
-        mutable results = new Result[%d];
-        mutable phases = new Double[%d];
+        PrepareCircuit(qubits);
+        Microsoft.Quantum.Diagnostics.DumpMachine();
+        ResetAll(qubits);
+    }
 
-        // Apply circuit operations
-""" % (circuit.qubits, circuit.qubits, circuit.qubits)
+    operation RunCircuit() : Result[] {
+        use qubits = Qubit[%d];
+        mutable results = [Zero, size = %d];
 
-        # Add gates
-        for gate in circuit.gates:
-            if gate.type == 'H':
-                operation += f"        H(qubits[{gate.position['qubit']}]);\n"
-            elif gate.type == 'X':
-                operation += f"        X(qubits[{gate.position['qubit']}]);\n"
-            elif gate.type == 'CNOT':
-                if gate.control is None:
-                    raise ValueError("CNOT gate requires a control qubit")
-                operation += f"        CNOT(qubits[{gate.control}], qubits[{gate.position['qubit']}]);\n"
-
-        # Add measurements and state extraction
+        PrepareCircuit(qubits);
+""" % (circuit.qubits, circuit.qubits, circuit.qubits)
+        operation += self._qsharp_statements(circuit, first, None)
         operation += """
-        // Measure qubits and get phases
-        for (idx in 0..Length(qubits)-1) {
-            if (idx < Length(results)) {
-                set results w/= idx <- M(qubits[idx]);
-            }
-            // Get phase information (only works in simulation)
-            let amp = Microsoft.Quantum.Diagnostics.DumpMachine([qubits[idx]]);
-            set phases w/= idx <- amp[0];
+        for idx in 0..Length(qubits) - 1 {
+            set results w/= idx <- M(qubits[idx]);
         }
 
         // Reset qubits
         ResetAll(qubits);
 
-        return (results, phases);
+        return results;
     }
 }
 """
         return operation
 
-    async def execute_circuit(self, circuit: QuantumCircuit, shots: int = 1024, backend_name: Optional[str] = None) -> ExecutionResult:
-        """Execute a quantum circuit using Q#."""
+    def _qsharp_statements(self, circuit: CompiledCircuit, start: int, stop: Optional[int]) -> str:
+        """Q# statements applying the circuit's operations between ``start`` and ``stop``."""
+        lines = []
+        for opcode, target, control, param in circuit.operations(start, stop):
+            if opcode == Op.H:
+                lines.append(f"        H(qubits[{target}]);\n")
+            elif opcode == Op.X:
+                lines.append(f"        X(qubits[{target}]);\n")
+            elif opcode == Op.CNOT:
+                lines.append(f"        CNOT(qubits[{control}], qubits[{target}]);\n")
+            elif opcode == Op.RZ:
+                lines.append(f"        Rz({float(circuit.angles[param])!r}, qubits[{target}]);\n")
+            elif opcode == Op.CPHASE:
+                lines.append(
+                    f"        Controlled R1([qubits[{control}]], ({float(circuit.angles[param])!r}, qubits[{target}]));\n"
+                )
+            elif opcode == Op.SWAP:
+                lines.append(f"        SWAP(qubits[{control}], qubits[{target}]);\n")
+            elif opcode == Op.MCZ:
+                controls = ', '.join(f"qubits[{q}]" for q in circuit.controls_of(param))
+                lines.append(f"        Controlled Z([{controls}], qubits[{target}]);\n")
+            elif opcode == Op.MEASURE:
+                lines.append(f"        set results w/= {target} <- M(qubits[{target}]);\n")
+            elif opcode == Op.U:
+                raise ValueError("Fused gates are not supported by Q# operation generation")
+        return ''.join(lines)
+
+    def _compile_operation(self, circuit: CompiledCircuit) -> str:
+        """
+        Compile the circuit's Q# operations once and return their namespace.
+
+        Compiled namespaces are cached by circuit fingerprint, so repeated
+        executions of the same circuit skip code generation and compilation.
+        """
+        fingerprint = circuit.fingerprint()
+        with self._lock:
+            self._ensure_interpreter()
+            namespace = self._compiled.get(fingerprint)
+            if namespace is not None:
+                self._compiled.move_to_end(fingerprint)
+                return namespace
+
+            # Q# declarations cannot be removed from the interpreter, so every
+            # compilation gets a fresh namespace even if the circuit was evicted before
+            self._compile_count += 1
+            namespace = f"QuantumCircuit_{fingerprint[:16]}_{self._compile_count}"
+            qsharp_code = self._generate_qsharp_operation(circuit, namespace)
+
+            # Keep generated sources in a per-process directory for diagnostics
+            source_path = os.path.join(self._source_dir, f"{namespace}.qs")
+            with open(source_path, "w") as f:
+                f.write(qsharp_code)
+            qsharp.eval(qsharp_code)
+
+            self._compiled[fingerprint] = namespace
+            while len(self._compiled) > self.max_cached_operations:
+                _, evicted = self._compiled.popitem(last=False)
+                try:
+                    os.remove(os.path.join(self._source_dir, f"{evicted}.qs"))
+                except FileNotFoundError:
+                    pass
+            return namespace
+
+    def _simulate_state(self, namespace: str, num_qubits: int) -> np.ndarray:
+        """Run PrepareCircuit once and return the final amplitudes as a ``(2,) * n`` tensor."""
+        # The qubits are allocated inside the operation, so they are released when it returns
+        dump = qsharp.eval(f"{namespace}.DumpState()", save_events=True)["dumps"][-1]
+        # Dense amplitudes are ordered with qubit 0 as the most significant bit
+        amplitudes = np.asarray(dump.as_dense_state(), dtype=np.complex128)
+        return amplitudes.reshape((2,) * num_qubits)
+
+    def _run_shots(
+        self,
+        namespace: str,
+        num_qubits: int,
+        shots: int,
+        include_states: bool = True,
+        progress: Optional[ProgressCallback] = None,
+        progress_interval: int = 1024
+    ):
+        """Simulate the full operation once per shot; states come from one extra state simulation."""
+        counts = {}
+
+        for shot, results in enumerate(qsharp.run(f"{namespace}.RunCircuit()", shots=shots), 1):
+            # Convert results to binary string
+            binary = ''.join('1' if r == qsharp.Result.One else '0' for r in results)
+            counts[binary] = counts.get(binary, 0) + 1
+            if progress is not None and (shot % progress_interval == 0 or shot == shots):
+                progress(dict(counts), shot)
+
+        # Amplitudes cannot be read inside a Q# operation, so the state is dumped separately
+        states = qubit_states(self._simulate_state(namespace, num_qubits)) if include_states else []
+        return counts, states
+
+    async def execute_circuit(
+        self,
+        circuit: Union[QuantumCircuit, CompiledCircuit],
+        shots: int = 1024,
+        backend_name: Optional[str] = None,
+        seed: Optional[int] = None,
+        include_states: bool = True,
+        sample_final_state: bool = True,
+        progress: Optional[ProgressCallback] = None,
+        progress_interval: int = 1024
+    ) -> ExecutionResult:
+        """
+        Execute a quantum circuit using Q#.
+
+        When ``sample_final_state`` is set and every measurement is terminal, the
+        circuit is simulated once and all shots are sampled from the final state
+        instead of re-running the simulation for every shot. ``progress``
+        receives the cumulative counts every ``progress_interval`` shots.
+        """
         start_time = time.time()
 
         try:
-            # Generate and compile Q# operation
-            qsharp_code = self._generate_qsharp_operation(circuit)
-            with open("temp_circuit.qs", "w") as f:
-                f.write(qsharp_code)
+            # Generate and compile Q# operation (cached by circuit fingerprint)
+            circuit = compile_circuit(circuit)
+            namespace = self._compile_operation(circuit)
 
-            # Reload Q# environment with new operation
-            qsharp.reload()
-
-            # Import the operation
-            from QuantumCircuit import RunCircuit
-
-            # Execute circuit multiple times
-            counts = {}
-            all_phases = []
-
-            for _ in range(shots):
-                results, phases = RunCircuit.simulate()
-                # Convert results to binary string
-                binary = ''.join('1' if r else '0' for r in results)
-                counts[binary] = counts.get(binary, 0) + 1
-                all_phases.append(phases)
-
-            # Process state information
-            states = []
-            if all_phases:
-                # Average phases over all shots
-                avg_phases = np.mean(all_phases, axis=0)
-                for i in range(circuit.qubits):
-                    states.append({
-                        'qubit': i,
-                        'state': {
-                            'alpha': float(np.abs(avg_phases[i])),
-                            'beta': float(np.sqrt(1 - np.abs(avg_phases[i])**2))
-                        }
-                    })
+            with self._lock:
+                if sample_final_state and circuit.is_measurement_terminal():
+                    # Simulate once and draw every shot from the final state
+                    amplitudes = self._simulate_state(namespace, circuit.qubits)
+                    rng = np.random.default_rng(seed)
+                    counts = sample_counts(
+                        np.abs(amplitudes) ** 2, range(circuit.qubits), shots, rng, progress, progress_interval
+                    )
+                    states = qubit_states(amplitudes) if include_states else []
+                else:
+                    counts, states = self._run_shots(
+                        namespace, circuit.qubits, shots, include_states, progress, progress_interval
+                    )
 
             return ExecutionResult(
                 measurements=counts,
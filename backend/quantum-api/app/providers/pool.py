@@ -0,0 +1,105 @@
+"""
+Pool of reusable SDK backend handles.
+
+Opening a backend (``get_qc``, ``Engine.get_processor``, ``get_backend``)
+involves network round trips and compilation setup, so providers lease
+handles from a per-backend-name pool instead of creating one per request.
+"""
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, Optional, Tuple
+
+class BackendPool:
+    """
+    Exclusive leases on backend handles, keyed by backend name.
+
+    Idle handles are reused most-recently-released first. A handle that has
+    been idle longer than ``health_check_interval`` is checked before reuse
+    and discarded if unhealthy; handles idle longer than ``idle_timeout``
+    are evicted. Handles whose lease ends with an exception are dropped.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[str], Any],
+        health_check: Optional[Callable[[Any], bool]] = None,
+        max_idle_per_backend: int = 4,
+        idle_timeout: float = 600.0,
+        health_check_interval: float = 60.0
+    ):
+        self.factory = factory
+        self.health_check = health_check
+        self.max_idle_per_backend = max_idle_per_backend
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        # Backend name -> (handle, released at) with the most recent on the right
+        self._idle: Dict[str, Deque[Tuple[Any, float]]] = {}
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+
+    def _healthy(self, handle: Any) -> bool:
+        try:
+            return self.health_check(handle)
+        except Exception:
+            return False
+
+    def acquire(self, name: str) -> Any:
+        """Take an idle handle for ``name`` or create a new one."""
+        now = time.monotonic()
+        while True:
+            with self._lock:
+                self._evict_expired(now)
+                idle = self._idle.get(name)
+                if not idle:
+                    break
+                handle, released_at = idle.pop()
+            if self.health_check is None or now - released_at < self.health_check_interval or self._healthy(handle):
+                self.reused += 1
+                return handle
+
+        handle = self.factory(name)
+        self.created += 1
+        return handle
+
+    def release(self, name: str, handle: Any, healthy: bool = True):
+        """Return a handle to the pool, or drop it if it is unhealthy or the pool is full."""
+        if not healthy:
+            return
+        with self._lock:
+            idle = self._idle.setdefault(name, deque())
+            if len(idle) < self.max_idle_per_backend:
+                idle.append((handle, time.monotonic()))
+
+    @contextmanager
+    def lease(self, name: str) -> Iterator[Any]:
+        """Hold a handle for the duration of a ``with`` block."""
+        handle = self.acquire(name)
+        try:
+            yield handle
+        except Exception:
+            self.release(name, handle, healthy=False)
+            raise
+        self.release(name, handle)
+
+    def _evict_expired(self, now: float):
+        for name in list(self._idle):
+            idle = self._idle[name]
+            # Oldest releases are on the left
+            while idle and now - idle[0][1] > self.idle_timeout:
+                idle.popleft()
+            if not idle:
+                del self._idle[name]
+
+    def idle_count(self, name: Optional[str] = None) -> int:
+        with self._lock:
+            if name is not None:
+                return len(self._idle.get(name, ()))
+            return sum(len(idle) for idle in self._idle.values())
+
+    def clear(self):
+        """Drop every idle handle, e.g. after re-authenticating."""
+        with self._lock:
+            self._idle.clear()
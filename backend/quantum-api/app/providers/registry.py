@@ -0,0 +1,86 @@
+"""
+Provider registry with lazy SDK imports.
+
+Each vendor module imports its SDK (qiskit, pyquil, cirq, qsharp) at module
+level, which costs seconds at startup even when the provider has no
+credentials configured. The registry hands out proxies that import the
+provider module and construct the provider on first attribute access.
+"""
+import importlib
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+from ..models import ProviderType
+
+# Provider type -> (module relative to this package, class name)
+PROVIDER_CLASSES: Dict[ProviderType, Tuple[str, str]] = {
+    ProviderType.IBM: (".ibm", "IBMQuantumProvider"),
+    ProviderType.RIGETTI: (".rigetti", "RigettiQuantumProvider"),
+    ProviderType.GOOGLE: (".google", "GoogleQuantumProvider"),
+    ProviderType.MICROSOFT: (".microsoft", "MicrosoftQuantumProvider"),
+    ProviderType.LOCAL: (".local", "LocalStatevectorProvider"),
+}
+
+# Environment variable holding each provider's credentials; providers are
+# only initialized at startup when it is set
+PROVIDER_CREDENTIALS: Dict[ProviderType, str] = {
+    ProviderType.IBM: "IBM_QUANTUM_TOKEN",
+    ProviderType.RIGETTI: "RIGETTI_API_KEY",
+    ProviderType.GOOGLE: "GOOGLE_QUANTUM_CREDENTIALS",
+    ProviderType.MICROSOFT: "MICROSOFT_QUANTUM_WORKSPACE",
+}
+
+class LazyProvider:
+    """
+    Proxy that imports and constructs a provider on first use.
+
+    Attribute access is forwarded to the provider, so the proxy can be used
+    wherever the provider itself is expected. Pickled proxies (for process
+    pools) are rebuilt unloaded and import the provider in the worker.
+    """
+
+    def __init__(self, module: str, class_name: str):
+        self._module = module
+        self._class_name = class_name
+        self._instance: Optional[Any] = None
+        self._load_lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._instance is not None
+
+    def load(self) -> Any:
+        """Import the provider module and construct the provider, once."""
+        if self._instance is None:
+            with self._load_lock:
+                if self._instance is None:
+                    module = importlib.import_module(self._module, __package__)
+                    self._instance = getattr(module, self._class_name)()
+        return self._instance
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached for attributes the proxy itself does not have
+        if name.startswith('__') or name in ('_module', '_class_name', '_instance', '_load_lock'):
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+    def __reduce__(self):
+        return (LazyProvider, (self._module, self._class_name))
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<LazyProvider {self._class_name} ({state})>"
+
+def create_providers() -> Dict[ProviderType, LazyProvider]:
+    """One unloaded proxy per known provider."""
+    return {
+        provider_type: LazyProvider(module, class_name)
+        for provider_type, (module, class_name) in PROVIDER_CLASSES.items()
+    }
+
+async def initialize_configured(providers: Dict[ProviderType, Any]):
+    """Initialize, and thereby import, only the providers whose credentials are set."""
+    for provider_type, variable in PROVIDER_CREDENTIALS.items():
+        credentials = os.getenv(variable)
+        if credentials and provider_type in providers:
+            await providers[provider_type].initialize(credentials)
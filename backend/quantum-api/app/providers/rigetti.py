@@ -1,15 +1,23 @@
 from pyquil import Program, get_qc
-from pyquil.gates import H, X, CNOT, MEASURE
+from pyquil.api import WavefunctionSimulator
+from pyquil.gates import H, X, Z, RZ, CNOT, CPHASE, SWAP, MEASURE
 from pyquil.quilbase import DefGate
 from ..models import QuantumCircuit, ExecutionResult, ProviderType
+from ..compiler.ir import CompiledCircuit, Op, compile_circuit
+from ..simulation.histogram import counts_from_bits
+from ..simulation.sampling import ProgressCallback
+from ..simulation.state_analysis import qubit_states
+from .pool import BackendPool
 import numpy as np
 import time
-from typing import Optional, Dict
+from typing import Optional, Dict, Union
 
 class RigettiQuantumProvider:
     def __init__(self):
         self._qvm_connection = None
         self._quilc_connection = None
+        # get_qc connects to quilc and the QVM/QPU, so handles are reused per backend name
+        self._computers = BackendPool(get_qc)
 
     async def initialize(self, api_key: str):
         """Initialize the Rigetti Quantum provider with authentication."""
@@ -23,73 +31,87 @@ class RigettiQuantumProvider:
             return backend_name
         return "9q-square-qvm"  # Default to 9-qubit QVM
 
-    def convert_circuit(self, circuit: QuantumCircuit) -> Program:
+    def convert_circuit(self, circuit: Union[QuantumCircuit, CompiledCircuit]) -> Program:
         """Convert our circuit format to Rigetti's format."""
+        circuit = compile_circuit(circuit)
         program = Program()
 
         # Add measurement readout register
         ro = program.declare('ro', 'BIT', circuit.qubits)
 
-        for gate in circuit.gates:
-            if gate.type == 'H':
-                program += H(gate.position['qubit'])
-            elif gate.type == 'X':
-                program += X(gate.position['qubit'])
-            elif gate.type == 'CNOT':
-                if gate.control is None:
-                    raise ValueError("CNOT gate requires a control qubit")
-                program += CNOT(gate.control, gate.position['qubit'])
-            elif gate.type == 'MEASURE':
-                program += MEASURE(gate.position['qubit'], ro[gate.position['qubit']])
+        for opcode, target, control, param in circuit.operations():
+            if opcode == Op.H:
+                program += H(target)
+            elif opcode == Op.X:
+                program += X(target)
+            elif opcode == Op.CNOT:
+                program += CNOT(control, target)
+            elif opcode == Op.RZ:
+                program += RZ(float(circuit.angles[param]), target)
+            elif opcode == Op.CPHASE:
+                program += CPHASE(float(circuit.angles[param]), control, target)
+            elif opcode == Op.SWAP:
+                program += SWAP(control, target)
+            elif opcode == Op.MCZ:
+                gate = Z(target)
+                for ctrl in circuit.controls_of(param):
+                    gate = gate.controlled(ctrl)
+                program += gate
+            elif opcode == Op.MEASURE:
+                program += MEASURE(target, ro[target])
+            elif opcode == Op.U:
+                raise ValueError("Fused gates are not supported on Rigetti backends")
 
         return program
 
     def _process_results(self, measurements: np.ndarray, num_qubits: int) -> Dict[str, int]:
         """Process measurement results into counts dictionary."""
-        counts = {}
-        for measurement in measurements:
-            # Convert measurement array to binary string
-            binary = ''.join(str(int(bit)) for bit in measurement)
-            counts[binary] = counts.get(binary, 0) + 1
-        return counts
-
-    async def execute_circuit(self, circuit: QuantumCircuit, shots: int = 1024, backend_name: Optional[str] = None) -> ExecutionResult:
-        """Execute a quantum circuit on Rigetti hardware or QVM."""
+        return counts_from_bits(measurements)
+
+    async def execute_circuit(
+        self,
+        circuit: Union[QuantumCircuit, CompiledCircuit],
+        shots: int = 1024,
+        backend_name: Optional[str] = None,
+        seed: Optional[int] = None,
+        include_states: bool = True,
+        progress: Optional[ProgressCallback] = None,
+        progress_interval: int = 1024
+    ) -> ExecutionResult:
+        """
+        Execute a quantum circuit on Rigetti hardware or QVM.
+
+        Jobs return every shot at once, so ``progress`` is never called;
+        job lifecycle events are still reported by the job queue.
+        """
         start_time = time.time()
 
         try:
             # Get quantum computer connection
             qc_name = await self.get_backend(backend_name)
-            qc = get_qc(qc_name)
-
-            # Convert and compile circuit
+            circuit = compile_circuit(circuit)
             program = self.convert_circuit(circuit)
-            executable = qc.compile(program)
 
-            # Run the program
-            measurements = qc.run(executable, shots=shots)
+            with self._computers.lease(qc_name) as qc:
+                if "qvm" in qc_name.lower():
+                    # Pooled handles keep their seed, so reset it on every run
+                    qc.qam.random_seed = seed
+                executable = qc.compile(program)
+                measurements = qc.run(executable, shots=shots)
 
             # Process results
             counts = self._process_results(measurements, circuit.qubits)
 
-            # For QVM, we can get the wavefunction
+            # For QVM, we can get the wavefunction before the first measurement
             states = []
-            if "qvm" in qc_name.lower():
-                wf_program = program.write_memory('wf', [0] * 2**circuit.qubits)
-                wavefunction = qc.wavefunction(wf_program)
-                amplitudes = wavefunction.amplitudes
-
-                for i in range(circuit.qubits):
-                    # Calculate single-qubit state from full wavefunction
-                    alpha = np.abs(amplitudes[i*2])
-                    beta = np.abs(amplitudes[i*2 + 1])
-                    states.append({
-                        'qubit': i,
-                        'state': {
-                            'alpha': float(alpha),
-                            'beta': float(beta)
-                        }
-                    })
+            if include_states and "qvm" in qc_name.lower():
+                prefix = self.convert_circuit(circuit.head(circuit.first_measurement()))
+                amplitudes = WavefunctionSimulator().wavefunction(prefix).amplitudes
+                # Amplitudes are ordered with qubit 0 as the least significant bit and
+                # stop at the highest qubit used, so pad the unused qubits with |0>
+                padded = np.zeros(2 ** circuit.qubits, dtype=np.complex128)
+                padded[:len(amplitudes)] = amplitudes
+                states = qubit_states(padded.reshape((2,) * circuit.qubits).transpose())
 
             return ExecutionResult(
                 measurements=counts,
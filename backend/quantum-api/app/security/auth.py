@@ -53,8 +53,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
-    """Get current user from JWT token."""
+def user_from_token(token: str) -> User:
+    """Resolve a JWT access token to its user, raising 401 if it is invalid."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -73,6 +73,10 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
         raise credentials_exception
     return user
 
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
+    """Get current user from JWT token."""
+    return user_from_token(token)
+
 def get_user(username: str) -> Optional[UserInDB]:
     """Get user from database (mock implementation)."""
     # In a real implementation, this would query a database
@@ -87,14 +91,18 @@ def get_user(username: str) -> Optional[UserInDB]:
         )
     return None
 
+def check_scopes(user: User, required_scopes: List[str]) -> User:
+    """Raise 403 unless the user has every required scope."""
+    for scope in required_scopes:
+        if scope not in user.scopes:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Not enough permissions. Required scope: {scope}"
+            )
+    return user
+
 def verify_scope(required_scopes: List[str]):
     """Verify user has required scopes."""
     async def scope_validator(user: User = Depends(get_current_user)):
-        for scope in required_scopes:
-            if scope not in user.scopes:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail=f"Not enough permissions. Required scope: {scope}"
-                )
-        return user
+        return check_scopes(user, required_scopes)
     return scope_validator
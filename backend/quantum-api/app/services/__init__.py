@@ -4,5 +4,8 @@ Contains business logic and external service integrations.
 """
 
 from .openai_service import OpenAIService
+from .executors import ProviderExecutor, ProviderExecutors
+from .job_queue import JobQueue
+from .result_cache import ExecutionCache
 
-__all__ = ['OpenAIService']
+__all__ = ['OpenAIService', 'ProviderExecutor', 'ProviderExecutors', 'JobQueue', 'ExecutionCache']
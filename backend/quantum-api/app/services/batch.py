@@ -0,0 +1,126 @@
+import asyncio
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from ..compiler.ir import GATE_OPCODES, ROTATION_OPS, CompiledCircuit, compile_circuit
+from ..models import BatchExecutionRequest, BatchItemResult, ExecutionRequest, ExecutionResult
+from .executors import ProviderExecutors
+from .result_cache import ExecutionCache, is_simulator_request
+
+class BatchItem:
+    """One execution of a batch: the request, its compiled circuit and any sweep values."""
+
+    def __init__(
+        self,
+        index: int,
+        request: ExecutionRequest,
+        circuit: CompiledCircuit,
+        parameters: Optional[Dict[str, float]] = None
+    ):
+        self.index = index
+        self.request = request
+        self.circuit = circuit
+        self.parameters = parameters
+
+def _expand_sweep(base: ExecutionRequest, sweep: Dict[str, List[float]], start: int) -> List[BatchItem]:
+    """Compile the base circuit once and rebind its swept angles for every point."""
+    lengths = {len(values) for values in sweep.values()}
+    if len(lengths) != 1:
+        raise ValueError("All sweep parameters must have the same number of values")
+
+    swept: Dict[str, List[int]] = {name: [] for name in sweep}
+    gates = list(base.circuit.gates)
+    for index, gate in enumerate(gates):
+        if gate.parameter is None:
+            continue
+        if gate.parameter not in swept:
+            raise ValueError(f"No sweep values for parameter {gate.parameter}")
+        if GATE_OPCODES.get(gate.type) not in ROTATION_OPS:
+            raise ValueError(f"{gate.type} gate has no angle to sweep")
+        swept[gate.parameter].append(index)
+        if gate.angle is None:
+            # Placeholder so the template compiles; every point overwrites it
+            gates[index] = gate.model_copy(update={'angle': 0.0})
+    unused = [name for name, indices in swept.items() if not indices]
+    if unused:
+        raise ValueError(f"Sweep parameters not used by any gate: {', '.join(unused)}")
+
+    template = compile_circuit(base.circuit.model_copy(update={'gates': gates}))
+    # Positions in the angles table that each parameter controls
+    slots = {name: template.param[indices] for name, indices in swept.items()}
+
+    items = []
+    for point in range(lengths.pop()):
+        angles = template.angles.copy()
+        parameters = {}
+        for name, values in sweep.items():
+            angles[slots[name]] = values[point]
+            parameters[name] = values[point]
+        items.append(BatchItem(start + point, base, template.with_angles(angles), parameters))
+    return items
+
+def expand_batch(batch: BatchExecutionRequest, max_items: Optional[int] = None) -> List[BatchItem]:
+    """
+    Validate and compile every execution in a batch.
+
+    Raises:
+        ValueError: If any circuit is invalid, the sweep is malformed or the batch is too large
+    """
+    if batch.sweep and batch.base is None:
+        raise ValueError("A sweep requires a base request")
+    if batch.base is not None and not batch.sweep:
+        raise ValueError("A base request requires sweep values")
+    size = len(batch.requests) + (len(next(iter(batch.sweep.values()))) if batch.sweep else 0)
+    if size == 0:
+        raise ValueError("Batch contains no executions")
+    if max_items is not None and size > max_items:
+        raise ValueError(f"Batch of {size} executions exceeds the limit of {max_items}")
+
+    items = [
+        BatchItem(index, request, compile_circuit(request.circuit))
+        for index, request in enumerate(batch.requests)
+    ]
+    if batch.base is not None:
+        items += _expand_sweep(batch.base, batch.sweep, len(items))
+    return items
+
+async def run_batch(
+    items: List[BatchItem],
+    executors: ProviderExecutors,
+    cache: Optional[ExecutionCache] = None,
+    use_cache: bool = True
+) -> AsyncIterator[BatchItemResult]:
+    """
+    Execute batch items concurrently and yield each result as soon as it is ready.
+
+    Items with the same cache key (identical circuit and execution options)
+    run once and share the result. Simulator results are read from and
+    written to ``cache``; executions are spread over the per-provider
+    executors, which enforce each provider's concurrency cap.
+    """
+    groups: Dict[str, List[BatchItem]] = {}
+    for item in items:
+        groups.setdefault(ExecutionCache.key(item.request, item.circuit), []).append(item)
+
+    async def execute(key: str, item: BatchItem) -> Tuple[str, Optional[ExecutionResult], Optional[str]]:
+        cacheable = cache is not None and is_simulator_request(item.request)
+        if cacheable and use_cache:
+            cached = cache.get(key)
+            if cached is not None:
+                return key, cached, None
+        try:
+            result = await executors.run(item.request, item.circuit)
+        except Exception as e:
+            return key, None, str(e)
+        if cacheable:
+            cache.put(key, result)
+        return key, result, None
+
+    tasks = [asyncio.ensure_future(execute(key, group[0])) for key, group in groups.items()]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            key, result, error = await finished
+            for item in groups[key]:
+                yield BatchItemResult(index=item.index, parameters=item.parameters, result=result, error=error)
+    finally:
+        # The client may disconnect before the batch finishes
+        for task in tasks:
+            task.cancel()
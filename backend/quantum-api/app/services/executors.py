@@ -0,0 +1,296 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+from ..models import ExecutionRequest, ExecutionResult, ExecutorMetrics, ProviderType
+from ..compiler.ir import CompiledCircuit, compile_circuit
+from ..compiler.optimizer import optimize_circuit
+from ..simulation.sampling import ProgressCallback
+
+# Copy of the provider owned by a process-pool worker, set by the pool initializer
+_process_provider: Any = None
+
+def _execute(
+    provider: Any,
+    request: ExecutionRequest,
+    circuit: Optional[CompiledCircuit] = None,
+    progress: Optional[ProgressCallback] = None,
+    progress_interval: int = 1024
+) -> ExecutionResult:
+    """
+    Run a provider coroutine to completion on the worker's own event loop.
+
+    Panics raised by Rust extensions (pyo3's ``PanicException``) derive from
+    ``BaseException`` and would escape ordinary error handling, so they are
+    re-raised as ``RuntimeError``.
+    """
+    try:
+        return asyncio.run(provider.execute_circuit(
+            circuit if circuit is not None else request.circuit,
+            shots=request.shots,
+            backend_name=request.backend_name,
+            seed=request.seed,
+            include_states=request.include_states,
+            progress=progress,
+            progress_interval=progress_interval
+        ))
+    except BaseException as e:
+        if type(e).__name__ != "PanicException":
+            raise
+        raise RuntimeError(f"Provider panicked: {e}") from None
+
+def _init_process_worker(provider: Any):
+    global _process_provider
+    _process_provider = provider
+
+def _execute_in_process(
+    request: ExecutionRequest,
+    circuit: Optional[CompiledCircuit] = None,
+    progress_queue: Any = None,
+    progress_interval: int = 1024
+) -> ExecutionResult:
+    """Process-pool entry point using the worker's own copy of the provider."""
+    progress = None
+    if progress_queue is not None:
+        progress = lambda counts, completed: progress_queue.put((counts, completed))
+    return _execute(_process_provider, request, circuit, progress, progress_interval)
+
+def _relay_progress(progress_queue: Any, progress: ProgressCallback):
+    """Forward progress reported by a process worker until the ``None`` sentinel arrives."""
+    while True:
+        update = progress_queue.get()
+        if update is None:
+            return
+        progress(*update)
+
+class ProviderExecutor:
+    """
+    Dedicated executor and concurrency cap for a single provider.
+
+    Thread pools suit I/O-bound hardware submission; process pools suit
+    CPU-bound simulation. Process workers receive a pickled copy of the
+    provider when the pool starts, so they are only appropriate for providers
+    whose state does not change after startup (such as the local simulator).
+    """
+
+    def __init__(
+        self,
+        provider_type: ProviderType,
+        provider: Any,
+        kind: str = "thread",
+        max_workers: int = 4,
+        max_concurrency: Optional[int] = None
+    ):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown executor kind: {kind}")
+        self.provider_type = provider_type
+        self.provider = provider
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_concurrency = max_concurrency or max_workers
+        self._pool: Optional[Executor] = None
+        # Started on the first process-pool run that reports progress
+        self._manager = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._waiting = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.kind == "process":
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    initializer=_init_process_worker,
+                    initargs=(self.provider,)
+                )
+            else:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix=f"provider-{self.provider_type.value}"
+                )
+        return self._pool
+
+    async def run(
+        self,
+        request: ExecutionRequest,
+        circuit: Optional[CompiledCircuit] = None,
+        progress: Optional[ProgressCallback] = None,
+        progress_interval: int = 1024,
+        on_start: Optional[Callable[[], None]] = None
+    ) -> ExecutionResult:
+        """
+        Execute a request once a concurrency slot for this provider is free.
+
+        An already compiled circuit is passed to the provider instead of the
+        request's model so the gates are only converted once. ``on_start`` is
+        called when the slot is acquired and ``progress`` with partial counts
+        while the provider runs; both are called on the event loop.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        loop = asyncio.get_running_loop()
+
+        enqueued_at = time.monotonic()
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+        wait = time.monotonic() - enqueued_at
+        self._total_wait += wait
+        self._max_wait = max(self._max_wait, wait)
+
+        self._running += 1
+        try:
+            if on_start is not None:
+                on_start()
+            if progress is not None:
+                # Providers report from worker threads; hand the updates to the event loop
+                report = progress
+                progress = lambda counts, completed: loop.call_soon_threadsafe(report, counts, completed)
+
+            if self.kind == "process" and progress is not None:
+                result = await self._run_in_process_with_progress(request, circuit, progress, progress_interval)
+            elif self.kind == "process":
+                result = await loop.run_in_executor(self._get_pool(), _execute_in_process, request, circuit)
+            else:
+                result = await loop.run_in_executor(
+                    self._get_pool(), _execute, self.provider, request, circuit, progress, progress_interval
+                )
+            self._completed += 1
+            return result
+        except Exception:
+            self._failed += 1
+            raise
+        finally:
+            self._running -= 1
+            self._semaphore.release()
+
+    async def _run_in_process_with_progress(
+        self,
+        request: ExecutionRequest,
+        circuit: Optional[CompiledCircuit],
+        progress: ProgressCallback,
+        progress_interval: int
+    ) -> ExecutionResult:
+        """Run in a worker process while a relay thread forwards its progress updates."""
+        loop = asyncio.get_running_loop()
+        if self._manager is None:
+            self._manager = multiprocessing.Manager()
+        progress_queue = self._manager.Queue()
+        relay = loop.run_in_executor(None, _relay_progress, progress_queue, progress)
+        try:
+            return await loop.run_in_executor(
+                self._get_pool(), _execute_in_process, request, circuit, progress_queue, progress_interval
+            )
+        finally:
+            # The worker's updates precede the sentinel, so none are lost
+            progress_queue.put(None)
+            await relay
+
+    def metrics(self) -> ExecutorMetrics:
+        """Snapshot of queue depth, load and wait times."""
+        started = self._completed + self._failed + self._running
+        return ExecutorMetrics(
+            provider=self.provider_type,
+            kind=self.kind,
+            max_workers=self.max_workers,
+            max_concurrency=self.max_concurrency,
+            queue_depth=self._waiting,
+            running=self._running,
+            completed=self._completed,
+            failed=self._failed,
+            average_wait_time=self._total_wait / started if started else 0.0,
+            max_wait_time=self._max_wait
+        )
+
+    def shutdown(self):
+        """Stop the worker pool without waiting for running executions."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+class ProviderExecutors:
+    """Per-provider executors configured from the environment."""
+
+    # CPU-bound simulators without credentials default to process pools
+    DEFAULT_KINDS = {ProviderType.LOCAL: "process"}
+    # Providers whose SDK objects are bound to the thread that created them
+    # always get one dedicated worker thread, whatever the environment says
+    SINGLE_THREADED = {ProviderType.MICROSOFT}
+
+    def __init__(self, providers: Dict[ProviderType, Any]):
+        self._executors: Dict[ProviderType, ProviderExecutor] = {}
+        for provider_type, provider in providers.items():
+            prefix = provider_type.name
+            max_workers = int(os.getenv(
+                f"{prefix}_MAX_WORKERS",
+                str(os.cpu_count() or 4) if self.DEFAULT_KINDS.get(provider_type) == "process" else "4"
+            ))
+            max_concurrency = os.getenv(f"{prefix}_MAX_CONCURRENCY")
+            kind = os.getenv(f"{prefix}_EXECUTOR", self.DEFAULT_KINDS.get(provider_type, "thread"))
+            if provider_type in self.SINGLE_THREADED:
+                kind, max_workers, max_concurrency = "thread", 1, None
+            self._executors[provider_type] = ProviderExecutor(
+                provider_type,
+                provider,
+                kind=kind,
+                max_workers=max_workers,
+                max_concurrency=int(max_concurrency) if max_concurrency else None
+            )
+
+    def __contains__(self, provider_type: ProviderType) -> bool:
+        return provider_type in self._executors
+
+    def get(self, provider_type: ProviderType) -> Optional[ProviderExecutor]:
+        return self._executors.get(provider_type)
+
+    async def run(
+        self,
+        request: ExecutionRequest,
+        circuit: Optional[CompiledCircuit] = None,
+        progress: Optional[ProgressCallback] = None,
+        progress_interval: int = 1024,
+        on_start: Optional[Callable[[], None]] = None
+    ) -> ExecutionResult:
+        """
+        Execute a request on its provider's executor.
+
+        Unless the request opts out, the circuit is optimized first; fused
+        unitaries are only produced for providers that can execute them, and
+        dead gates are kept for providers that read out every qubit.
+        ``progress`` and ``on_start`` are passed on to the executor.
+        """
+        executor = self._executors.get(request.provider)
+        if executor is None:
+            raise ValueError(f"Provider {request.provider} not implemented yet")
+        if circuit is None:
+            circuit = compile_circuit(request.circuit)
+
+        report = None
+        if request.optimize:
+            circuit, report = optimize_circuit(
+                circuit,
+                fuse=getattr(executor.provider, 'SUPPORTS_FUSED_GATES', False),
+                remove_dead=not getattr(executor.provider, 'READS_ALL_QUBITS', False)
+            )
+        result = await executor.run(request, circuit, progress, progress_interval, on_start)
+        if report is not None:
+            result = result.model_copy(update={'optimization': report})
+        return result
+
+    def metrics(self) -> List[ExecutorMetrics]:
+        return [executor.metrics() for executor in self._executors.values()]
+
+    def shutdown(self):
+        for executor in self._executors.values():
+            executor.shutdown()
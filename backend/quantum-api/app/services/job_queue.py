@@ -0,0 +1,175 @@
+import asyncio
+import uuid
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import AsyncIterator, Deque, Dict, List, Optional
+from ..models import ExecutionRequest, JobEvent, JobEventType, JobInfo, JobProgress, JobStatus
+from ..compiler.ir import CompiledCircuit, compile_circuit
+from .executors import ProviderExecutors
+
+TERMINAL_STATUSES = (JobStatus.COMPLETED, JobStatus.FAILED)
+
+class _Subscription:
+    """
+    Pending events for one subscriber.
+
+    Progress counts are cumulative, so a progress event that has not been
+    delivered yet is replaced by the next one. A slow consumer therefore
+    skips intermediate histograms instead of growing an unbounded backlog,
+    while every lifecycle event is still delivered in order.
+    """
+
+    def __init__(self):
+        self._pending: Deque[JobEvent] = deque()
+        self._ready = asyncio.Event()
+
+    def push(self, event: JobEvent):
+        if (
+            event.type == JobEventType.PROGRESS
+            and self._pending
+            and self._pending[-1].type == JobEventType.PROGRESS
+        ):
+            self._pending[-1] = event
+        else:
+            self._pending.append(event)
+        self._ready.set()
+
+    async def get(self) -> JobEvent:
+        while not self._pending:
+            self._ready.clear()
+            await self._ready.wait()
+        return self._pending.popleft()
+
+class JobQueue:
+    """
+    Background execution of circuits on the per-provider executors.
+
+    Provider SDK calls block, so each job runs on its provider's executor;
+    the event loop only tracks job state and notifies subscribers.
+    """
+
+    def __init__(self, executors: ProviderExecutors, max_jobs: int = 1000):
+        self._executors = executors
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, JobInfo]" = OrderedDict()
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._subscribers: Dict[str, List[_Subscription]] = {}
+
+    def submit(self, request: ExecutionRequest, owner: str, progress_interval: Optional[int] = None) -> JobInfo:
+        """
+        Queue a circuit for execution and return immediately.
+
+        With ``progress_interval``, providers that produce shots incrementally
+        publish partial counts every ``progress_interval`` shots.
+        """
+        if request.provider not in self._executors:
+            raise ValueError(f"Provider {request.provider} not implemented yet")
+        # Reject malformed circuits before queueing rather than failing the job later
+        circuit = compile_circuit(request.circuit)
+
+        job = JobInfo(
+            id=str(uuid.uuid4()),
+            status=JobStatus.QUEUED,
+            provider=request.provider,
+            owner=owner,
+            submitted_at=datetime.utcnow()
+        )
+        self._jobs[job.id] = job
+        self._evict_finished()
+        self._tasks[job.id] = asyncio.create_task(self._run(job.id, request, circuit, progress_interval))
+        return job
+
+    def get(self, job_id: str) -> Optional[JobInfo]:
+        """Get the current state of a job."""
+        return self._jobs.get(job_id)
+
+    async def subscribe(self, job_id: str) -> AsyncIterator[JobEvent]:
+        """
+        Yield the job's current state, then every lifecycle and progress event until it finishes.
+
+        Events are produced as fast as the consumer takes them; undelivered
+        progress events are coalesced so slow consumers apply backpressure
+        without delaying the job.
+        """
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+        subscription = _Subscription()
+        self._subscribers.setdefault(job_id, []).append(subscription)
+        try:
+            event = JobEvent(type=JobEventType(job.status.value), job=job)
+            yield event
+            while event.job.status not in TERMINAL_STATUSES:
+                event = await subscription.get()
+                yield event
+        finally:
+            self._subscribers[job_id].remove(subscription)
+            if not self._subscribers[job_id]:
+                del self._subscribers[job_id]
+
+    async def events(self, job_id: str) -> AsyncIterator[JobInfo]:
+        """Yield the job's current state, then every update until it finishes."""
+        async for event in self.subscribe(job_id):
+            yield event.job
+
+    async def _run(
+        self,
+        job_id: str,
+        request: ExecutionRequest,
+        circuit: CompiledCircuit,
+        progress_interval: Optional[int] = None
+    ):
+        def started():
+            self._update(job_id, JobEventType.RUNNING, status=JobStatus.RUNNING, started_at=datetime.utcnow())
+
+        def progress(counts: Dict[str, int], completed: int):
+            # Updates relayed from a worker can arrive after the job has finished and been evicted
+            job = self._jobs.get(job_id)
+            if job is None or job.status in TERMINAL_STATUSES:
+                return
+            self._update(job_id, JobEventType.PROGRESS, progress=JobProgress(
+                shots_completed=completed,
+                shots_total=request.shots,
+                counts=counts
+            ))
+
+        try:
+            self._update(job_id, JobEventType.COMPILING, status=JobStatus.COMPILING)
+            result = await self._executors.run(
+                request,
+                circuit,
+                progress=progress if progress_interval else None,
+                progress_interval=progress_interval or request.shots,
+                on_start=started
+            )
+            self._update(
+                job_id, JobEventType.COMPLETED,
+                status=JobStatus.COMPLETED, result=result, finished_at=datetime.utcnow()
+            )
+        except Exception as e:
+            self._update(
+                job_id, JobEventType.FAILED,
+                status=JobStatus.FAILED, error=str(e), finished_at=datetime.utcnow()
+            )
+        finally:
+            self._tasks.pop(job_id, None)
+
+    def _update(self, job_id: str, event_type: JobEventType, **changes):
+        job = self._jobs[job_id].model_copy(update=changes)
+        self._jobs[job_id] = job
+        event = JobEvent(type=event_type, job=job)
+        for subscription in self._subscribers.get(job_id, []):
+            subscription.push(event)
+
+    def _evict_finished(self):
+        """Drop the oldest finished jobs once more than max_jobs are retained."""
+        excess = len(self._jobs) - self.max_jobs
+        if excess <= 0:
+            return
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.status in TERMINAL_STATUSES][:excess]:
+            del self._jobs[job_id]
+
+    def shutdown(self):
+        """Cancel pending jobs."""
+        for task in self._tasks.values():
+            task.cancel()
@@ -0,0 +1,108 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+from ..models import ExecutionRequest, ExecutionResult, ProviderType
+from ..compiler.ir import CompiledCircuit, compile_circuit
+
+def is_simulator_request(request: ExecutionRequest) -> bool:
+    """Whether the request runs on a simulator backend rather than hardware."""
+    backend = (request.backend_name or "").lower()
+    if request.provider in (ProviderType.LOCAL, ProviderType.MICROSOFT):
+        return True
+    if request.provider == ProviderType.GOOGLE:
+        return backend in ("", "simulator")
+    if request.provider == ProviderType.RIGETTI:
+        # Rigetti defaults to the 9-qubit QVM
+        return backend == "" or "qvm" in backend
+    if request.provider == ProviderType.IBM:
+        return backend == "" or "simulator" in backend
+    return False
+
+class ExecutionCache:
+    """
+    TTL and size-bounded LRU cache of simulator execution results.
+
+    Entries are keyed by the circuit fingerprint plus every other request
+    field (provider, backend, shots, seed, ...). An optional directory adds a
+    persistent second tier that survives restarts and is shared between workers.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 3600.0, disk_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_path = disk_path
+        self._entries: "OrderedDict[str, Tuple[float, ExecutionResult]]" = OrderedDict()
+        self._lock = threading.Lock()
+        if disk_path:
+            os.makedirs(disk_path, exist_ok=True)
+
+    @staticmethod
+    def key(request: ExecutionRequest, circuit: Optional[CompiledCircuit] = None) -> str:
+        """
+        Canonical hash of everything that determines an execution's result.
+
+        ``circuit`` is the compiled form of the request's circuit, or a circuit
+        that replaces it, such as one point of a parameter sweep.
+        """
+        circuit = circuit if circuit is not None else compile_circuit(request.circuit)
+        canonical = json.dumps(
+            [circuit.fingerprint(), request.model_dump(mode='json', exclude={'circuit'})],
+            sort_keys=True,
+            separators=(',', ':')
+        )
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def _disk_file(self, key: str) -> str:
+        return os.path.join(self.disk_path, f"{key}.json")
+
+    def get(self, key: str) -> Optional[ExecutionResult]:
+        """Return a cached result that has not expired."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, result = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    return result
+                del self._entries[key]
+
+        if not self.disk_path:
+            return None
+        try:
+            with open(self._disk_file(key)) as f:
+                stored = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if stored["expires_at"] <= now:
+            try:
+                os.remove(self._disk_file(key))
+            except FileNotFoundError:
+                pass
+            return None
+
+        result = ExecutionResult.model_validate(stored["result"])
+        self._remember(key, stored["expires_at"], result)
+        return result
+
+    def put(self, key: str, result: ExecutionResult):
+        """Store a result in memory and, if configured, on disk."""
+        expires_at = time.time() + self.ttl
+        self._remember(key, expires_at, result)
+        if self.disk_path:
+            # Write then rename so concurrent readers never see a partial file
+            tmp_file = f"{self._disk_file(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_file, "w") as f:
+                json.dump({"expires_at": expires_at, "result": result.model_dump(mode='json')}, f)
+            os.replace(tmp_file, self._disk_file(key))
+
+    def _remember(self, key: str, expires_at: float, result: ExecutionResult):
+        with self._lock:
+            self._entries[key] = (expires_at, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
@@ -0,0 +1,14 @@
+"""
+Native simulation engines used by the local execution provider.
+"""
+from .statevector import StatevectorSimulator
+from .sparse import SparseStatevectorSimulator
+from .histogram import counts_from_bits, counts_from_outcomes
+from .sampling import sample_counts, marginal_probabilities
+from .state_analysis import reduced_density_matrices, bloch_vectors, qubit_states, density_matrix_states
+
+__all__ = [
+    'StatevectorSimulator', 'SparseStatevectorSimulator', 'sample_counts', 'marginal_probabilities',
+    'counts_from_bits', 'counts_from_outcomes',
+    'reduced_density_matrices', 'bloch_vectors', 'qubit_states', 'density_matrix_states'
+]
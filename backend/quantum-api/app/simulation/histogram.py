@@ -0,0 +1,73 @@
+"""
+Vectorized counts aggregation shared by the execution providers.
+
+Every histogram is keyed by full-register bitstrings with qubit 0 leftmost.
+Shots are reduced to integers (or packed bytes for very wide registers) and
+counted with NumPy; bitstrings are only formatted for the distinct outcomes.
+"""
+from typing import Dict, List, Sequence
+import numpy as np
+
+# Widest register whose outcomes still fit in an unsigned 64-bit integer key
+_MAX_INTEGER_WIDTH = 63
+
+def bitstrings(bits: np.ndarray) -> List[str]:
+    """Format each row of a 0/1 matrix as a bitstring."""
+    bits = np.asarray(bits, dtype=np.uint8)
+    if bits.size == 0:
+        return ['' for _ in range(bits.shape[0])]
+    width = bits.shape[1]
+    raw = (bits + ord('0')).tobytes()
+    return [raw[i:i + width].decode('ascii') for i in range(0, len(raw), width)]
+
+def counts_from_bits(bits: np.ndarray) -> Dict[str, int]:
+    """
+    Build a counts histogram from a ``(shots, width)`` matrix of measured bits.
+
+    Args:
+        bits: Measurement results, one row per shot and one column per classical bit
+
+    Returns:
+        Counts dictionary keyed by bitstrings (column 0 leftmost)
+    """
+    bits = np.asarray(bits, dtype=np.uint8)
+    if bits.ndim != 2:
+        raise ValueError("Measurement results must be a (shots, bits) matrix")
+    if bits.shape[0] == 0:
+        return {}
+    width = bits.shape[1]
+
+    if width <= _MAX_INTEGER_WIDTH:
+        # Dot with powers of two turns every shot into a single integer key
+        weights = np.left_shift(np.uint64(1), np.arange(width - 1, -1, -1, dtype=np.uint64))
+        keys = bits.astype(np.uint64) @ weights
+        _, first, counts = np.unique(keys, return_index=True, return_counts=True)
+    else:
+        # Pack each shot into bytes and count rows as opaque fixed-width records
+        packed = np.ascontiguousarray(np.packbits(bits, axis=1))
+        rows = packed.view(np.dtype((np.void, packed.shape[1]))).ravel()
+        _, first, counts = np.unique(rows, return_index=True, return_counts=True)
+
+    return dict(zip(bitstrings(bits[first]), counts.tolist()))
+
+def counts_from_outcomes(
+    outcomes: np.ndarray,
+    measured_qubits: Sequence[int],
+    num_qubits: int
+) -> Dict[str, int]:
+    """
+    Build a counts histogram from sampled outcome indices.
+
+    Outcome indices enumerate the measured qubits only; the returned bitstrings
+    cover the full classical register (one bit per qubit) with unmeasured qubits
+    reading 0.
+    """
+    num_measured = len(measured_qubits)
+    histogram = np.bincount(outcomes, minlength=2 ** num_measured)
+    distinct = np.flatnonzero(histogram)
+
+    shifts = np.arange(num_measured - 1, -1, -1)
+    register = np.zeros((len(distinct), num_qubits), dtype=np.uint8)
+    register[:, list(measured_qubits)] = (distinct[:, None] >> shifts) & 1
+
+    return dict(zip(bitstrings(register), histogram[distinct].tolist()))
@@ -0,0 +1,62 @@
+"""
+Shot sampling from exact probability distributions.
+"""
+from typing import Callable, Dict, Optional, Sequence
+import numpy as np
+from .histogram import counts_from_outcomes
+
+# Called with the cumulative counts and the number of shots completed so far
+ProgressCallback = Callable[[Dict[str, int], int], None]
+
+def marginal_probabilities(probabilities: np.ndarray, qubits: Sequence[int]) -> np.ndarray:
+    """
+    Marginalize a ``(2,) * n`` probability tensor onto the given qubits.
+
+    Args:
+        probabilities: Probability tensor with one axis per qubit
+        qubits: Sorted qubit indices to keep
+
+    Returns:
+        Flat probability vector over the kept qubits (first kept qubit is the most significant bit)
+    """
+    traced = tuple(axis for axis in range(probabilities.ndim) if axis not in set(qubits))
+    marginal = probabilities.sum(axis=traced) if traced else probabilities
+    return np.ascontiguousarray(marginal).reshape(-1)
+
+def sample_counts(
+    probabilities: np.ndarray,
+    measured_qubits: Sequence[int],
+    shots: int,
+    rng: Optional[np.random.Generator] = None,
+    progress: Optional[ProgressCallback] = None,
+    progress_interval: int = 1024
+) -> Dict[str, int]:
+    """
+    Draw all shots at once from a final-state probability tensor.
+
+    Args:
+        probabilities: ``(2,) * n`` probability tensor of the final state
+        measured_qubits: Sorted qubits that are measured
+        shots: Number of shots to sample
+        rng: Optional random generator
+        progress: Optional callback receiving cumulative counts every
+            ``progress_interval`` shots. The shots are drawn up front either
+            way, so the final counts do not depend on the interval
+
+    Returns:
+        Counts dictionary keyed by full-register bitstrings
+    """
+    rng = rng or np.random.default_rng()
+    marginal = marginal_probabilities(probabilities, measured_qubits)
+    marginal = marginal / marginal.sum()
+    outcomes = rng.choice(len(marginal), size=shots, p=marginal)
+    if progress is None:
+        return counts_from_outcomes(outcomes, measured_qubits, probabilities.ndim)
+
+    counts: Dict[str, int] = {}
+    for start in range(0, shots, progress_interval):
+        chunk = outcomes[start:start + progress_interval]
+        for bitstring, count in counts_from_outcomes(chunk, measured_qubits, probabilities.ndim).items():
+            counts[bitstring] = counts.get(bitstring, 0) + count
+        progress(dict(counts), start + len(chunk))
+    return counts
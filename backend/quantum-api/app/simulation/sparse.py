@@ -0,0 +1,261 @@
+"""
+Sparse statevector simulator for wide, low-entanglement circuits.
+
+Only nonzero amplitudes are stored, as parallel arrays of basis-state indices
+and amplitudes. Qubit ``q`` of an ``n``-qubit register is bit ``n - 1 - q`` of
+the index, matching the dense simulator's ordering. Permutation gates (X, CNOT,
+SWAP) rewrite indices and diagonal gates (RZ, CPHASE, MCZ) rescale amplitudes
+without changing the number of stored entries; only H and fused unitaries can
+branch, after which equal indices are merged and cancelled amplitudes dropped.
+Memory therefore follows the number of nonzero amplitudes rather than ``2^n``,
+so GHZ-style and Clifford-heavy circuits stay small at widths a dense vector
+cannot reach.
+"""
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from ..compiler.ir import CompiledCircuit, Op
+from .histogram import bitstrings
+from .sampling import ProgressCallback
+from .state_analysis import density_matrix_states
+from .statevector import StatevectorSimulator
+
+# Indices are signed 64-bit integers
+MAX_SPARSE_QUBITS = 62
+
+# Amplitudes smaller than this after a branching gate are treated as cancelled
+_TOLERANCE = 1e-12
+
+_HADAMARD = np.array([[1, 1], [1, -1]], dtype=np.complex128) / np.sqrt(2)
+
+class SparseStatevectorSimulator:
+    METHOD = "sparse"
+
+    def __init__(self, num_qubits: int):
+        """
+        Initialize the simulator in the |0...0> state.
+
+        Args:
+            num_qubits: Number of qubits to simulate
+        """
+        if num_qubits < 1:
+            raise ValueError("Statevector simulation requires at least one qubit")
+        if num_qubits > MAX_SPARSE_QUBITS:
+            raise ValueError(f"Sparse simulation supports at most {MAX_SPARSE_QUBITS} qubits")
+        self.num_qubits = num_qubits
+        self.indices = np.zeros(1, dtype=np.int64)
+        self.amplitudes = np.ones(1, dtype=np.complex128)
+        # Permutation gates leave the indices unsorted until they are needed in order
+        self._sorted = True
+
+    def copy(self) -> "SparseStatevectorSimulator":
+        """Return an independent copy of the simulator state."""
+        clone = SparseStatevectorSimulator.__new__(SparseStatevectorSimulator)
+        clone.num_qubits = self.num_qubits
+        clone.indices = self.indices.copy()
+        clone.amplitudes = self.amplitudes.copy()
+        clone._sorted = self._sorted
+        return clone
+
+    @property
+    def nnz(self) -> int:
+        """Number of stored (nonzero) amplitudes."""
+        return len(self.indices)
+
+    @property
+    def density(self) -> float:
+        """Fraction of the ``2^n`` basis states with a nonzero amplitude."""
+        return self.nnz / 2.0 ** self.num_qubits
+
+    @property
+    def nbytes(self) -> int:
+        return self.indices.nbytes + self.amplitudes.nbytes
+
+    def _mask(self, qubit: int) -> int:
+        return 1 << (self.num_qubits - 1 - qubit)
+
+    def _sort(self):
+        if not self._sorted:
+            order = np.argsort(self.indices, kind='stable')
+            self.indices = self.indices[order]
+            self.amplitudes = self.amplitudes[order]
+            self._sorted = True
+
+    def h(self, qubit: int):
+        """Apply a Hadamard gate."""
+        self.unitary(qubit, _HADAMARD)
+
+    def x(self, qubit: int):
+        """Apply a Pauli-X gate."""
+        self.indices ^= self._mask(qubit)
+        self._sorted = False
+
+    def cnot(self, control: int, target: int):
+        """Apply a controlled-NOT gate."""
+        if control == target:
+            raise ValueError("CNOT control and target must be different qubits")
+        controlled = (self.indices & self._mask(control)) != 0
+        self.indices[controlled] ^= self._mask(target)
+        self._sorted = False
+
+    def rz(self, qubit: int, angle: float):
+        """Apply a rotation about Z."""
+        one = (self.indices & self._mask(qubit)) != 0
+        self.amplitudes *= np.where(one, np.exp(0.5j * angle), np.exp(-0.5j * angle))
+
+    def cphase(self, control: int, target: int, angle: float):
+        """Apply a phase of e^{i angle} to states where control and target are both |1>."""
+        if control == target:
+            raise ValueError("CPHASE control and target must be different qubits")
+        mask = self._mask(control) | self._mask(target)
+        self.amplitudes[(self.indices & mask) == mask] *= np.exp(1j * angle)
+
+    def swap(self, first: int, second: int):
+        """Exchange the states of two qubits."""
+        if first == second:
+            raise ValueError("SWAP qubits must be different")
+        first_mask, second_mask = self._mask(first), self._mask(second)
+        # Only the |01> and |10> components move, by flipping both bits
+        differ = ((self.indices & first_mask) != 0) != ((self.indices & second_mask) != 0)
+        self.indices[differ] ^= first_mask | second_mask
+        self._sorted = False
+
+    def mcz(self, qubits: List[int]):
+        """Flip the phase of basis states where every listed qubit is |1>."""
+        mask = 0
+        for qubit in qubits:
+            mask |= self._mask(qubit)
+        self.amplitudes[(self.indices & mask) == mask] *= -1
+
+    def unitary(self, qubit: int, matrix: np.ndarray):
+        """Apply an arbitrary single-qubit unitary given as a 2x2 matrix."""
+        mask = self._mask(qubit)
+        bit = ((self.indices & mask) != 0).astype(np.intp)
+        # Every stored state branches into its |0> and |1> partners on the qubit
+        indices = np.concatenate([self.indices & ~mask, self.indices | mask])
+        amplitudes = np.concatenate([
+            matrix[0, bit] * self.amplitudes,
+            matrix[1, bit] * self.amplitudes
+        ])
+        self._merge(indices, amplitudes)
+
+    def _merge(self, indices: np.ndarray, amplitudes: np.ndarray):
+        """Sum amplitudes of equal indices and drop the ones that cancel."""
+        unique, inverse = np.unique(indices, return_inverse=True)
+        merged = np.empty(len(unique), dtype=np.complex128)
+        merged.real = np.bincount(inverse, weights=amplitudes.real, minlength=len(unique))
+        merged.imag = np.bincount(inverse, weights=amplitudes.imag, minlength=len(unique))
+        keep = np.abs(merged) > _TOLERANCE
+        self.indices = unique[keep]
+        self.amplitudes = merged[keep]
+        self._sorted = True
+
+    def measure(self, qubit: int, rng: np.random.Generator) -> int:
+        """Measure a qubit in the computational basis and collapse the state."""
+        one = (self.indices & self._mask(qubit)) != 0
+        weights = self.amplitudes.real ** 2 + self.amplitudes.imag ** 2
+        p_one = float(weights[one].sum())
+        outcome = int(rng.random() < p_one)
+        keep = one if outcome else ~one
+        self.indices = self.indices[keep]
+        self.amplitudes = self.amplitudes[keep]
+        norm = np.sqrt(p_one if outcome else 1 - p_one)
+        if norm > 0:
+            self.amplitudes /= norm
+        return outcome
+
+    def apply(self, operations: Iterable[Tuple[int, int, int, int]], circuit: Optional[CompiledCircuit] = None):
+        """
+        Apply a sequence of (opcode, target, control, param) unitary operations.
+
+        ``U``, ``MCZ``, ``RZ`` and ``CPHASE`` operations look up their operands in
+        the tables of ``circuit`` by ``param``.
+        """
+        for opcode, target, control, param in operations:
+            if opcode == Op.H:
+                self.h(target)
+            elif opcode == Op.X:
+                self.x(target)
+            elif opcode == Op.CNOT:
+                self.cnot(control, target)
+            elif opcode == Op.U:
+                self.unitary(target, circuit.unitaries[param])
+            elif opcode == Op.MCZ:
+                self.mcz(circuit.controls_of(param) + [target])
+            elif opcode == Op.RZ:
+                self.rz(target, circuit.angles[param])
+            elif opcode == Op.CPHASE:
+                self.cphase(control, target, circuit.angles[param])
+            elif opcode == Op.SWAP:
+                self.swap(control, target)
+            else:
+                raise ValueError(f"Unsupported gate for statevector simulation: {Op(opcode).name}")
+
+    def to_dense(self) -> StatevectorSimulator:
+        """Expand into a dense simulator holding the same state."""
+        dense = StatevectorSimulator(self.num_qubits)
+        dense.state[0] = 0
+        dense.state[self.indices] = self.amplitudes
+        return dense
+
+    def reduced_density_matrices(self) -> np.ndarray:
+        """``(n, 2, 2)`` reduced density matrices of every qubit, without expanding the state."""
+        self._sort()
+        weights = self.amplitudes.real ** 2 + self.amplitudes.imag ** 2
+        rhos = np.zeros((self.num_qubits, 2, 2), dtype=np.complex128)
+        for qubit in range(self.num_qubits):
+            mask = self._mask(qubit)
+            one = (self.indices & mask) != 0
+            rhos[qubit, 1, 1] = weights[one].sum()
+            rhos[qubit, 0, 0] = weights[~one].sum()
+            # Coherence between each |..0..> entry and its |..1..> partner, if stored
+            zero_indices = self.indices[~one]
+            partners = np.searchsorted(self.indices, zero_indices | mask)
+            partners[partners == len(self.indices)] = 0
+            paired = self.indices[partners] == (zero_indices | mask)
+            coherence = np.vdot(self.amplitudes[partners[paired]], self.amplitudes[~one][paired])
+            rhos[qubit, 0, 1] = coherence
+            rhos[qubit, 1, 0] = np.conj(coherence)
+        return rhos
+
+    def qubit_states(self) -> List[Dict]:
+        """Per-qubit amplitude magnitudes and Bloch vectors, as ``state_analysis.qubit_states``."""
+        return density_matrix_states(self.reduced_density_matrices())
+
+    def sample_counts(
+        self,
+        measured_qubits: Sequence[int],
+        shots: int,
+        rng: Optional[np.random.Generator] = None,
+        progress: Optional[ProgressCallback] = None,
+        progress_interval: int = 1024
+    ) -> Dict[str, int]:
+        """
+        Draw shots from the stored amplitudes.
+
+        Outcomes are the stored indices restricted to the measured qubits, so
+        unmeasured qubits read 0 and no ``2^n`` marginal is ever built.
+        """
+        rng = rng or np.random.default_rng()
+        measured_mask = 0
+        for qubit in measured_qubits:
+            measured_mask |= self._mask(qubit)
+        outcomes, inverse = np.unique(self.indices & measured_mask, return_inverse=True)
+        weights = np.bincount(inverse, weights=self.amplitudes.real ** 2 + self.amplitudes.imag ** 2)
+        samples = rng.choice(len(outcomes), size=shots, p=weights / weights.sum())
+
+        shifts = np.arange(self.num_qubits - 1, -1, -1, dtype=np.int64)
+        labels = bitstrings(((outcomes[:, None] >> shifts) & 1).astype(np.uint8))
+
+        def histogram(chunk: np.ndarray) -> Dict[str, int]:
+            totals = np.bincount(chunk, minlength=len(outcomes))
+            return {labels[i]: int(totals[i]) for i in np.flatnonzero(totals)}
+
+        if progress is None:
+            return histogram(samples)
+        counts: Dict[str, int] = {}
+        for start in range(0, shots, progress_interval):
+            chunk = samples[start:start + progress_interval]
+            for bitstring, count in histogram(chunk).items():
+                counts[bitstring] = counts.get(bitstring, 0) + count
+            progress(dict(counts), start + len(chunk))
+        return counts
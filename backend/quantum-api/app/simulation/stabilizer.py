@@ -0,0 +1,460 @@
+"""
+Stabilizer simulation of Clifford circuits.
+
+A Clifford circuit keeps the register in a stabilizer state, which is
+described by ``n`` stabilizer and ``n`` destabilizer Pauli operators instead
+of ``2^n`` amplitudes (Aaronson and Gottesman, "Improved simulation of
+stabilizer circuits", 2004). The tableau stores their X and Z parts as bit
+matrices packed into 64-bit words along the qubit axis, so gates cost
+``O(n)`` and measurements ``O(n^2 / 64)``.
+
+Shots are not simulated one tableau at a time. One reference run of the
+tableau fixes a valid measurement record, and every shot is then derived
+from it by propagating a random Pauli frame through the circuit (the
+approach of Gidney's Stim): shots are the bits of 64-bit words, so a batch
+of thousands of shots costs a few word operations per gate.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from ..compiler.ir import CompiledCircuit, Op
+from .histogram import counts_from_bits
+from .sampling import ProgressCallback
+from .state_analysis import density_matrix_states
+
+# Elementary Clifford instructions: (name, qubit, second qubit or -1)
+CliffordInstruction = Tuple[str, int, int]
+
+# Shots propagated together by the frame simulator; fixed so seeded results
+# do not depend on how progress is reported
+_FRAME_BATCH = 4096
+
+# Angles within this distance of a Clifford angle are treated as exact
+_ANGLE_TOLERANCE = 1e-9
+
+_POPCOUNT = np.array([bin(value).count('1') for value in range(256)], dtype=np.int64)
+
+def _popcount_rows(words: np.ndarray) -> np.ndarray:
+    """Number of set bits in each row of a ``(rows, words)`` uint64 array."""
+    return _POPCOUNT[words.view(np.uint8)].sum(axis=-1)
+
+def _single_qubit_cliffords() -> Dict[Tuple, List[str]]:
+    """The 24 single-qubit Cliffords, keyed by their phase-normalized matrix, as H/S words."""
+    gates = {
+        'h': np.array([[1, 1], [1, -1]], dtype=np.complex128) / np.sqrt(2),
+        's': np.array([[1, 0], [0, 1j]], dtype=np.complex128)
+    }
+    found: Dict[Tuple, List[str]] = {}
+    frontier = [(np.eye(2, dtype=np.complex128), [])]
+    while frontier:
+        next_frontier = []
+        for matrix, word in frontier:
+            key = _clifford_key(matrix)
+            if key in found:
+                continue
+            found[key] = word
+            for name, gate in gates.items():
+                # Later gates act after earlier ones
+                next_frontier.append((gate @ matrix, word + [name]))
+        frontier = next_frontier
+    return found
+
+def _clifford_key(matrix: np.ndarray) -> Tuple:
+    """Hashable form of a 2x2 unitary with its global phase removed."""
+    pivot = matrix.flat[np.argmax(np.abs(matrix) > 1e-6)]
+    normalized = matrix * (abs(pivot) / pivot)
+    return tuple(np.round(normalized, 6).ravel().tolist())
+
+_CLIFFORD_WORDS = _single_qubit_cliffords()
+
+def _quarter_turns(angle: float, turn: float) -> Optional[int]:
+    """``angle / turn`` as an integer if it is one, otherwise None."""
+    turns = angle / turn
+    nearest = round(turns)
+    if abs(turns - nearest) > _ANGLE_TOLERANCE:
+        return None
+    return int(nearest)
+
+def compile_clifford(circuit: CompiledCircuit) -> List[CliffordInstruction]:
+    """
+    Lower a compiled circuit to elementary Clifford instructions.
+
+    RZ gates must be multiples of pi/2, CPHASE multiples of pi, MCZ gates
+    may have at most one control and fused unitaries must be Clifford.
+    A circuit without measurements measures every qubit at the end.
+
+    Raises:
+        ValueError: If the circuit contains a non-Clifford gate
+    """
+    program: List[CliffordInstruction] = []
+    for opcode, target, control, param in circuit.operations():
+        if opcode == Op.H:
+            program.append(('h', target, -1))
+        elif opcode == Op.X:
+            program.append(('x', target, -1))
+        elif opcode == Op.CNOT:
+            program.append(('cnot', control, target))
+        elif opcode == Op.SWAP:
+            program.append(('swap', control, target))
+        elif opcode == Op.MEASURE:
+            program.append(('measure', target, -1))
+        elif opcode == Op.RZ:
+            turns = _quarter_turns(float(circuit.angles[param]), np.pi / 2)
+            if turns is None:
+                raise ValueError("RZ gate is only Clifford for multiples of pi/2")
+            # RZ(k pi/2) is S^k up to a global phase
+            program.extend([('s', target, -1)] * (turns % 4))
+        elif opcode == Op.CPHASE:
+            turns = _quarter_turns(float(circuit.angles[param]), np.pi)
+            if turns is None:
+                raise ValueError("CPHASE gate is only Clifford for multiples of pi")
+            if turns % 2:
+                program.append(('cz', control, target))
+        elif opcode == Op.MCZ:
+            controls = circuit.controls_of(param)
+            if len(controls) > 1:
+                raise ValueError("MCZ gate with more than one control is not Clifford")
+            program.append(('cz', controls[0], target) if controls else ('z', target, -1))
+        elif opcode == Op.U:
+            word = _CLIFFORD_WORDS.get(_clifford_key(circuit.unitaries[param]))
+            if word is None:
+                raise ValueError("Fused gate is not a Clifford unitary")
+            program.extend((name, target, -1) for name in word)
+        else:
+            raise ValueError(f"Unsupported gate for stabilizer simulation: {Op(opcode).name}")
+
+    if not any(instruction[0] == 'measure' for instruction in program):
+        program.extend(('measure', qubit, -1) for qubit in range(circuit.qubits))
+    return program
+
+def is_clifford(circuit: CompiledCircuit) -> bool:
+    """Whether every gate of the circuit can be simulated by the stabilizer engine."""
+    try:
+        compile_clifford(circuit)
+    except ValueError:
+        return False
+    return True
+
+class StabilizerTableau:
+    """
+    Aaronson-Gottesman tableau of an ``n``-qubit stabilizer state.
+
+    Rows ``0..n-1`` are destabilizers and rows ``n..2n-1`` stabilizers. Row
+    ``i`` represents ``(-1)^r[i]`` times the Pauli product whose X and Z
+    parts are the packed bits ``x[i]`` and ``z[i]`` (qubit ``q`` is bit
+    ``q % 64`` of word ``q // 64``).
+    """
+
+    def __init__(self, num_qubits: int):
+        if num_qubits < 1:
+            raise ValueError("Stabilizer simulation requires at least one qubit")
+        self.num_qubits = num_qubits
+        words = (num_qubits + 63) // 64
+        self.x = np.zeros((2 * num_qubits, words), dtype=np.uint64)
+        self.z = np.zeros((2 * num_qubits, words), dtype=np.uint64)
+        self.r = np.zeros(2 * num_qubits, dtype=np.uint8)
+        # |0...0>: destabilizers X_q, stabilizers Z_q
+        for qubit in range(num_qubits):
+            word, mask = self._position(qubit)
+            self.x[qubit, word] = mask
+            self.z[num_qubits + qubit, word] = mask
+
+    def copy(self) -> "StabilizerTableau":
+        clone = StabilizerTableau.__new__(StabilizerTableau)
+        clone.num_qubits = self.num_qubits
+        clone.x = self.x.copy()
+        clone.z = self.z.copy()
+        clone.r = self.r.copy()
+        return clone
+
+    @property
+    def nbytes(self) -> int:
+        return self.x.nbytes + self.z.nbytes + self.r.nbytes
+
+    @staticmethod
+    def _position(qubit: int) -> Tuple[int, np.uint64]:
+        return qubit >> 6, np.uint64(1) << np.uint64(qubit & 63)
+
+    def _column(self, bits: np.ndarray, qubit: int) -> np.ndarray:
+        word, mask = self._position(qubit)
+        return (bits[:, word] & mask) != 0
+
+    def _flip(self, bits: np.ndarray, qubit: int, rows: np.ndarray):
+        word, mask = self._position(qubit)
+        bits[rows, word] ^= mask
+
+    def h(self, qubit: int):
+        """Apply a Hadamard gate."""
+        x, z = self._column(self.x, qubit), self._column(self.z, qubit)
+        self.r ^= x & z
+        differ = x != z
+        self._flip(self.x, qubit, differ)
+        self._flip(self.z, qubit, differ)
+
+    def s(self, qubit: int):
+        """Apply a phase gate."""
+        x, z = self._column(self.x, qubit), self._column(self.z, qubit)
+        self.r ^= x & z
+        self._flip(self.z, qubit, x)
+
+    def x_gate(self, qubit: int):
+        """Apply a Pauli-X gate."""
+        self.r ^= self._column(self.z, qubit)
+
+    def z_gate(self, qubit: int):
+        """Apply a Pauli-Z gate."""
+        self.r ^= self._column(self.x, qubit)
+
+    def cnot(self, control: int, target: int):
+        """Apply a controlled-NOT gate."""
+        if control == target:
+            raise ValueError("CNOT control and target must be different qubits")
+        x_control, z_control = self._column(self.x, control), self._column(self.z, control)
+        x_target, z_target = self._column(self.x, target), self._column(self.z, target)
+        self.r ^= x_control & z_target & ~(x_target ^ z_control)
+        self._flip(self.x, target, x_control)
+        self._flip(self.z, control, z_target)
+
+    def cz(self, first: int, second: int):
+        """Apply a controlled-Z gate."""
+        self.h(second)
+        self.cnot(first, second)
+        self.h(second)
+
+    def swap(self, first: int, second: int):
+        """Exchange the states of two qubits."""
+        if first == second:
+            raise ValueError("SWAP qubits must be different")
+        for bits in (self.x, self.z):
+            differ = self._column(bits, first) != self._column(bits, second)
+            self._flip(bits, first, differ)
+            self._flip(bits, second, differ)
+
+    @staticmethod
+    def _product_phase(x1: np.ndarray, z1: np.ndarray, x2: np.ndarray, z2: np.ndarray) -> np.ndarray:
+        """Exponent of i (mod 4) picked up by multiplying the Pauli rows ``1 * 2``, per row."""
+        plus = (x1 & z1 & ~x2 & z2) | (x1 & ~z1 & x2 & z2) | (~x1 & z1 & x2 & ~z2)
+        minus = (x1 & z1 & x2 & ~z2) | (x1 & ~z1 & ~x2 & z2) | (~x1 & z1 & x2 & z2)
+        return (_popcount_rows(plus) - _popcount_rows(minus)) % 4
+
+    def _multiply_rows(self, rows: np.ndarray, source: int):
+        """Replace each of ``rows`` by ``source`` times that row."""
+        if len(rows) == 0:
+            return
+        phase = 2 * self.r[rows].astype(np.int64) + 2 * int(self.r[source]) + self._product_phase(
+            self.x[source], self.z[source], self.x[rows], self.z[rows]
+        )
+        self.r[rows] = (phase % 4 == 2).astype(np.uint8)
+        self.x[rows] ^= self.x[source]
+        self.z[rows] ^= self.z[source]
+
+    def _stabilizer_product(self, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray, int]:
+        """Product of commuting stabilizer rows, reduced pairwise: (x, z, sign bit)."""
+        x, z, r = self.x[rows], self.z[rows], self.r[rows].astype(np.int64)
+        while len(r) > 1:
+            half = len(r) // 2
+            # Fold the second half onto the first; an odd row left over is kept as is
+            left, right = slice(0, half), slice(half, 2 * half)
+            phase = 2 * r[left] + 2 * r[right] + self._product_phase(x[left], z[left], x[right], z[right])
+            folded_r = (phase % 4 == 2).astype(np.int64)
+            folded_x, folded_z = x[left] ^ x[right], z[left] ^ z[right]
+            if len(r) % 2:
+                folded_x = np.concatenate([folded_x, x[-1:]])
+                folded_z = np.concatenate([folded_z, z[-1:]])
+                folded_r = np.concatenate([folded_r, r[-1:]])
+            x, z, r = folded_x, folded_z, folded_r
+        return x[0], z[0], int(r[0])
+
+    def measure(self, qubit: int, rng: np.random.Generator) -> int:
+        """Measure a qubit in the computational basis and collapse the state."""
+        n = self.num_qubits
+        anticommuting = np.flatnonzero(self._column(self.x, qubit)[n:])
+        if len(anticommuting) == 0:
+            # Deterministic: Z_q is (up to sign) the product of the stabilizers
+            # whose destabilizers anticommute with it
+            rows = np.flatnonzero(self._column(self.x, qubit)[:n]) + n
+            return self._stabilizer_product(rows)[2]
+
+        pivot = n + int(anticommuting[0])
+        others = np.flatnonzero(self._column(self.x, qubit))
+        self._multiply_rows(others[others != pivot], pivot)
+        self.x[pivot - n], self.z[pivot - n], self.r[pivot - n] = self.x[pivot], self.z[pivot], self.r[pivot]
+        outcome = int(rng.random() < 0.5)
+        word, mask = self._position(qubit)
+        self.x[pivot] = 0
+        self.z[pivot] = 0
+        self.z[pivot, word] = mask
+        self.r[pivot] = outcome
+        return outcome
+
+    def apply(self, program: Sequence[CliffordInstruction], rng: Optional[np.random.Generator] = None) -> List[int]:
+        """Run instructions and return the outcomes of any measurements, in order."""
+        outcomes = []
+        for name, first, second in program:
+            if name == 'h':
+                self.h(first)
+            elif name == 's':
+                self.s(first)
+            elif name == 'x':
+                self.x_gate(first)
+            elif name == 'z':
+                self.z_gate(first)
+            elif name == 'cnot':
+                self.cnot(first, second)
+            elif name == 'cz':
+                self.cz(first, second)
+            elif name == 'swap':
+                self.swap(first, second)
+            elif name == 'measure':
+                outcomes.append(self.measure(first, rng or np.random.default_rng()))
+        return outcomes
+
+    def bloch_vectors(self) -> np.ndarray:
+        """
+        ``(n, 3)`` Bloch vectors of every qubit.
+
+        A single-qubit Pauli has expectation +-1 if it is in the stabilizer
+        group and 0 otherwise, so each component is -1, 0 or +1.
+        """
+        n = self.num_qubits
+        vectors = np.zeros((n, 3))
+        stabilizer_x, stabilizer_z = self.x[n:], self.z[n:]
+        destabilizer_x, destabilizer_z = self.x[:n], self.z[:n]
+        # Columns of Pauli X, Y, Z: the bits that decide anticommutation with each of them
+        for axis, (stabilizer_bits, destabilizer_bits) in enumerate((
+            (stabilizer_z, destabilizer_z),
+            (stabilizer_x ^ stabilizer_z, destabilizer_x ^ destabilizer_z),
+            (stabilizer_x, destabilizer_x)
+        )):
+            occupied = np.bitwise_or.reduce(stabilizer_bits, axis=0)
+            for qubit in range(n):
+                word, mask = self._position(qubit)
+                if occupied[word] & mask:
+                    continue
+                rows = np.flatnonzero(destabilizer_bits[:, word] & mask) + n
+                vectors[qubit, axis] = -1.0 if self._stabilizer_product(rows)[2] else 1.0
+        return vectors
+
+    def qubit_states(self) -> List[Dict]:
+        """Per-qubit amplitude magnitudes and Bloch vectors, as ``state_analysis.qubit_states``."""
+        x, y, z = self.bloch_vectors().T
+        rhos = np.empty((self.num_qubits, 2, 2), dtype=np.complex128)
+        rhos[:, 0, 0] = (1 + z) / 2
+        rhos[:, 1, 1] = (1 - z) / 2
+        rhos[:, 0, 1] = (x - 1j * y) / 2
+        rhos[:, 1, 0] = (x + 1j * y) / 2
+        return density_matrix_states(rhos)
+
+def _random_words(rng: np.random.Generator, shape: Tuple[int, ...]) -> np.ndarray:
+    return np.frombuffer(rng.bytes(8 * int(np.prod(shape))), dtype=np.uint64).reshape(shape).copy()
+
+def _frame_batch(
+    program: Sequence[CliffordInstruction],
+    num_qubits: int,
+    reference: Sequence[int],
+    shots: int,
+    rng: np.random.Generator
+) -> np.ndarray:
+    """Measurement registers of ``shots`` shots as a ``(shots, num_qubits)`` bit matrix."""
+    words = (shots + 63) // 64
+    frame_x = np.zeros((num_qubits, words), dtype=np.uint64)
+    # Z errors leave |0> unchanged, so a random Z frame is a valid starting point
+    frame_z = _random_words(rng, (num_qubits, words))
+    register = np.zeros((num_qubits, words), dtype=np.uint64)
+    all_ones = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+    measurement = 0
+    for name, first, second in program:
+        if name == 'h':
+            frame_x[first], frame_z[first] = frame_z[first].copy(), frame_x[first].copy()
+        elif name == 's':
+            frame_z[first] ^= frame_x[first]
+        elif name == 'cnot':
+            frame_x[second] ^= frame_x[first]
+            frame_z[first] ^= frame_z[second]
+        elif name == 'cz':
+            frame_z[first] ^= frame_x[second]
+            frame_z[second] ^= frame_x[first]
+        elif name == 'swap':
+            frame_x[[first, second]] = frame_x[[second, first]]
+            frame_z[[first, second]] = frame_z[[second, first]]
+        elif name == 'measure':
+            # An X or Y frame component flips the reference outcome
+            register[first] = frame_x[first] ^ (all_ones if reference[measurement] else np.uint64(0))
+            # Collapse randomizes the phase of the measured qubit
+            frame_z[first] = _random_words(rng, (words,))
+            measurement += 1
+        # Pauli X and Z gates commute with the frame up to sign
+
+    bits = np.unpackbits(register.astype('<u8').view(np.uint8), axis=1, bitorder='little')
+    measured = {first for name, first, _ in program if name == 'measure'}
+    unmeasured = [qubit for qubit in range(num_qubits) if qubit not in measured]
+    bits[unmeasured] = 0
+    return bits[:, :shots].T
+
+class StabilizerSimulator:
+    """Stabilizer engine for one Clifford circuit: the state before measurement and shot sampling."""
+
+    METHOD = "stabilizer"
+
+    def __init__(self, circuit: CompiledCircuit, stop: Optional[int] = None):
+        """
+        Args:
+            circuit: Clifford circuit to simulate
+            stop: Number of gates to apply for the pre-measurement state
+                (defaults to the first measurement)
+
+        Raises:
+            ValueError: If the circuit contains a non-Clifford gate
+        """
+        self.num_qubits = circuit.qubits
+        self.program = compile_clifford(circuit)
+        prefix = compile_clifford(circuit.head(circuit.first_measurement() if stop is None else stop))
+        # The prefix of a circuit without measurements gains trailing measurements; drop them
+        self._prefix_length = next(
+            (index for index, instruction in enumerate(prefix) if instruction[0] == 'measure'),
+            len(prefix)
+        )
+        self.tableau = StabilizerTableau(circuit.qubits)
+        self.tableau.apply(prefix[:self._prefix_length])
+
+    @property
+    def nbytes(self) -> int:
+        return self.tableau.nbytes
+
+    def qubit_states(self) -> List[Dict]:
+        return self.tableau.qubit_states()
+
+    def sample_counts(
+        self,
+        measured_qubits: Sequence[int],
+        shots: int,
+        rng: Optional[np.random.Generator] = None,
+        progress: Optional[ProgressCallback] = None,
+        progress_interval: int = 1024
+    ) -> Dict[str, int]:
+        """
+        Sample every measurement of the circuit, including mid-circuit ones.
+
+        The register holds each qubit's last outcome, and unmeasured qubits
+        read 0. The measured qubits follow from the circuit itself, so
+        ``measured_qubits`` is only accepted for interface compatibility.
+        """
+        rng = rng or np.random.default_rng()
+        reference = self.tableau.copy().apply(self.program[self._prefix_length:], rng)
+
+        interval = progress_interval if progress is not None else _FRAME_BATCH
+        counts: Dict[str, int] = {}
+        completed = 0
+        for start in range(0, shots, _FRAME_BATCH):
+            batch = _frame_batch(self.program, self.num_qubits, reference, min(_FRAME_BATCH, shots - start), rng)
+            # Split the batch at every progress boundary it crosses
+            offset = 0
+            while offset < len(batch):
+                size = min(len(batch) - offset, interval - completed % interval)
+                for bitstring, count in counts_from_bits(batch[offset:offset + size]).items():
+                    counts[bitstring] = counts.get(bitstring, 0) + count
+                offset += size
+                completed += size
+                if progress is not None and (completed % interval == 0 or completed == shots):
+                    progress(dict(counts), completed)
+        return counts
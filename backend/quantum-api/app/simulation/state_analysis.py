@@ -0,0 +1,70 @@
+"""
+Single-qubit views of a multi-qubit pure state.
+
+Every helper takes the state as a ``(2,) * n`` tensor (or a flat vector that
+is reshaped to one) with axis ``i`` holding qubit ``i``. Reduced density
+matrices are contracted from views of that tensor, so analysing all ``n``
+qubits costs ``O(n * 2^n)`` without copying the state per qubit.
+"""
+from typing import Dict, List
+import numpy as np
+
+def reduced_density_matrices(state: np.ndarray) -> np.ndarray:
+    """
+    Trace out all other qubits for every qubit of a pure state.
+
+    Args:
+        state: Amplitudes as a ``(2,) * n`` tensor or a flat vector of length ``2^n``
+
+    Returns:
+        ``(n, 2, 2)`` array whose entry ``k`` is the reduced density matrix of qubit ``k``
+    """
+    flat = np.ascontiguousarray(state).reshape(-1)
+    num_qubits = int(flat.size).bit_length() - 1
+    if flat.size != 2 ** num_qubits or num_qubits < 1:
+        raise ValueError(f"State of size {flat.size} is not a multi-qubit state")
+
+    rhos = np.empty((num_qubits, 2, 2), dtype=np.complex128)
+    for qubit in range(num_qubits):
+        # View with the qubit as the middle axis: (higher qubits, qubit, lower qubits)
+        view = flat.reshape(2 ** qubit, 2, 2 ** (num_qubits - qubit - 1))
+        rhos[qubit] = np.einsum('iaj,ibj->ab', view, view.conj())
+    return rhos
+
+def bloch_vectors(rhos: np.ndarray) -> np.ndarray:
+    """Bloch vectors ``(x, y, z)`` of an ``(n, 2, 2)`` stack of density matrices."""
+    off_diagonal = rhos[:, 0, 1]
+    return np.stack([
+        2 * off_diagonal.real,
+        -2 * off_diagonal.imag,
+        (rhos[:, 0, 0] - rhos[:, 1, 1]).real
+    ], axis=1)
+
+def qubit_states(state: np.ndarray) -> List[Dict]:
+    """
+    Per-qubit amplitude magnitudes and Bloch vectors of a pure state.
+
+    ``alpha`` and ``beta`` are the square roots of the qubit's marginal
+    probabilities of |0> and |1>; the Bloch vector also captures relative
+    phase and, through its length, entanglement with the other qubits.
+    """
+    return density_matrix_states(reduced_density_matrices(state))
+
+def density_matrix_states(rhos: np.ndarray) -> List[Dict]:
+    """Format an ``(n, 2, 2)`` stack of reduced density matrices as per-qubit states."""
+    populations = np.clip(np.stack([rhos[:, 0, 0].real, rhos[:, 1, 1].real], axis=1), 0, None)
+    magnitudes = np.sqrt(populations).tolist()
+    vectors = bloch_vectors(rhos).tolist()
+    return [
+        {
+            'qubit': qubit,
+            'state': {
+                'alpha': alpha,
+                'beta': beta,
+                'x': x,
+                'y': y,
+                'z': z
+            }
+        }
+        for qubit, ((alpha, beta), (x, y, z)) in enumerate(zip(magnitudes, vectors))
+    ]
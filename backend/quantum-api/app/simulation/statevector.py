@@ -0,0 +1,179 @@
+"""
+Vectorized NumPy statevector simulator.
+
+The state is stored as a flat complex vector and viewed as a ``(2,) * n``
+tensor where axis ``i`` is qubit ``i`` (qubit 0 is the most significant bit of
+the flat index). Gates are applied in place on slices of that tensor, so no
+gate matrices or per-gate Python objects are created during simulation.
+"""
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from ..compiler.ir import CompiledCircuit, Op
+from .sampling import ProgressCallback, sample_counts
+from .state_analysis import qubit_states
+
+_SQRT1_2 = 1 / np.sqrt(2)
+
+class StatevectorSimulator:
+    METHOD = "statevector"
+
+    def __init__(self, num_qubits: int):
+        """
+        Initialize the simulator in the |0...0> state.
+
+        Args:
+            num_qubits: Number of qubits to simulate
+        """
+        if num_qubits < 1:
+            raise ValueError("Statevector simulation requires at least one qubit")
+        self.num_qubits = num_qubits
+        self.state = np.zeros(2 ** num_qubits, dtype=np.complex128)
+        self.state[0] = 1.0
+        self._tensor = self.state.reshape((2,) * num_qubits)
+
+    def copy(self) -> "StatevectorSimulator":
+        """Return an independent copy of the simulator state."""
+        clone = StatevectorSimulator.__new__(StatevectorSimulator)
+        clone.num_qubits = self.num_qubits
+        clone.state = self.state.copy()
+        clone._tensor = clone.state.reshape((2,) * self.num_qubits)
+        return clone
+
+    @property
+    def nbytes(self) -> int:
+        return self.state.nbytes
+
+    @staticmethod
+    def _slice(ndim: int, axis: int, value: int) -> Tuple:
+        # Length-one slices keep every axis, so the result is always a view
+        index = [slice(None)] * ndim
+        index[axis] = slice(value, value + 1)
+        return tuple(index)
+
+    def h(self, qubit: int):
+        """Apply a Hadamard gate."""
+        zero = self._tensor[self._slice(self.num_qubits, qubit, 0)]
+        one = self._tensor[self._slice(self.num_qubits, qubit, 1)]
+        tmp = zero.copy()
+        zero += one
+        one *= -1
+        one += tmp
+        self.state *= _SQRT1_2
+
+    def x(self, qubit: int):
+        """Apply a Pauli-X gate."""
+        self._swap_halves(self._tensor, qubit)
+
+    def cnot(self, control: int, target: int):
+        """Apply a controlled-NOT gate."""
+        if control == target:
+            raise ValueError("CNOT control and target must be different qubits")
+        controlled = self._tensor[self._slice(self.num_qubits, control, 1)]
+        self._swap_halves(controlled, target)
+
+    def rz(self, qubit: int, angle: float):
+        """Apply a rotation about Z."""
+        self._tensor[self._slice(self.num_qubits, qubit, 0)] *= np.exp(-0.5j * angle)
+        self._tensor[self._slice(self.num_qubits, qubit, 1)] *= np.exp(0.5j * angle)
+
+    def cphase(self, control: int, target: int, angle: float):
+        """Apply a phase of e^{i angle} to states where control and target are both |1>."""
+        if control == target:
+            raise ValueError("CPHASE control and target must be different qubits")
+        controlled = self._tensor[self._slice(self.num_qubits, control, 1)]
+        controlled[self._slice(self.num_qubits, target, 1)] *= np.exp(1j * angle)
+
+    def swap(self, first: int, second: int):
+        """Exchange the states of two qubits."""
+        if first == second:
+            raise ValueError("SWAP qubits must be different")
+        first_one = self._tensor[self._slice(self.num_qubits, first, 1)]
+        first_zero = self._tensor[self._slice(self.num_qubits, first, 0)]
+        # Swap the |10> and |01> amplitudes
+        one_zero = first_one[self._slice(self.num_qubits, second, 0)]
+        zero_one = first_zero[self._slice(self.num_qubits, second, 1)]
+        tmp = one_zero.copy()
+        one_zero[...] = zero_one
+        zero_one[...] = tmp
+
+    def mcz(self, qubits: List[int]):
+        """Flip the phase of basis states where every listed qubit is |1>."""
+        index = [slice(None)] * self.num_qubits
+        for qubit in qubits:
+            index[qubit] = 1
+        self._tensor[tuple(index)] *= -1
+
+    def unitary(self, qubit: int, matrix: np.ndarray):
+        """Apply an arbitrary single-qubit unitary given as a 2x2 matrix."""
+        zero = self._tensor[self._slice(self.num_qubits, qubit, 0)]
+        one = self._tensor[self._slice(self.num_qubits, qubit, 1)]
+        tmp = zero.copy()
+        zero *= matrix[0, 0]
+        zero += matrix[0, 1] * one
+        one *= matrix[1, 1]
+        one += matrix[1, 0] * tmp
+
+    @classmethod
+    def _swap_halves(cls, tensor: np.ndarray, axis: int):
+        zero = tensor[cls._slice(tensor.ndim, axis, 0)]
+        one = tensor[cls._slice(tensor.ndim, axis, 1)]
+        tmp = zero.copy()
+        zero[...] = one
+        one[...] = tmp
+
+    def measure(self, qubit: int, rng: np.random.Generator) -> int:
+        """Measure a qubit in the computational basis and collapse the state."""
+        one = self._tensor[self._slice(self.num_qubits, qubit, 1)]
+        p_one = float(np.vdot(one, one).real)
+        outcome = int(rng.random() < p_one)
+        self._tensor[self._slice(self.num_qubits, qubit, 1 - outcome)] = 0
+        norm = np.sqrt(p_one if outcome else 1 - p_one)
+        if norm > 0:
+            self.state /= norm
+        return outcome
+
+    def apply(self, operations: Iterable[Tuple[int, int, int, int]], circuit: Optional[CompiledCircuit] = None):
+        """
+        Apply a sequence of (opcode, target, control, param) unitary operations.
+
+        ``U``, ``MCZ``, ``RZ`` and ``CPHASE`` operations look up their operands in
+        the tables of ``circuit`` by ``param``.
+        """
+        for opcode, target, control, param in operations:
+            if opcode == Op.H:
+                self.h(target)
+            elif opcode == Op.X:
+                self.x(target)
+            elif opcode == Op.CNOT:
+                self.cnot(control, target)
+            elif opcode == Op.U:
+                self.unitary(target, circuit.unitaries[param])
+            elif opcode == Op.MCZ:
+                self.mcz(circuit.controls_of(param) + [target])
+            elif opcode == Op.RZ:
+                self.rz(target, circuit.angles[param])
+            elif opcode == Op.CPHASE:
+                self.cphase(control, target, circuit.angles[param])
+            elif opcode == Op.SWAP:
+                self.swap(control, target)
+            else:
+                raise ValueError(f"Unsupported gate for statevector simulation: {Op(opcode).name}")
+
+    def probabilities(self) -> np.ndarray:
+        """Return basis state probabilities as a ``(2,) * n`` tensor."""
+        return (self.state.real ** 2 + self.state.imag ** 2).reshape((2,) * self.num_qubits)
+
+    def qubit_states(self) -> List[Dict]:
+        """Per-qubit amplitude magnitudes and Bloch vectors of the current state."""
+        return qubit_states(self.state)
+
+    def sample_counts(
+        self,
+        measured_qubits: Sequence[int],
+        shots: int,
+        rng: Optional[np.random.Generator] = None,
+        progress: Optional[ProgressCallback] = None,
+        progress_interval: int = 1024
+    ) -> Dict[str, int]:
+        """Draw shots of the measured qubits from the current state."""
+        return sample_counts(self.probabilities(), measured_qubits, shots, rng, progress, progress_interval)
@@ -0,0 +1,62 @@
+import json
+import pytest
+from app.models import BatchExecutionRequest, ExecutionRequest, ProviderType, QuantumCircuit, QuantumGate
+from app.providers.local import LocalStatevectorProvider
+from app.services.batch import expand_batch, run_batch
+from app.services.executors import ProviderExecutors
+from app.services.result_cache import ExecutionCache
+
+@pytest.fixture(autouse=True)
+def thread_executor(monkeypatch):
+    monkeypatch.setenv("LOCAL_EXECUTOR", "thread")
+
+def rotation_request(angle=None, parameter=None, seed=1) -> ExecutionRequest:
+    circuit = QuantumCircuit(
+        gates=[
+            QuantumGate(type='H', position={'qubit': 0, 'step': 0}),
+            QuantumGate(type='RZ', position={'qubit': 0, 'step': 1}, angle=angle, parameter=parameter),
+            QuantumGate(type='H', position={'qubit': 0, 'step': 2}),
+        ],
+        qubits=1, steps=3, name="Ramsey"
+    )
+    return ExecutionRequest(circuit=circuit, provider=ProviderType.LOCAL, shots=200, seed=seed)
+
+def test_sweep_compiles_once_and_rebinds_angles():
+    batch = BatchExecutionRequest(base=rotation_request(parameter="theta"), sweep={"theta": [0.0, 1.0, 3.0]})
+    items = expand_batch(batch)
+    assert [item.index for item in items] == [0, 1, 2]
+    assert [float(item.circuit.angles[0]) for item in items] == [0.0, 1.0, 3.0]
+    # Everything except the angles table is shared with the template
+    assert items[0].circuit.opcode is items[2].circuit.opcode
+
+@pytest.mark.parametrize("batch, message", [
+    (BatchExecutionRequest(base=rotation_request(parameter="theta"), sweep={"phi": [1.0]}), "No sweep values for parameter theta"),
+    (BatchExecutionRequest(base=rotation_request(parameter="theta"), sweep={"theta": [1.0], "phi": [1.0]}), "not used by any gate"),
+    (BatchExecutionRequest(requests=[rotation_request(angle=0.5)] * 3), "exceeds the limit of 2"),
+    (BatchExecutionRequest(), "no executions"),
+])
+def test_invalid_batches_are_rejected(batch, message):
+    with pytest.raises(ValueError, match=message):
+        expand_batch(batch, max_items=2)
+
+@pytest.mark.asyncio
+async def test_identical_requests_run_once_and_results_stream():
+    provider = LocalStatevectorProvider()
+    executors = ProviderExecutors({ProviderType.LOCAL: provider})
+    cache = ExecutionCache()
+    batch = BatchExecutionRequest(
+        requests=[rotation_request(angle=0.0), rotation_request(angle=0.0)],
+        base=rotation_request(parameter="theta"),
+        sweep={"theta": [3.141592653589793, 0.0]}
+    )
+    results = [item async for item in run_batch(expand_batch(batch), executors, cache)]
+    executors.shutdown()
+
+    assert sorted(item.index for item in results) == [0, 1, 2, 3]
+    by_index = {item.index: item for item in results}
+    assert by_index[0].result.measurements == {'0': 200}
+    assert by_index[2].result.measurements == {'1': 200}
+    assert by_index[2].parameters == {"theta": 3.141592653589793}
+    # Requests 0, 1 and the theta=0 sweep point are the same execution
+    assert executors.get(ProviderType.LOCAL).metrics().completed == 2
+    assert json.loads(by_index[3].model_dump_json())["result"] == json.loads(by_index[0].result.model_dump_json())
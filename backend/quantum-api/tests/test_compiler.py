@@ -0,0 +1,60 @@
+import pytest
+from app.compiler import Op, compile_circuit
+from app.models import QuantumCircuit, QuantumGate
+
+def circuit(*gates, qubits=2) -> QuantumCircuit:
+    return QuantumCircuit(gates=list(gates), qubits=qubits, steps=len(gates), name="Test")
+
+def test_compile_stores_parallel_arrays():
+    compiled = compile_circuit(circuit(
+        QuantumGate(type='H', position={'qubit': 0, 'step': 0}),
+        QuantumGate(type='CNOT', position={'qubit': 1, 'step': 1}, control=0),
+    ))
+    assert list(compiled.operations()) == [(Op.H, 0, -1, -1), (Op.CNOT, 1, 0, -1)]
+    assert compiled.step.tolist() == [0, 1]
+    assert compile_circuit(compiled) is compiled
+
+def test_roundtrip_preserves_fingerprint():
+    compiled = compile_circuit(circuit(
+        QuantumGate(type='X', position={'qubit': 1, 'step': 0}),
+        QuantumGate(type='MEASURE', position={'qubit': 1, 'step': 1}),
+    ))
+    assert compile_circuit(compiled.to_model()).fingerprint() == compiled.fingerprint()
+
+@pytest.mark.parametrize("gate, message", [
+    (QuantumGate(type='CNOT', position={'qubit': 1, 'step': 0}), "requires a control qubit"),
+    (QuantumGate(type='X', position={'qubit': 5, 'step': 0}), "outside the circuit"),
+    (QuantumGate(type='CNOT', position={'qubit': 1, 'step': 0}, control=1), "must be different"),
+    (QuantumGate(type='T', position={'qubit': 0, 'step': 0}), "Unsupported gate type"),
+    (QuantumGate(type='X', position={'step': 0}), "X gate position requires a qubit"),
+    (QuantumGate(type='RZ', position={'qubit': 0, 'step': 0}), "RZ gate requires an angle"),
+    (QuantumGate(type='SWAP', position={'qubit': 0, 'step': 0}), "SWAP gate requires a control qubit"),
+])
+def test_invalid_gates_are_rejected(gate, message):
+    with pytest.raises(ValueError, match=message):
+        compile_circuit(circuit(gate))
+
+def test_measurement_terminal_detection():
+    terminal = compile_circuit(circuit(
+        QuantumGate(type='H', position={'qubit': 0, 'step': 0}),
+        QuantumGate(type='MEASURE', position={'qubit': 0, 'step': 1}),
+        QuantumGate(type='X', position={'qubit': 1, 'step': 2}),
+    ))
+    feed_forward = compile_circuit(circuit(
+        QuantumGate(type='MEASURE', position={'qubit': 0, 'step': 0}),
+        QuantumGate(type='CNOT', position={'qubit': 1, 'step': 1}, control=0),
+    ))
+    assert terminal.is_measurement_terminal()
+    assert not feed_forward.is_measurement_terminal()
+
+def test_multi_controlled_gates_use_shared_control_table():
+    compiled = compile_circuit(circuit(
+        QuantumGate(type='MCZ', position={'qubit': 2, 'step': 0}, controls=[0, 1]),
+        QuantumGate(type='MCZ', position={'qubit': 0, 'step': 1}, controls=[2]),
+        qubits=3
+    ))
+    assert compiled.controls_of(compiled.param[0]) == [0, 1]
+    assert compiled.controls_of(compiled.param[1]) == [2]
+    assert compiled.to_model().gates[0].controls == [0, 1]
+    with pytest.raises(ValueError, match="must be different"):
+        compile_circuit(circuit(QuantumGate(type='MCZ', position={'qubit': 1, 'step': 0}, controls=[1])))
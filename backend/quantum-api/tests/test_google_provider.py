@@ -0,0 +1,21 @@
+import pytest
+from app.models import QuantumCircuit, QuantumGate
+
+pytest.importorskip("cirq")
+pytest.importorskip("cirq_google")
+from app.providers.google import GoogleQuantumProvider
+
+@pytest.mark.asyncio
+async def test_simulator_applies_gates_after_another_qubits_measurement():
+    circuit = QuantumCircuit(
+        gates=[
+            QuantumGate(type='X', position={'qubit': 0, 'step': 0}),
+            QuantumGate(type='MEASURE', position={'qubit': 0, 'step': 1}),
+            QuantumGate(type='X', position={'qubit': 1, 'step': 2}),
+            QuantumGate(type='MEASURE', position={'qubit': 1, 'step': 3}),
+        ],
+        qubits=2, steps=4, name="Staggered"
+    )
+    result = await GoogleQuantumProvider().execute_circuit(circuit, shots=50, seed=1)
+    assert result.measurements == {'11': 50}
+    assert result.states[1]['state']['beta'] == pytest.approx(1)
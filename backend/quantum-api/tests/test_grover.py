@@ -0,0 +1,24 @@
+import pytest
+from app.algorithms.grover import create_grover_circuit, find_marked_states
+from app.providers.local import LocalStatevectorProvider
+
+def test_marked_states_from_predicates_agree():
+    per_state = find_marked_states(4, lambda bits: bits[0] == 1 and bits[3] == 0)
+    vectorized = find_marked_states(4, lambda bits: (bits[:, 0] == 1) & (bits[:, 3] == 0), vectorized=True)
+    assert per_state.tolist() == vectorized.tolist() == [8, 10, 12, 14]
+
+def test_vectorized_oracle_shape_is_checked():
+    with pytest.raises(ValueError, match="must return 8 booleans"):
+        find_marked_states(3, lambda bits: bits == 1, vectorized=True)
+
+def test_oracle_is_built_once_per_circuit():
+    calls = []
+    create_grover_circuit(3, lambda bits: calls.append(bits) or bits == [1, 1, 0], num_iterations=3)
+    assert len(calls) == 8
+
+@pytest.mark.asyncio
+async def test_grover_amplifies_marked_state():
+    circuit = create_grover_circuit(4, marked_states=[0b0101])
+    result = await LocalStatevectorProvider().execute_circuit(circuit, shots=1000, seed=3)
+    assert max(result.measurements, key=result.measurements.get) == '0101'
+    assert result.measurements['0101'] > 900
@@ -0,0 +1,24 @@
+import numpy as np
+from app.simulation.histogram import counts_from_bits, counts_from_outcomes
+
+def test_counts_from_bits():
+    bits = np.array([[0, 1], [1, 1], [0, 1], [0, 0]])
+    assert counts_from_bits(bits) == {'01': 2, '11': 1, '00': 1}
+
+def test_counts_from_bits_wide_register():
+    rng = np.random.default_rng(7)
+    bits = rng.integers(0, 2, size=(500, 80))
+    bits[::2] = bits[0]
+    counts = counts_from_bits(bits)
+
+    assert sum(counts.values()) == 500
+    assert counts[''.join(map(str, bits[0]))] >= 250
+    assert all(len(key) == 80 for key in counts)
+
+def test_counts_from_bits_no_shots():
+    assert counts_from_bits(np.zeros((0, 3))) == {}
+
+def test_counts_from_outcomes_scatters_into_register():
+    # Outcomes enumerate measured qubits 0 and 2 of a 3-qubit register
+    outcomes = np.array([0b00, 0b11, 0b11, 0b10])
+    assert counts_from_outcomes(outcomes, [0, 2], 3) == {'000': 1, '101': 2, '100': 1}
@@ -0,0 +1,197 @@
+import asyncio
+import threading
+import pytest
+from app.services.job_queue import JobQueue
+from app.services.executors import ProviderExecutor, ProviderExecutors
+from app.providers.local import LocalStatevectorProvider
+from app.models import ExecutionRequest, JobEventType, JobStatus, ProviderType, QuantumCircuit, QuantumGate
+
+def bell_request(shots: int = 100) -> ExecutionRequest:
+    circuit = QuantumCircuit(
+        gates=[
+            QuantumGate(type='H', position={'qubit': 0, 'step': 0}),
+            QuantumGate(type='CNOT', position={'qubit': 1, 'step': 1}, control=0),
+        ],
+        qubits=2, steps=2, name="Bell"
+    )
+    return ExecutionRequest(circuit=circuit, provider=ProviderType.LOCAL, shots=shots)
+
+def local_executors(provider: LocalStatevectorProvider = None) -> ProviderExecutors:
+    return ProviderExecutors({ProviderType.LOCAL: provider or LocalStatevectorProvider()})
+
+@pytest.fixture(autouse=True)
+def thread_executors(monkeypatch):
+    monkeypatch.setenv("LOCAL_EXECUTOR", "thread")
+
+@pytest.mark.asyncio
+async def test_submit_returns_immediately_and_completes():
+    queue = JobQueue(local_executors())
+    job = queue.submit(bell_request(), owner="admin")
+    assert job.status == JobStatus.QUEUED
+
+    statuses = [update.status async for update in queue.events(job.id)]
+    assert statuses[-1] == JobStatus.COMPLETED
+
+    finished = queue.get(job.id)
+    assert sum(finished.result.measurements.values()) == 100
+    assert finished.finished_at is not None
+    queue.shutdown()
+
+@pytest.mark.asyncio
+async def test_failed_job_records_error():
+    queue = JobQueue(local_executors(LocalStatevectorProvider(max_qubits=1)))
+    job = queue.submit(bell_request(), owner="admin")
+    async for _ in queue.events(job.id):
+        pass
+    assert queue.get(job.id).status == JobStatus.FAILED
+    assert "at most 1" in queue.get(job.id).error
+    queue.shutdown()
+
+@pytest.mark.asyncio
+async def test_unknown_provider_is_rejected():
+    queue = JobQueue(ProviderExecutors({}))
+    with pytest.raises(ValueError):
+        queue.submit(bell_request(), owner="admin")
+
+@pytest.mark.asyncio
+async def test_finished_jobs_are_evicted():
+    queue = JobQueue(local_executors(), max_jobs=2)
+    first = queue.submit(bell_request(), owner="admin")
+    async for _ in queue.events(first.id):
+        pass
+    queue.submit(bell_request(), owner="admin")
+    queue.submit(bell_request(), owner="admin")
+    assert queue.get(first.id) is None
+    await asyncio.sleep(0)
+    queue.shutdown()
+
+@pytest.mark.asyncio
+async def test_executor_caps_concurrency_and_reports_metrics():
+    executor = ProviderExecutor(ProviderType.LOCAL, LocalStatevectorProvider(), max_workers=4, max_concurrency=1)
+    results = await asyncio.gather(*(executor.run(bell_request()) for _ in range(3)))
+    metrics = executor.metrics()
+
+    assert all(sum(result.measurements.values()) == 100 for result in results)
+    assert metrics.max_concurrency == 1
+    assert metrics.completed == 3
+    assert metrics.queue_depth == 0
+    assert metrics.max_wait_time > 0
+    executor.shutdown()
+
+@pytest.mark.asyncio
+async def test_process_executor_uses_provider_copy():
+    executor = ProviderExecutor(ProviderType.LOCAL, LocalStatevectorProvider(max_qubits=1), kind="process", max_workers=1)
+    with pytest.raises(Exception, match="at most 1"):
+        await executor.run(bell_request())
+    assert executor.metrics().failed == 1
+    executor.shutdown()
+
+def measured_request(shots: int) -> ExecutionRequest:
+    # A mid-circuit measurement forces one trajectory per shot
+    circuit = QuantumCircuit(
+        gates=[
+            QuantumGate(type='H', position={'qubit': 0, 'step': 0}),
+            QuantumGate(type='MEASURE', position={'qubit': 0, 'step': 1}),
+            QuantumGate(type='X', position={'qubit': 1, 'step': 2}),
+        ],
+        qubits=2, steps=3, name="Mid-circuit"
+    )
+    return ExecutionRequest(circuit=circuit, provider=ProviderType.LOCAL, shots=shots, seed=7)
+
+class LockstepProvider(LocalStatevectorProvider):
+    """Local provider whose worker waits until each progress update has been received."""
+
+    def __init__(self):
+        super().__init__()
+        self.received = threading.Semaphore(0)
+
+    async def execute_circuit(self, circuit, *args, progress=None, **kwargs):
+        def report(counts, completed):
+            progress(counts, completed)
+            assert self.received.acquire(timeout=5)
+        return await super().execute_circuit(circuit, *args, progress=report if progress else None, **kwargs)
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("request_factory", [bell_request, measured_request])
+async def test_job_streams_lifecycle_and_progress(request_factory):
+    provider = LockstepProvider()
+    queue = JobQueue(local_executors(provider))
+    job = queue.submit(request_factory(100), owner="admin", progress_interval=30)
+
+    # Undelivered progress is coalesced; keeping the worker in lockstep with
+    # this subscriber makes every update arrive separately
+    events = []
+    async for event in queue.subscribe(job.id):
+        events.append(event)
+        if event.type == JobEventType.PROGRESS:
+            provider.received.release()
+
+    types = [event.type for event in events]
+    assert types[:3] == [JobEventType.QUEUED, JobEventType.COMPILING, JobEventType.RUNNING]
+    assert types[-1] == JobEventType.COMPLETED
+    progress = [event.job.progress for event in events if event.type == JobEventType.PROGRESS]
+    assert [update.shots_completed for update in progress] == [30, 60, 90, 100]
+    assert all(sum(update.counts.values()) == update.shots_completed for update in progress)
+    assert progress[-1].counts == events[-1].job.result.measurements
+    queue.shutdown()
+
+@pytest.mark.asyncio
+async def test_progress_does_not_change_seeded_counts():
+    queue = JobQueue(local_executors())
+    request = bell_request(500).model_copy(update={'seed': 11})
+    plain = queue.submit(request, owner="admin")
+    streamed = queue.submit(request, owner="admin", progress_interval=7)
+    for job in (plain, streamed):
+        async for _ in queue.events(job.id):
+            pass
+    assert queue.get(plain.id).result.measurements == queue.get(streamed.id).result.measurements
+    assert queue.get(plain.id).progress is None
+    queue.shutdown()
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_receives_coalesced_progress():
+    queue = JobQueue(local_executors())
+    job = queue.submit(measured_request(200), owner="admin", progress_interval=10)
+    subscription = queue.subscribe(job.id)
+    first = await subscription.__anext__()
+    assert first.type == JobEventType.QUEUED
+
+    # Let the job finish before reading any further events
+    while queue.get(job.id).status != JobStatus.COMPLETED:
+        await asyncio.sleep(0.01)
+    events = [event async for event in subscription]
+
+    types = [event.type for event in events]
+    assert types == [
+        JobEventType.COMPILING, JobEventType.RUNNING, JobEventType.PROGRESS, JobEventType.COMPLETED
+    ]
+    assert events[2].job.progress.shots_completed == 200
+    queue.shutdown()
+
+@pytest.mark.asyncio
+async def test_process_executor_relays_progress():
+    executor = ProviderExecutor(ProviderType.LOCAL, LocalStatevectorProvider(), kind="process", max_workers=1)
+    updates = []
+    result = await executor.run(
+        measured_request(50),
+        progress=lambda counts, completed: updates.append((counts, completed)),
+        progress_interval=20
+    )
+    assert [completed for _, completed in updates] == [20, 40, 50]
+    assert updates[-1][0] == result.measurements
+    executor.shutdown()
+
+class PanickingProvider:
+    """Stands in for a Rust extension whose panic surfaces as a BaseException."""
+
+    async def execute_circuit(self, *args, **kwargs):
+        raise type("PanicException", (BaseException,), {})("interpreter is unsendable")
+
+@pytest.mark.asyncio
+async def test_provider_panic_fails_the_job():
+    queue = JobQueue(ProviderExecutors({ProviderType.LOCAL: PanickingProvider()}))
+    job = queue.submit(bell_request(), owner="admin")
+    statuses = [update.status async for update in queue.events(job.id)]
+    assert statuses[-1] == JobStatus.FAILED
+    assert "panicked: interpreter is unsendable" in queue.get(job.id).error
+    queue.shutdown()
@@ -0,0 +1,114 @@
+import pytest
+import numpy as np
+from app.providers.local import LocalStatevectorProvider
+from app.simulation.statevector import StatevectorSimulator
+from app.models import QuantumCircuit, QuantumGate, ProviderType
+from app.compiler import Op, compile_circuit
+
+def bell_circuit(measure: bool = True) -> QuantumCircuit:
+    gates = [
+        QuantumGate(type='H', position={'qubit': 0, 'step': 0}),
+        QuantumGate(type='CNOT', position={'qubit': 1, 'step': 1}, control=0),
+    ]
+    if measure:
+        gates += [
+            QuantumGate(type='MEASURE', position={'qubit': 0, 'step': 2}),
+            QuantumGate(type='MEASURE', position={'qubit': 1, 'step': 2}),
+        ]
+    return QuantumCircuit(gates=gates, qubits=2, steps=3, name="Bell")
+
+def test_statevector_bell_state():
+    simulator = StatevectorSimulator(2)
+    simulator.apply([(Op.H, 0, -1, -1), (Op.CNOT, 1, 0, -1)])
+    expected = np.array([1, 0, 0, 1]) / np.sqrt(2)
+    assert np.allclose(simulator.state, expected)
+
+def test_statevector_qubit_zero_is_most_significant():
+    simulator = StatevectorSimulator(3)
+    simulator.x(0)
+    assert simulator.state[0b100] == 1
+
+@pytest.mark.asyncio
+async def test_execute_bell_circuit():
+    provider = LocalStatevectorProvider()
+    result = await provider.execute_circuit(bell_circuit(), shots=2000)
+
+    assert result.provider == ProviderType.LOCAL
+    assert result.backend_used == "statevector"
+    assert set(result.measurements) <= {'00', '11'}
+    assert sum(result.measurements.values()) == 2000
+    assert result.states[0]['state']['alpha'] == pytest.approx(1 / np.sqrt(2))
+
+@pytest.mark.asyncio
+async def test_unmeasured_qubits_read_zero():
+    circuit = QuantumCircuit(
+        gates=[
+            QuantumGate(type='X', position={'qubit': 1, 'step': 0}),
+            QuantumGate(type='X', position={'qubit': 2, 'step': 0}),
+            QuantumGate(type='MEASURE', position={'qubit': 1, 'step': 1}),
+        ],
+        qubits=3, steps=2, name="Partial"
+    )
+    result = await LocalStatevectorProvider().execute_circuit(circuit, shots=10)
+    assert result.measurements == {'010': 10}
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", ["statevector", "sparse", "stabilizer"])
+async def test_gates_after_measuring_another_qubit_are_applied(backend):
+    circuit = QuantumCircuit(
+        gates=[
+            QuantumGate(type='X', position={'qubit': 0, 'step': 0}),
+            QuantumGate(type='MEASURE', position={'qubit': 0, 'step': 1}),
+            QuantumGate(type='X', position={'qubit': 1, 'step': 2}),
+            QuantumGate(type='MEASURE', position={'qubit': 1, 'step': 3}),
+        ],
+        qubits=2, steps=4, name="Staggered"
+    )
+    result = await LocalStatevectorProvider().execute_circuit(circuit, shots=50, backend_name=backend)
+    assert result.measurements == {'11': 50}
+    assert result.states[1]['state']['beta'] == pytest.approx(1)
+
+@pytest.mark.asyncio
+async def test_mid_circuit_measurement_uses_trajectories():
+    circuit = QuantumCircuit(
+        gates=[
+            QuantumGate(type='H', position={'qubit': 0, 'step': 0}),
+            QuantumGate(type='MEASURE', position={'qubit': 0, 'step': 1}),
+            QuantumGate(type='CNOT', position={'qubit': 1, 'step': 2}, control=0),
+            QuantumGate(type='MEASURE', position={'qubit': 1, 'step': 3}),
+        ],
+        qubits=2, steps=4, name="Feed-forward"
+    )
+    result = await LocalStatevectorProvider().execute_circuit(circuit, shots=200)
+    assert set(result.measurements) <= {'00', '11'}
+    assert sum(result.measurements.values()) == 200
+
+@pytest.mark.asyncio
+async def test_unsupported_gate_is_rejected():
+    circuit = QuantumCircuit(
+        gates=[QuantumGate(type='T', position={'qubit': 0, 'step': 0})],
+        qubits=1, steps=1, name="Unsupported"
+    )
+    with pytest.raises(Exception, match="Unsupported gate type"):
+        await LocalStatevectorProvider().execute_circuit(circuit)
+
+@pytest.mark.asyncio
+async def test_seeded_runs_are_reproducible():
+    provider = LocalStatevectorProvider()
+    first = await provider.execute_circuit(bell_circuit(), shots=500, seed=11)
+    second = await provider.execute_circuit(bell_circuit(), shots=500, seed=11)
+    assert first.measurements == second.measurements
+
+def test_state_cache_is_bounded():
+    provider = LocalStatevectorProvider(state_cache_bytes=2 * 16 * 4)
+    circuits = [
+        compile_circuit(QuantumCircuit(
+            gates=[QuantumGate(type='H', position={'qubit': 0, 'step': 0})],
+            qubits=qubits, steps=1, name=f"circuit-{qubits}"
+        ))
+        for qubits in (1, 2, 3)
+    ]
+    for circuit in circuits:
+        provider._prepare_state(circuit, len(circuit))
+    # The 128-byte 3-qubit state fills the whole budget, evicting the older states
+    assert list(provider._states) == [circuits[-1].fingerprint()]
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+from app.error_correction.monte_carlo import (
+    _space_time_incidence, estimate_logical_error_rates, sample_logical_failures, validate_sweep, wilson_interval
+)
+from app.models import LogicalErrorSweepRequest
+
+def test_wilson_interval():
+    low, high = wilson_interval(0, 1000)
+    assert low == pytest.approx(0, abs=1e-12) and 0 < high < 0.005
+    low, high = wilson_interval(500, 1000)
+    assert low == pytest.approx(1 - high)
+    assert low < 0.5 < high
+    # Higher confidence widens the interval
+    assert wilson_interval(50, 1000, 0.99)[1] > wilson_interval(50, 1000, 0.95)[1]
+
+def test_space_time_graph_has_one_or_two_events_per_mechanism():
+    checks = np.array([[1, 1, 0], [0, 1, 1]], dtype=np.uint8)
+    incidence = _space_time_incidence(checks, 3)
+    assert incidence.shape == (6, 9 + 4)
+    assert set(incidence.sum(axis=0).tolist()) == {1, 2}
+
+def test_noiseless_shots_never_fail():
+    assert sample_logical_failures(5, 0.0, 500, measurement_error_rate=0.0, rounds=3) == 0
+
+def test_larger_codes_fail_less_below_threshold():
+    seed = np.random.SeedSequence(11)
+    small = sample_logical_failures(3, 0.03, 4000, seed=seed)
+    large = sample_logical_failures(7, 0.03, 4000, seed=seed)
+    assert large < small
+
+def test_sweep_streams_partial_and_final_estimates():
+    request = LogicalErrorSweepRequest(distances=[3, 5], physical_error_rates=[0.02, 0.1], shots=2500, seed=4)
+    estimates = list(estimate_logical_error_rates(request, max_workers=0, batch_shots=1000))
+    final = [estimate for estimate in estimates if estimate.complete]
+    assert len(estimates) == 4 * 3
+    assert [(e.distance, e.physical_error_rate) for e in final] == [(3, 0.02), (3, 0.1), (5, 0.02), (5, 0.1)]
+    assert all(e.shots == 2500 and e.rounds == 1 for e in final)
+    for estimate in final:
+        low, high = estimate.confidence_interval
+        assert low <= estimate.logical_error_rate <= high
+
+def test_process_pool_matches_serial_sweep():
+    request = LogicalErrorSweepRequest(
+        distances=[3], physical_error_rates=[0.02, 0.05], shots=3000,
+        measurement_error_rate=0.02, seed=8
+    )
+    def totals(workers):
+        return sorted(
+            (e.physical_error_rate, e.rounds, e.failures)
+            for e in estimate_logical_error_rates(request, max_workers=workers, batch_shots=1000) if e.complete
+        )
+    assert totals(0) == totals(2)
+    assert all(rounds == 3 for _, rounds, _ in totals(0))
+
+def test_max_failures_stops_a_point_early():
+    request = LogicalErrorSweepRequest(distances=[3], physical_error_rates=[0.3], shots=50000, max_failures=100, seed=2)
+    estimates = list(estimate_logical_error_rates(request, max_workers=0, batch_shots=500))
+    assert estimates[-1].complete
+    assert estimates[-1].failures >= 100
+    assert estimates[-1].shots < 50000
+
+@pytest.mark.parametrize("changes, message", [
+    ({"distances": [4]}, "odd integer"),
+    ({"physical_error_rates": [1.5]}, "between 0 and 1"),
+    ({"physical_error_rates": []}, "at least one"),
+    ({"shots": 10 ** 6}, "exceeds the limit"),
+])
+def test_invalid_sweeps_are_rejected(changes, message):
+    values = {"distances": [3], "physical_error_rates": [0.01], "shots": 1000}
+    values.update(changes)
+    with pytest.raises(ValueError, match=message):
+        validate_sweep(LogicalErrorSweepRequest(**values), max_total_shots=10 ** 5)
@@ -0,0 +1,102 @@
+import asyncio
+import pytest
+from app.models import ExecutionRequest, ProviderType, QuantumCircuit, QuantumGate
+from app.services.executors import ProviderExecutors
+
+qsharp = pytest.importorskip("qsharp")
+from app.providers.microsoft import MicrosoftQuantumProvider
+
+def bell_circuit() -> QuantumCircuit:
+    return QuantumCircuit(
+        gates=[
+            QuantumGate(type='H', position={'qubit': 0, 'step': 0}),
+            QuantumGate(type='CNOT', position={'qubit': 1, 'step': 1}, control=0),
+            QuantumGate(type='RZ', position={'qubit': 1, 'step': 2}, angle=1e-5),
+            QuantumGate(type='MEASURE', position={'qubit': 0, 'step': 3}),
+            QuantumGate(type='MEASURE', position={'qubit': 1, 'step': 3}),
+        ],
+        qubits=2, steps=4, name="Bell"
+    )
+
+def test_generated_operation_compiles():
+    source = MicrosoftQuantumProvider()._generate_qsharp_operation(bell_circuit(), "GeneratedBell")
+    assert "for idx in 0..Length(qubits) - 1 {" in source
+    assert "[Zero, size = 2]" in source
+    assert "new Result" not in source and "DumpMachine([" not in source
+    qsharp.init()
+    qsharp.eval(source)
+    assert qsharp.run("GeneratedBell.RunCircuit()", shots=1)[0] in ([qsharp.Result.Zero] * 2, [qsharp.Result.One] * 2)
+
+@pytest.mark.asyncio
+async def test_per_shot_execution():
+    provider = MicrosoftQuantumProvider()
+    await provider.initialize()
+    result = await provider.execute_circuit(bell_circuit(), shots=20, include_states=False, sample_final_state=False)
+    assert set(result.measurements) <= {'00', '11'}
+    assert sum(result.measurements.values()) == 20
+
+@pytest.mark.asyncio
+async def test_final_state_sampling_releases_qubits():
+    provider = MicrosoftQuantumProvider()
+    await provider.initialize()
+    for seed in range(3):
+        # Each run would fail to reshape the dump if earlier qubits were still allocated
+        result = await provider.execute_circuit(bell_circuit(), shots=200, seed=seed)
+        assert set(result.measurements) == {'00', '11'}
+        assert result.states[0]['state']['alpha'] == pytest.approx(2 ** -0.5)
+    result = await provider.execute_circuit(bell_circuit(), shots=20, sample_final_state=False)
+    assert result.states[1]['state']['beta'] == pytest.approx(2 ** -0.5)
+
+@pytest.mark.asyncio
+async def test_concurrent_jobs_share_one_interpreter_thread():
+    provider = MicrosoftQuantumProvider()
+    # Initialized on the event loop thread, as at application startup
+    await provider.initialize()
+    executors = ProviderExecutors({ProviderType.MICROSOFT: provider})
+    request = ExecutionRequest(circuit=bell_circuit(), provider=ProviderType.MICROSOFT, shots=50)
+    try:
+        results = await asyncio.gather(
+            executors.run(request), executors.run(request.model_copy(update={'shots': 80}))
+        )
+    finally:
+        executors.shutdown()
+    assert [sum(result.measurements.values()) for result in results] == [50, 80]
+    assert executors.get(ProviderType.MICROSOFT).max_workers == 1
+
+@pytest.mark.asyncio
+async def test_optimization_keeps_gates_on_unmeasured_qubits():
+    # Every qubit is read out, so the X after the only measurement is observable
+    circuit = QuantumCircuit(
+        gates=[
+            QuantumGate(type='MEASURE', position={'qubit': 0, 'step': 0}),
+            QuantumGate(type='X', position={'qubit': 1, 'step': 1}),
+        ],
+        qubits=2, steps=2, name="Dead X"
+    )
+    provider = MicrosoftQuantumProvider()
+    await provider.initialize()
+    executors = ProviderExecutors({ProviderType.MICROSOFT: provider})
+    try:
+        result = await executors.run(ExecutionRequest(circuit=circuit, provider=ProviderType.MICROSOFT, shots=20))
+    finally:
+        executors.shutdown()
+    assert result.measurements == {'01': 20}
+    assert result.optimization.dead == 0
+
+@pytest.mark.asyncio
+async def test_mid_circuit_measurement_collapses_state():
+    # H·H is the identity, but the measurement in between leaves a uniform mix
+    circuit = QuantumCircuit(
+        gates=[
+            QuantumGate(type=gate, position={'qubit': 0, 'step': step})
+            for step, gate in enumerate(['H', 'MEASURE', 'H', 'MEASURE'])
+        ],
+        qubits=1, steps=4, name="Collapse"
+    )
+    provider = MicrosoftQuantumProvider()
+    await provider.initialize()
+    result = await provider.execute_circuit(circuit, shots=200)
+    assert set(result.measurements) == {'0', '1'}
+    assert 50 < result.measurements['0'] < 150
+    # The reported state is the one before the first measurement
+    assert result.states[0]['state']['alpha'] == pytest.approx(2 ** -0.5)
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+from app.compiler import Op, compile_circuit, optimize_circuit
+from app.models import QuantumCircuit, QuantumGate
+from app.simulation.statevector import StatevectorSimulator
+
+def gate(type: str, qubit: int, step: int, control=None) -> QuantumGate:
+    return QuantumGate(type=type, position={'qubit': qubit, 'step': step}, control=control)
+
+def compiled(*gates, qubits=2):
+    return compile_circuit(QuantumCircuit(gates=list(gates), qubits=qubits, steps=len(gates), name="Test"))
+
+def final_state(circuit):
+    simulator = StatevectorSimulator(circuit.qubits)
+    simulator.apply(circuit.operations(0, circuit.first_measurement()), circuit)
+    return simulator.state
+
+def test_cancels_through_commuting_gates():
+    # X on the CNOT target commutes with it, so the two CNOTs meet and cancel
+    circuit = compiled(gate('CNOT', 1, 0, control=0), gate('X', 1, 1), gate('CNOT', 1, 2, control=0))
+    optimized, report = optimize_circuit(circuit)
+    assert list(optimized.operations()) == [(Op.X, 1, -1, -1)]
+    assert report.cancelled == 2
+
+def test_does_not_cancel_through_blocking_gates():
+    circuit = compiled(gate('X', 0, 0), gate('CNOT', 1, 1, control=0), gate('X', 0, 2))
+    optimized, report = optimize_circuit(circuit, fuse=False)
+    assert len(optimized) == 3
+    assert report.gates_removed == 0
+
+def test_fuses_single_qubit_runs():
+    circuit = compiled(gate('H', 0, 0), gate('X', 0, 1), gate('H', 0, 2), gate('H', 1, 0), gate('X', 1, 1))
+    optimized, report = optimize_circuit(circuit)
+    assert optimized.opcode.tolist() == [Op.RZ, Op.U]
+    assert report.fused == 3
+    assert abs(np.vdot(final_state(circuit), final_state(optimized))) == pytest.approx(1)
+
+def test_without_fusion_only_known_gates_are_produced():
+    # H X H = Z becomes a Z rotation, while X H has no supported single-gate form
+    circuit = compiled(gate('H', 0, 0), gate('X', 0, 1), gate('H', 0, 2), gate('X', 1, 0), gate('H', 1, 1))
+    optimized, _ = optimize_circuit(circuit, fuse=False)
+    assert not optimized.has_fused_gates()
+    assert optimized.opcode.tolist() == [Op.RZ, Op.X, Op.H]
+    assert abs(np.vdot(final_state(circuit), final_state(optimized))) == pytest.approx(1)
+
+def test_removes_gates_after_final_measurement():
+    circuit = compiled(
+        gate('H', 0, 0),
+        gate('MEASURE', 0, 1),
+        gate('X', 0, 2),
+        gate('CNOT', 1, 3, control=0),
+        gate('MEASURE', 1, 4),
+        gate('H', 1, 5),
+    )
+    optimized, report = optimize_circuit(circuit)
+    assert optimized.opcode.tolist() == [Op.H, Op.MEASURE, Op.X, Op.CNOT, Op.MEASURE]
+    assert report.dead == 1
+    kept, report = optimize_circuit(circuit, remove_dead=False)
+    assert len(kept) == len(circuit) and report.dead == 0
+
+def test_first_measurement_is_a_barrier():
+    # Cancelling the H pair would change the state reported at the first measurement
+    circuit = compiled(gate('H', 1, 0), gate('MEASURE', 0, 1), gate('H', 1, 2), gate('MEASURE', 1, 3))
+    optimized, report = optimize_circuit(circuit)
+    assert report.gates_removed == 0
+    assert np.allclose(final_state(circuit), final_state(optimized))
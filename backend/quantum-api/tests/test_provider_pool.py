@@ -0,0 +1,121 @@
+import pickle
+import sys
+import pytest
+from app.models import ProviderType
+from app.providers import pool as pool_module
+from app.providers.pool import BackendPool
+from app.providers.registry import PROVIDER_CLASSES, LazyProvider, create_providers
+
+class Handle:
+    def __init__(self, name):
+        self.name = name
+        self.healthy = True
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(pool_module.time, "monotonic", lambda: now[0])
+    return now
+
+def test_pool_reuses_released_handles():
+    pool = BackendPool(Handle)
+    with pool.lease("qvm") as first:
+        pass
+    with pool.lease("qvm") as second:
+        assert second is first
+    with pool.lease("other") as other:
+        assert other is not first
+    assert pool.created == 2
+    assert pool.reused == 1
+
+def test_concurrent_leases_get_distinct_handles():
+    pool = BackendPool(Handle)
+    first = pool.acquire("qvm")
+    second = pool.acquire("qvm")
+    assert first is not second
+    pool.release("qvm", first)
+    pool.release("qvm", second)
+    assert pool.idle_count("qvm") == 2
+
+def test_failed_lease_discards_handle():
+    pool = BackendPool(Handle)
+    with pytest.raises(RuntimeError):
+        with pool.lease("qvm") as handle:
+            raise RuntimeError("connection reset")
+    assert pool.idle_count() == 0
+    with pool.lease("qvm") as replacement:
+        assert replacement is not handle
+
+def test_idle_limit():
+    pool = BackendPool(Handle, max_idle_per_backend=1)
+    handles = [pool.acquire("qvm") for _ in range(3)]
+    for handle in handles:
+        pool.release("qvm", handle)
+    assert pool.idle_count("qvm") == 1
+
+def test_idle_handles_are_evicted(clock):
+    pool = BackendPool(Handle, idle_timeout=60)
+    with pool.lease("qvm") as handle:
+        pass
+    clock[0] += 30
+    assert pool.acquire("qvm") is handle
+    pool.release("qvm", handle)
+    clock[0] += 61
+    assert pool.acquire("qvm") is not handle
+    assert pool.idle_count() == 0
+
+def test_unhealthy_handles_are_replaced(clock):
+    checks = []
+
+    def health_check(handle):
+        checks.append(handle)
+        return handle.healthy
+
+    pool = BackendPool(Handle, health_check=health_check, health_check_interval=10)
+    with pool.lease("qpu") as handle:
+        pass
+    # Recently used handles skip the check
+    assert pool.acquire("qpu") is handle
+    assert checks == []
+    pool.release("qpu", handle)
+
+    handle.healthy = False
+    clock[0] += 11
+    replacement = pool.acquire("qpu")
+    assert replacement is not handle
+    assert checks == [handle]
+
+def test_failing_health_check_counts_as_unhealthy(clock):
+    def health_check(handle):
+        raise ConnectionError("processor unreachable")
+
+    pool = BackendPool(Handle, health_check=health_check, health_check_interval=0)
+    with pool.lease("qpu") as handle:
+        pass
+    clock[0] += 1
+    assert pool.acquire("qpu") is not handle
+
+def test_registry_defers_provider_import():
+    providers = create_providers()
+    assert set(providers) == set(PROVIDER_CLASSES)
+    assert not any(provider.loaded for provider in providers.values())
+
+def test_lazy_provider_loads_on_first_use():
+    provider = LazyProvider(".local", "LocalStatevectorProvider")
+    assert not provider.loaded
+    assert provider.SUPPORTS_FUSED_GATES
+    assert provider.loaded
+    assert provider.load() is provider.load()
+    assert "app.providers.local" in sys.modules
+
+def test_lazy_provider_pickles_unloaded():
+    provider = create_providers()[ProviderType.LOCAL]
+    provider.load()
+    restored = pickle.loads(pickle.dumps(provider))
+    assert not restored.loaded
+    assert restored.BACKENDS == provider.BACKENDS
+
+def test_lazy_provider_missing_attribute():
+    provider = LazyProvider(".local", "LocalStatevectorProvider")
+    with pytest.raises(AttributeError):
+        provider.not_a_provider_method
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+from app.algorithms.qft import create_qft_circuit
+from app.compiler import compile_circuit
+from app.simulation.statevector import StatevectorSimulator
+
+def transform(num_qubits: int, basis_state: int, **options) -> np.ndarray:
+    circuit = compile_circuit(create_qft_circuit(num_qubits, **options))
+    simulator = StatevectorSimulator(num_qubits)
+    simulator.state[:] = 0
+    simulator.state[basis_state] = 1
+    simulator.apply(circuit.operations(0, circuit.first_measurement()), circuit)
+    return simulator.state
+
+@pytest.mark.parametrize("basis_state", [0, 1, 6, 13])
+def test_qft_matches_discrete_fourier_transform(basis_state):
+    size = 2 ** 4
+    expected = np.sqrt(size) * np.fft.ifft(np.eye(size)[basis_state])
+    assert np.allclose(transform(4, basis_state), expected)
+
+def test_inverse_qft_undoes_qft():
+    forward = transform(3, 5)
+    circuit = compile_circuit(create_qft_circuit(3, inverse=True))
+    simulator = StatevectorSimulator(3)
+    simulator.state[:] = forward
+    simulator.apply(circuit.operations(0, circuit.first_measurement()), circuit)
+    assert np.allclose(simulator.state, np.eye(8)[5])
+
+def test_approximate_qft_drops_small_rotations():
+    exact = create_qft_circuit(32)
+    approximate = create_qft_circuit(32, min_angle=np.pi / 2 ** 4)
+    rotations = [gate for gate in approximate.gates if gate.type == 'CPHASE']
+    assert min(gate.angle for gate in rotations) == pytest.approx(np.pi / 2 ** 4)
+    assert len(rotations) < sum(gate.type == 'CPHASE' for gate in exact.gates) / 4
+    # Small rotations barely change the result
+    assert abs(np.vdot(transform(6, 9), transform(6, 9, min_angle=np.pi / 2 ** 4))) > 0.95
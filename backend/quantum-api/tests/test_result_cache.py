@@ -0,0 +1,43 @@
+import time
+from app.services.result_cache import ExecutionCache, is_simulator_request
+from app.models import ExecutionRequest, ExecutionResult, ProviderType, QuantumCircuit, QuantumGate
+
+def make_request(**overrides) -> ExecutionRequest:
+    circuit = QuantumCircuit(
+        gates=[QuantumGate(type='H', position={'qubit': 0, 'step': 0})],
+        qubits=1, steps=1, name="Superposition"
+    )
+    return ExecutionRequest(**{'circuit': circuit, 'provider': ProviderType.LOCAL, **overrides})
+
+def make_result() -> ExecutionResult:
+    return ExecutionResult(
+        measurements={'0': 3, '1': 5}, states=[], provider=ProviderType.LOCAL,
+        backend_used="statevector", execution_time=0.1
+    )
+
+def test_key_ignores_circuit_name_but_not_seed():
+    base = make_request(seed=1)
+    renamed = base.model_copy(update={'circuit': base.circuit.model_copy(update={'name': 'Other'})})
+    assert ExecutionCache.key(base) == ExecutionCache.key(renamed)
+    assert ExecutionCache.key(base) != ExecutionCache.key(make_request(seed=2))
+    assert ExecutionCache.key(base) != ExecutionCache.key(make_request(seed=1, shots=10))
+
+def test_lru_eviction_and_ttl():
+    cache = ExecutionCache(max_entries=1, ttl=0.05)
+    cache.put("a", make_result())
+    cache.put("b", make_result())
+    assert cache.get("a") is None
+    assert cache.get("b") is not None
+    time.sleep(0.06)
+    assert cache.get("b") is None
+
+def test_disk_tier_survives_new_instance(tmp_path):
+    ExecutionCache(disk_path=str(tmp_path)).put("key", make_result())
+    restored = ExecutionCache(disk_path=str(tmp_path)).get("key")
+    assert restored == make_result()
+
+def test_only_simulators_are_cached():
+    assert is_simulator_request(make_request())
+    assert is_simulator_request(make_request(provider=ProviderType.IBM))
+    assert not is_simulator_request(make_request(provider=ProviderType.IBM, backend_name="ibm_kyoto"))
+    assert not is_simulator_request(make_request(provider=ProviderType.GOOGLE, backend_name="rainbow"))
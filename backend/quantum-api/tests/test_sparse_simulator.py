@@ -0,0 +1,103 @@
+import pytest
+import numpy as np
+from app.providers.local import LocalStatevectorProvider
+from app.simulation.sparse import SparseStatevectorSimulator
+from app.simulation.statevector import StatevectorSimulator
+from app.simulation.state_analysis import reduced_density_matrices
+from app.models import QuantumCircuit, QuantumGate
+
+def random_unitary(rng: np.random.Generator) -> np.ndarray:
+    return np.linalg.qr(rng.normal(size=(2, 2)) + 1j * rng.normal(size=(2, 2)))[0]
+
+def ghz_circuit(qubits: int) -> QuantumCircuit:
+    gates = [QuantumGate(type='H', position={'qubit': 0, 'step': 0})]
+    gates += [
+        QuantumGate(type='CNOT', position={'qubit': qubit, 'step': qubit}, control=qubit - 1)
+        for qubit in range(1, qubits)
+    ]
+    return QuantumCircuit(gates=gates, qubits=qubits, steps=qubits, name="GHZ")
+
+def uniform_circuit(qubits: int) -> QuantumCircuit:
+    gates = [QuantumGate(type='H', position={'qubit': qubit, 'step': 0}) for qubit in range(qubits)]
+    return QuantumCircuit(gates=gates, qubits=qubits, steps=1, name="Uniform")
+
+def test_sparse_matches_dense_on_random_circuits():
+    rng = np.random.default_rng(5)
+    for _ in range(50):
+        dense, sparse = StatevectorSimulator(4), SparseStatevectorSimulator(4)
+        for _ in range(20):
+            first, second = (int(q) for q in rng.choice(4, size=2, replace=False))
+            gate = int(rng.integers(7))
+            if gate == 0:
+                operation = ('h', first)
+            elif gate == 1:
+                operation = ('cnot', first, second)
+            elif gate == 2:
+                operation = ('rz', first, float(rng.normal()))
+            elif gate == 3:
+                operation = ('cphase', first, second, float(rng.normal()))
+            elif gate == 4:
+                operation = ('swap', first, second)
+            elif gate == 5:
+                operation = ('mcz', [first, second])
+            else:
+                operation = ('unitary', first, random_unitary(rng))
+            for simulator in (dense, sparse):
+                getattr(simulator, operation[0])(*operation[1:])
+
+        assert np.allclose(sparse.to_dense().state, dense.state)
+        assert np.allclose(sparse.reduced_density_matrices(), reduced_density_matrices(dense.state))
+
+def test_cancelled_amplitudes_are_dropped():
+    simulator = SparseStatevectorSimulator(3)
+    simulator.h(1)
+    assert simulator.nnz == 2
+    simulator.h(1)
+    assert simulator.nnz == 1
+    assert simulator.indices.tolist() == [0]
+
+def test_measurement_collapses_like_dense():
+    sparse, dense = SparseStatevectorSimulator(2), StatevectorSimulator(2)
+    for simulator in (sparse, dense):
+        simulator.h(0)
+        simulator.cnot(0, 1)
+    assert sparse.measure(0, np.random.default_rng(3)) == dense.measure(0, np.random.default_rng(3))
+    assert np.allclose(sparse.to_dense().state, dense.state)
+
+@pytest.mark.asyncio
+async def test_wide_ghz_state_uses_sparse_backend():
+    circuit = ghz_circuit(48)
+    # A non-Clifford rotation keeps the circuit off the stabilizer engine
+    circuit.gates.append(QuantumGate(type='RZ', position={'qubit': 0, 'step': 48}, angle=0.3))
+    result = await LocalStatevectorProvider().execute_circuit(circuit, shots=500, seed=2)
+    assert result.backend_used == "sparse"
+    assert set(result.measurements) == {'0' * 48, '1' * 48}
+    assert sum(result.measurements.values()) == 500
+    assert result.states[47]['state']['z'] == pytest.approx(0)
+
+@pytest.mark.asyncio
+async def test_auto_switches_to_dense_for_dense_states():
+    provider = LocalStatevectorProvider()
+    result = await provider.execute_circuit(uniform_circuit(8), shots=100)
+    assert result.backend_used == "statevector"
+    result = await provider.execute_circuit(ghz_circuit(8), shots=100)
+    assert result.backend_used == "sparse"
+
+@pytest.mark.asyncio
+async def test_sparse_and_dense_backends_agree():
+    circuit = ghz_circuit(6)
+    provider = LocalStatevectorProvider()
+    sparse = await provider.execute_circuit(circuit, shots=400, seed=9, backend_name="sparse")
+    dense = await provider.execute_circuit(circuit, shots=400, seed=9, backend_name="statevector")
+    assert sparse.backend_used == "sparse"
+    assert sparse.measurements == dense.measurements
+
+@pytest.mark.asyncio
+async def test_backend_limits():
+    provider = LocalStatevectorProvider(max_dense_qubits=10, max_sparse_amplitudes=64)
+    with pytest.raises(Exception, match="dense statevector simulation supports at most 10"):
+        await provider.execute_circuit(ghz_circuit(12), backend_name="statevector")
+    with pytest.raises(Exception, match="more than 64 nonzero amplitudes"):
+        await provider.execute_circuit(uniform_circuit(12))
+    with pytest.raises(Exception, match="Unknown local backend"):
+        await provider.execute_circuit(ghz_circuit(2), backend_name="tensor")
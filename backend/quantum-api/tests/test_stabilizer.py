@@ -0,0 +1,118 @@
+import pytest
+import numpy as np
+from app.compiler import compile_circuit
+from app.error_correction.surface_code import SurfaceCode
+from app.models import QuantumCircuit, QuantumGate
+from app.providers.local import LocalStatevectorProvider
+from app.simulation.stabilizer import StabilizerSimulator, StabilizerTableau, compile_clifford, is_clifford
+from app.simulation.state_analysis import bloch_vectors, reduced_density_matrices
+from app.simulation.statevector import StatevectorSimulator
+
+def random_clifford_circuit(rng: np.random.Generator, qubits: int, length: int) -> QuantumCircuit:
+    gates = []
+    for step in range(length):
+        first, second = (int(q) for q in rng.choice(qubits, size=2, replace=False))
+        kind = int(rng.integers(6))
+        position = {'qubit': first, 'step': step}
+        if kind == 0:
+            gates.append(QuantumGate(type='H', position=position))
+        elif kind == 1:
+            gates.append(QuantumGate(type='X', position=position))
+        elif kind == 2:
+            gates.append(QuantumGate(type='CNOT', position=position, control=second))
+        elif kind == 3:
+            gates.append(QuantumGate(type='RZ', position=position, angle=float(np.pi / 2 * rng.integers(-3, 4))))
+        elif kind == 4:
+            gates.append(QuantumGate(type='CPHASE', position=position, control=second, angle=np.pi))
+        else:
+            gates.append(QuantumGate(type='SWAP', position=position, control=second))
+    return QuantumCircuit(gates=gates, qubits=qubits, steps=length, name="Random Clifford")
+
+def test_bloch_vectors_match_statevector():
+    rng = np.random.default_rng(4)
+    for _ in range(40):
+        circuit = compile_circuit(random_clifford_circuit(rng, 4, 30))
+        dense = StatevectorSimulator(4)
+        dense.apply(circuit.operations(), circuit)
+        stabilizer = StabilizerSimulator(circuit)
+        expected = bloch_vectors(reduced_density_matrices(dense.state))
+        assert np.allclose(stabilizer.tableau.bloch_vectors(), expected)
+
+def test_measurement_is_deterministic_for_eigenstates():
+    tableau = StabilizerTableau(3)
+    tableau.x_gate(1)
+    tableau.h(2)
+    tableau.s(2)
+    tableau.s(2)
+    tableau.h(2)
+    # H Z H = X, so qubit 2 is back in |1>
+    outcomes = [tableau.measure(qubit, np.random.default_rng()) for qubit in range(3)]
+    assert outcomes == [0, 1, 1]
+
+def test_random_measurement_collapses():
+    tableau = StabilizerTableau(2)
+    tableau.h(0)
+    tableau.cnot(0, 1)
+    first = tableau.measure(0, np.random.default_rng(3))
+    assert tableau.measure(1, np.random.default_rng(8)) == first
+
+def test_clifford_detection():
+    def circuit(*gates):
+        return compile_circuit(QuantumCircuit(gates=list(gates), qubits=3, steps=len(gates), name="c"))
+
+    assert is_clifford(circuit(QuantumGate(type='RZ', position={'qubit': 0, 'step': 0}, angle=-np.pi / 2)))
+    assert not is_clifford(circuit(QuantumGate(type='RZ', position={'qubit': 0, 'step': 0}, angle=np.pi / 4)))
+    assert not is_clifford(circuit(QuantumGate(type='CPHASE', position={'qubit': 0, 'step': 0}, control=1, angle=np.pi / 2)))
+    assert is_clifford(circuit(QuantumGate(type='MCZ', position={'qubit': 0, 'step': 0}, controls=[1])))
+    assert not is_clifford(circuit(QuantumGate(type='MCZ', position={'qubit': 0, 'step': 0}, controls=[1, 2])))
+
+def test_unmeasured_circuit_measures_every_qubit():
+    program = compile_clifford(compile_circuit(QuantumCircuit(
+        gates=[QuantumGate(type='H', position={'qubit': 0, 'step': 0})], qubits=2, steps=1, name="c"
+    )))
+    assert program[-2:] == [('measure', 0, -1), ('measure', 1, -1)]
+
+def test_mid_circuit_measurements_are_correlated():
+    circuit = QuantumCircuit(
+        gates=[
+            QuantumGate(type='H', position={'qubit': 0, 'step': 0}),
+            QuantumGate(type='MEASURE', position={'qubit': 0, 'step': 1}),
+            QuantumGate(type='CNOT', position={'qubit': 1, 'step': 2}, control=0),
+            QuantumGate(type='H', position={'qubit': 2, 'step': 2}),
+            QuantumGate(type='MEASURE', position={'qubit': 1, 'step': 3}),
+        ],
+        qubits=3, steps=4, name="Feed-forward"
+    )
+    counts = StabilizerSimulator(compile_circuit(circuit)).sample_counts([], 5000, np.random.default_rng(1))
+    assert set(counts) == {'000', '110'}
+    assert counts['110'] == pytest.approx(2500, abs=200)
+
+def test_progress_does_not_change_seeded_counts():
+    simulator = StabilizerSimulator(compile_circuit(SurfaceCode(3).create_stabilizer_circuit()))
+    updates = []
+    plain = simulator.sample_counts([], 5000, np.random.default_rng(2))
+    streamed = simulator.sample_counts(
+        [], 5000, np.random.default_rng(2), lambda counts, completed: updates.append(completed), 1500
+    )
+    assert plain == streamed
+    assert updates == [1500, 3000, 4500, 5000]
+
+@pytest.mark.asyncio
+async def test_wide_surface_code_uses_stabilizer_backend():
+    circuit = SurfaceCode(15).create_stabilizer_circuit()
+    result = await LocalStatevectorProvider().execute_circuit(circuit, shots=200, seed=5)
+    assert circuit.qubits == 449
+    assert result.backend_used == "stabilizer"
+    assert sum(result.measurements.values()) == 200
+    assert all(len(bitstring) == 449 for bitstring in result.measurements)
+    # Data qubits are never measured
+    assert all(set(bitstring[:225]) == {'0'} for bitstring in result.measurements)
+
+@pytest.mark.asyncio
+async def test_stabilizer_backend_rejects_non_clifford_circuits():
+    circuit = QuantumCircuit(
+        gates=[QuantumGate(type='RZ', position={'qubit': 0, 'step': 0}, angle=0.1)],
+        qubits=1, steps=1, name="Rotation"
+    )
+    with pytest.raises(Exception, match="only Clifford"):
+        await LocalStatevectorProvider().execute_circuit(circuit, backend_name="stabilizer")
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+from app.simulation.state_analysis import bloch_vectors, qubit_states, reduced_density_matrices
+from app.simulation.statevector import StatevectorSimulator
+from app.providers.local import LocalStatevectorProvider
+from app.models import QuantumCircuit, QuantumGate
+
+def brute_force_rho(state: np.ndarray, qubit: int) -> np.ndarray:
+    tensor = np.moveaxis(state, qubit, 0).reshape(2, -1)
+    return tensor @ tensor.conj().T
+
+def test_matches_explicit_partial_trace():
+    rng = np.random.default_rng(7)
+    state = rng.normal(size=2 ** 5) + 1j * rng.normal(size=2 ** 5)
+    state /= np.linalg.norm(state)
+    rhos = reduced_density_matrices(state)
+    for qubit in range(5):
+        assert np.allclose(rhos[qubit], brute_force_rho(state.reshape((2,) * 5), qubit))
+
+def test_bloch_vectors_of_product_and_entangled_states():
+    simulator = StatevectorSimulator(3)
+    simulator.h(0)
+    simulator.h(1)
+    simulator.rz(1, np.pi / 2)
+    simulator.x(2)
+    assert np.allclose(bloch_vectors(reduced_density_matrices(simulator.state)), [[1, 0, 0], [0, 1, 0], [0, 0, -1]])
+
+    bell = StatevectorSimulator(2)
+    bell.h(0)
+    bell.cnot(0, 1)
+    # Maximally entangled qubits have mixed reduced states at the centre of the sphere
+    assert np.allclose(bloch_vectors(reduced_density_matrices(bell.state)), 0)
+    assert qubit_states(bell.state)[1]['state']['beta'] == pytest.approx(1 / np.sqrt(2))
+
+@pytest.mark.asyncio
+async def test_state_extraction_can_be_skipped():
+    circuit = QuantumCircuit(
+        gates=[QuantumGate(type='H', position={'qubit': 0, 'step': 0})],
+        qubits=1, steps=1, name="Plus"
+    )
+    provider = LocalStatevectorProvider()
+    assert (await provider.execute_circuit(circuit, shots=10, include_states=False)).states == []
+    states = (await provider.execute_circuit(circuit, shots=10)).states
+    assert states[0]['state']['x'] == pytest.approx(1)
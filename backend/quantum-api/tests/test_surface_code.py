@@ -0,0 +1,72 @@
+import itertools
+import numpy as np
+import pytest
+from app.compiler import compile_circuit
+from app.error_correction.surface_code import SurfaceCode, UnionFindDecoder
+from app.simulation.stabilizer import StabilizerSimulator
+
+@pytest.mark.parametrize("distance", [3, 5, 7])
+def test_stabilizers_commute_with_each_other_and_the_logicals(distance):
+    code = SurfaceCode(distance)
+    x_checks = code.incidence[code.x_stabilizers].astype(int)
+    z_checks = code.incidence[code.z_stabilizers].astype(int)
+    assert code.incidence.shape == (distance ** 2 - 1, distance ** 2)
+    assert not ((x_checks @ z_checks.T) % 2).any()
+    assert not ((z_checks @ code.logical_x) % 2).any()
+    assert not ((x_checks @ code.logical_z) % 2).any()
+    assert int(code.logical_x @ code.logical_z) % 2 == 1
+
+def test_layout_is_shared_per_distance():
+    assert SurfaceCode(5).incidence is SurfaceCode(5).incidence
+    with pytest.raises(ValueError):
+        SurfaceCode(5).incidence[0, 0] = 1
+
+@pytest.mark.parametrize("distance", [3, 5])
+def test_corrects_every_error_up_to_half_the_distance(distance):
+    code = SurfaceCode(distance)
+    errors = []
+    for weight in range(1, (distance - 1) // 2 + 1):
+        for qubits in itertools.combinations(range(code.num_data_qubits), weight):
+            error = np.zeros(code.num_data_qubits, dtype=np.uint8)
+            error[list(qubits)] = 1
+            errors.append(error)
+    errors = np.array(errors)
+    none = np.zeros_like(errors)
+    for x_errors, z_errors in ((errors, none), (none, errors)):
+        x_corrections, z_corrections = code.decode_batch(code.syndromes(x_errors, z_errors))
+        x_residual, z_residual = x_errors ^ x_corrections, z_errors ^ z_corrections
+        assert not code.syndromes(x_residual, z_residual).any()
+        x_flips, z_flips = code.logical_errors(x_residual, z_residual)
+        assert not x_flips.any() and not z_flips.any()
+
+def test_batch_decoding_matches_single_shots():
+    code = SurfaceCode(7)
+    rng = np.random.default_rng(3)
+    x_errors = (rng.random((300, code.num_data_qubits)) < 0.04).astype(np.uint8)
+    z_errors = (rng.random((300, code.num_data_qubits)) < 0.04).astype(np.uint8)
+    syndromes = code.syndromes(x_errors, z_errors)
+    x_corrections, z_corrections = code.decode_batch(syndromes)
+    assert not code.syndromes(x_errors ^ x_corrections, z_errors ^ z_corrections).any()
+    for shot in range(0, 300, 37):
+        corrections = code.decode_syndrome(syndromes[shot].tolist())
+        assert [qubit for op, qubit in corrections if op == 'X'] == np.flatnonzero(x_corrections[shot]).tolist()
+        assert [qubit for op, qubit in corrections if op == 'Z'] == np.flatnonzero(z_corrections[shot]).tolist()
+
+def test_trivial_syndrome_needs_no_correction():
+    code = SurfaceCode(3)
+    assert code.decode_syndrome([0] * code.num_measure_qubits) == []
+    with pytest.raises(ValueError):
+        code.decode_batch(np.zeros((2, 3)))
+
+def test_decoder_rejects_qubits_outside_the_graph():
+    with pytest.raises(ValueError, match="one or two stabilizers"):
+        UnionFindDecoder(np.array([[1, 0], [1, 0]]))
+
+def test_stabilizer_circuit_has_deterministic_z_syndrome():
+    code = SurfaceCode(5)
+    simulator = StabilizerSimulator(compile_circuit(code.create_stabilizer_circuit()))
+    counts = simulator.sample_counts([], 200, np.random.default_rng(0))
+    z_columns = code.num_data_qubits + code.z_stabilizers
+    # Z stabilizers of |0...0> are +1; the X stabilizers are projected at random
+    assert all(not any(int(bitstring[column]) for column in z_columns) for bitstring in counts)
+    assert len(counts) > 1
@@ -0,0 +1,33 @@
+import pytest
+from app.algorithms.templates import TemplateRegistry, templates
+from app.models import QuantumCircuit
+
+def test_instances_are_memoized_and_read_only():
+    first = templates.instantiate("qft", qubits=4)
+    assert templates.instantiate("qft", qubits="4") is first
+    assert templates.instantiate("qft", qubits=4, inverse=True) is not first
+    with pytest.raises(ValueError):
+        first.opcode[0] = 0
+    private = first.copy()
+    private.opcode[0] = 0
+
+def test_json_matches_compiled_circuit():
+    document = templates.instantiate_json("grover", qubits=3, marked_states=["5"])
+    circuit = QuantumCircuit.model_validate_json(document)
+    assert circuit.qubits == 3
+    assert circuit.model_dump_json() == templates.instantiate("grover", qubits=3, marked_states=[5]).to_model().model_dump_json()
+
+def test_invalid_parameters_are_rejected():
+    with pytest.raises(ValueError, match="Invalid parameters for surface_code"):
+        templates.instantiate("surface_code", distance=2)
+    with pytest.raises(KeyError):
+        templates.instantiate("shor", qubits=4)
+
+def test_cache_is_bounded():
+    registry = TemplateRegistry(max_entries=2)
+    for template in templates.available():
+        registry.register(template)
+    for qubits in (1, 2, 3):
+        registry.instantiate("qft", qubits=qubits)
+    assert len(registry._instances) == 2
+    assert templates.get_template("grover").list_fields() == ["marked_states"]
@@ -0,0 +1,139 @@
+"""
+Line-level deltas between circuit versions.
+
+A delta is a JSON-serializable list of operations applied to the lines of
+the base version in order: ``["=", n]`` copies the next ``n`` lines,
+``["-", n]`` skips them and ``["+", lines]`` inserts new ones. QASM has one
+statement per line, so line deltas are also gate-level deltas.
+
+Deltas are computed with Myers' O(ND) difference algorithm ("An O(ND)
+Difference Algorithm and Its Variations", 1986) after trimming the common
+prefix and suffix, so the usual commit, which touches a few lines of a large
+file, costs time proportional to the file plus the square of the edit size.
+Edits larger than ``MAX_EDIT_DISTANCE`` are stored as a full replacement.
+"""
+from typing import Dict, List, Sequence
+
+# Beyond this many inserted plus deleted lines a minimal diff is not worth its cost
+MAX_EDIT_DISTANCE = 2000
+
+def split_lines(content: str) -> List[str]:
+    """Lines of ``content`` including their line endings."""
+    return content.splitlines(keepends=True)
+
+def _myers(old: Sequence[str], new: Sequence[str]) -> List[str]:
+    """Shortest edit script as one of '=', '-', '+' per step, or [] if too long."""
+    n, m = len(old), len(new)
+    frontier: Dict[int, int] = {1: 0}
+    trace = []
+    for distance in range(min(n + m, MAX_EDIT_DISTANCE) + 1):
+        trace.append(dict(frontier))
+        for k in range(-distance, distance + 1, 2):
+            if k == -distance or (k != distance and frontier[k - 1] < frontier[k + 1]):
+                x = frontier[k + 1]
+            else:
+                x = frontier[k - 1] + 1
+            y = x - k
+            while x < n and y < m and old[x] == new[y]:
+                x += 1
+                y += 1
+            frontier[k] = x
+            if x >= n and y >= m:
+                return _backtrack(trace, n, m)
+    return []
+
+def _backtrack(trace: List[Dict[int, int]], n: int, m: int) -> List[str]:
+    steps = []
+    x, y = n, m
+    for distance in range(len(trace) - 1, -1, -1):
+        frontier = trace[distance]
+        k = x - y
+        if k == -distance or (k != distance and frontier[k - 1] < frontier[k + 1]):
+            previous_k = k + 1
+        else:
+            previous_k = k - 1
+        previous_x = frontier[previous_k]
+        previous_y = previous_x - previous_k
+        while x > previous_x and y > previous_y:
+            steps.append('=')
+            x -= 1
+            y -= 1
+        if distance > 0:
+            steps.append('+' if x == previous_x else '-')
+        x, y = previous_x, previous_y
+    steps.reverse()
+    return steps
+
+def _append(operations: List[list], tag: str, value):
+    if operations and operations[-1][0] == tag:
+        operations[-1][1] += value
+    else:
+        operations.append([tag, value])
+
+def diff_lines(old: Sequence[str], new: Sequence[str]) -> List[list]:
+    """Delta turning the lines ``old`` into the lines ``new``."""
+    prefix = 0
+    while prefix < min(len(old), len(new)) and old[prefix] == new[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < min(len(old), len(new)) - prefix and old[-1 - suffix] == new[-1 - suffix]:
+        suffix += 1
+    old_middle = old[prefix:len(old) - suffix]
+    new_middle = new[prefix:len(new) - suffix]
+
+    operations: List[list] = []
+    if prefix:
+        _append(operations, '=', prefix)
+    steps = _myers(old_middle, new_middle) if old_middle and new_middle else []
+    if steps:
+        position = 0
+        for step in steps:
+            if step == '+':
+                _append(operations, '+', [new_middle[position]])
+                position += 1
+            elif step == '=':
+                _append(operations, '=', 1)
+                position += 1
+            else:
+                _append(operations, '-', 1)
+    else:
+        # Pure insertion or deletion, or an edit too large to minimize
+        if old_middle:
+            _append(operations, '-', len(old_middle))
+        if new_middle:
+            _append(operations, '+', list(new_middle))
+    if suffix:
+        _append(operations, '=', suffix)
+    return operations
+
+def apply_delta(old: Sequence[str], delta: List[list]) -> List[str]:
+    """
+    Apply a delta to the lines of its base version.
+
+    Raises:
+        ValueError: If the delta does not fit the base
+    """
+    lines: List[str] = []
+    position = 0
+    for tag, value in delta:
+        if tag == '=':
+            if position + value > len(old):
+                raise ValueError("Delta copies past the end of its base")
+            lines.extend(old[position:position + value])
+            position += value
+        elif tag == '-':
+            position += value
+        elif tag == '+':
+            lines.extend(value)
+        else:
+            raise ValueError(f"Unknown delta operation {tag}")
+    if position != len(old):
+        raise ValueError("Delta does not cover its base")
+    return lines
+
+def delta_stats(delta: List[list]) -> Dict[str, int]:
+    """Number of lines a delta adds and removes."""
+    return {
+        "added": sum(len(value) for tag, value in delta if tag == '+'),
+        "removed": sum(value for tag, value in delta if tag == '-')
+    }
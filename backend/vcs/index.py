@@ -0,0 +1,175 @@
+"""
+Secondary indexes over circuits.
+
+Author and branch map to sets of circuit ids; name (case-insensitive),
+updated_at and qubit count are kept as sorted lists of (key, circuit id),
+so prefix and range filters are two binary searches and ordering by any of
+them needs no sort. A query intersects the id sets of its filters, smallest
+first, and then reads its page off the sorted list of the sort field, or
+sorts the matches directly when they are few. Pages are keyset-paginated:
+the cursor is the sort key and id of the last circuit returned, so it stays
+valid while circuits are created and updated.
+"""
+import base64
+import json
+import re
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+from .models import QuantumCircuit
+
+SORT_FIELDS = ("updated_at", "name", "qubits")
+
+# qreg q[5]; (OpenQASM 2) and qubit[5] q; (OpenQASM 3)
+_QREG = re.compile(r"^\s*qreg\s+[A-Za-z_]\w*\s*\[\s*(\d+)\s*\]\s*;", re.MULTILINE)
+_QUBIT = re.compile(r"^\s*qubit\s*(?:\[\s*(\d+)\s*\])?\s+[A-Za-z_]\w*\s*;", re.MULTILINE)
+
+def count_qubits(content: str) -> int:
+    """Number of qubits declared by a QASM program."""
+    return sum(int(size) for size in _QREG.findall(content)) + \
+        sum(int(size) if size else 1 for size in _QUBIT.findall(content))
+
+def _encode_cursor(sort: str, key, circuit_id: str) -> str:
+    value = key.isoformat() if isinstance(key, datetime) else key
+    return base64.urlsafe_b64encode(json.dumps([sort, value, circuit_id]).encode()).decode()
+
+def _decode_cursor(cursor: str, sort: str) -> Tuple:
+    try:
+        field, value, circuit_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if field != sort or not isinstance(circuit_id, str):
+            raise ValueError
+        if sort == "updated_at":
+            value = _local(datetime.fromisoformat(value))
+        elif not isinstance(value, str if sort == "name" else int) or isinstance(value, bool):
+            raise ValueError
+        return value, circuit_id
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+def _local(moment: Optional[datetime]) -> Optional[datetime]:
+    """Timezone-aware times as naive local time, like the stored ``datetime.now()`` values."""
+    if moment is None or moment.tzinfo is None:
+        return moment
+    return moment.astimezone().replace(tzinfo=None)
+
+class CircuitIndex:
+    """Incrementally maintained indexes answering circuit queries."""
+
+    def __init__(self):
+        self._by_author: Dict[str, Set[str]] = {}
+        self._by_branch: Dict[str, Set[str]] = {}
+        # Sorted (key, circuit id) per sortable field
+        self._sorted: Dict[str, List[Tuple]] = {field: [] for field in SORT_FIELDS}
+        # Current keys of each circuit, to find its entries on update
+        self._keys: Dict[str, Dict[str, object]] = {}
+        self._authors: Dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, circuit: QuantumCircuit):
+        """Index a new circuit, or reindex one whose fields or content changed."""
+        keys = {
+            "updated_at": circuit.updated_at,
+            "name": circuit.name.casefold(),
+            "qubits": count_qubits(circuit.content)
+        }
+        old = self._keys.get(circuit.id)
+        for field in SORT_FIELDS:
+            if old is not None:
+                if old[field] == keys[field]:
+                    continue
+                entries = self._sorted[field]
+                del entries[bisect_left(entries, (old[field], circuit.id))]
+            insort(self._sorted[field], (keys[field], circuit.id))
+        self._keys[circuit.id] = keys
+        if self._authors.get(circuit.id) != circuit.author:
+            if circuit.id in self._authors:
+                self._by_author[self._authors[circuit.id]].discard(circuit.id)
+            self._by_author.setdefault(circuit.author, set()).add(circuit.id)
+            self._authors[circuit.id] = circuit.author
+        self.add_branch(circuit.id, circuit.branch)
+
+    def add_branch(self, circuit_id: str, branch: str):
+        """Record that a circuit is on a branch."""
+        self._by_branch.setdefault(branch, set()).add(circuit_id)
+
+    def _range(self, field: str, low=None, high=None) -> Set[str]:
+        entries = self._sorted[field]
+        start = bisect_left(entries, (low,)) if low is not None else 0
+        end = bisect_right(entries, (high, chr(0x10FFFF))) if high is not None else len(entries)
+        return {circuit_id for _, circuit_id in entries[start:end]}
+
+    def query(
+        self,
+        author: Optional[str] = None,
+        branch: Optional[str] = None,
+        name_prefix: Optional[str] = None,
+        updated_after: Optional[datetime] = None,
+        updated_before: Optional[datetime] = None,
+        min_qubits: Optional[int] = None,
+        max_qubits: Optional[int] = None,
+        sort: str = "updated_at",
+        descending: bool = True,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[str], Optional[str]]:
+        """
+        Ids of the circuits matching every given filter, in sort order.
+
+        ``updated_after`` and ``updated_before`` are inclusive, as are the
+        qubit bounds. Returns the page and the cursor of the next one, or
+        None on the last page.
+
+        Raises:
+            ValueError: If the sort field or cursor is invalid
+        """
+        if sort not in SORT_FIELDS:
+            raise ValueError(f"Cannot sort by {sort}")
+        after = _decode_cursor(cursor, sort) if cursor is not None else None
+        filters: List[Set[str]] = []
+        if author is not None:
+            filters.append(self._by_author.get(author, set()))
+        if branch is not None:
+            filters.append(self._by_branch.get(branch, set()))
+        if name_prefix:
+            prefix = name_prefix.casefold()
+            entries = self._sorted["name"]
+            start = bisect_left(entries, (prefix,))
+            end = bisect_left(entries, (prefix + chr(0x10FFFF),))
+            filters.append({circuit_id for _, circuit_id in entries[start:end]})
+        if updated_after is not None or updated_before is not None:
+            filters.append(self._range("updated_at", _local(updated_after), _local(updated_before)))
+        if min_qubits is not None or max_qubits is not None:
+            filters.append(self._range("qubits", min_qubits, max_qubits))
+        matches: Optional[Set[str]] = None
+        for ids in sorted(filters, key=len):
+            matches = set(ids) if matches is None else matches & ids
+            if not matches:
+                return [], None
+
+        entries = self._sorted[sort]
+        if matches is not None and len(matches) * 8 < len(entries):
+            # Few matches: sorting them beats scanning the whole order
+            entries = sorted((self._keys[circuit_id][sort], circuit_id) for circuit_id in matches)
+            matches = None
+        if after is None:
+            start, end = 0, len(entries)
+        elif descending:
+            start, end = 0, bisect_left(entries, after)
+        else:
+            start, end = bisect_right(entries, after), len(entries)
+        positions = range(end - 1, start - 1, -1) if descending else range(start, end)
+
+        page: List[Tuple] = []
+        more = False
+        for position in positions:
+            entry = entries[position]
+            if matches is not None and entry[1] not in matches:
+                continue
+            if len(page) == limit:
+                more = True
+                break
+            page.append(entry)
+        next_cursor = _encode_cursor(sort, *page[-1]) if more else None
+        return [circuit_id for _, circuit_id in page], next_cursor
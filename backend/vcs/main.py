@@ -1,9 +1,10 @@
-from fastapi import FastAPI, Depends, HTTPException, Security
+from fastapi import FastAPI, Depends, HTTPException, Query, Response, Security
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from typing import List, Optional
-from datetime import timedelta
+from datetime import datetime, timedelta
+import os
 
-from .models import QuantumCircuit, Branch, Commit
+from .models import QuantumCircuit, Branch, Commit, MergeResult
 from .repository import QuantumRepository
 from .auth import (
     User, Token, create_access_token, verify_token,
@@ -13,7 +14,12 @@ from .auth import (
 
 app = FastAPI(title="Quantum VCS API")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
-repo = QuantumRepository()
+# Persisted under VCS_DATA_DIR when set, otherwise kept in memory
+repo = QuantumRepository(os.getenv("VCS_DATA_DIR"))
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    repo.close()
 
 # In-memory user storage (replace with database in production)
 users = {}
@@ -53,14 +59,65 @@ async def create_circuit(
 ):
     return repo.create_circuit(name, content, current_user.username, description)
 
+@app.get("/circuits/", response_model=List[QuantumCircuit])
+async def list_circuits(
+    response: Response,
+    author: Optional[str] = None,
+    branch: Optional[str] = None,
+    name_prefix: Optional[str] = None,
+    updated_after: Optional[datetime] = None,
+    updated_before: Optional[datetime] = None,
+    min_qubits: Optional[int] = Query(None, ge=0),
+    max_qubits: Optional[int] = Query(None, ge=0),
+    sort: str = Query("updated_at", pattern="^(updated_at|name|qubits)$"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Filtered, sorted circuits; pass the X-Next-Cursor response header back as ``cursor`` for the next page."""
+    try:
+        page, next_cursor = repo.query_circuits(
+            limit, cursor, author=author, branch=branch, name_prefix=name_prefix,
+            updated_after=updated_after, updated_before=updated_before,
+            min_qubits=min_qubits, max_qubits=max_qubits, sort=sort, descending=order == "desc"
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return page
+
 @app.post("/circuits/{circuit_id}/commit", response_model=Commit)
 async def commit_circuit(
     circuit_id: str,
     content: str,
     message: str,
+    branch: Optional[str] = None,
     current_user: User = Depends(get_current_active_user)
 ):
-    return repo.commit_changes(circuit_id, content, message, current_user.username)
+    """Commit on ``branch``, by default the circuit's own branch."""
+    try:
+        return repo.commit_changes(circuit_id, content, message, current_user.username, branch)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@app.post("/circuits/{circuit_id}/merge", response_model=MergeResult)
+async def merge_branches(
+    circuit_id: str,
+    source: str,
+    target: str,
+    message: Optional[str] = None,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Merge the circuit's version on ``source`` into ``target``; conflicts are returned with status 409."""
+    try:
+        result = repo.merge(circuit_id, source, target, current_user.username, message)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    if result.status == "conflict":
+        raise HTTPException(status_code=409, detail=result.model_dump(mode="json"))
+    return result
 
 @app.post("/branches/", response_model=Branch)
 async def create_branch(
@@ -69,11 +126,59 @@ async def create_branch(
     description: Optional[str] = None,
     current_user: User = Depends(get_current_active_user)
 ):
-    return repo.create_branch(name, base_branch, current_user.username, description)
+    try:
+        return repo.create_branch(name, base_branch, current_user.username, description)
+    except ValueError as e:
+        # Either the name is taken or the base branch does not exist
+        raise HTTPException(status_code=409 if name in repo.heads else 404, detail=str(e))
 
 @app.get("/circuits/{circuit_id}/history", response_model=List[Commit])
 async def get_circuit_history(
     circuit_id: str,
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    branch: Optional[str] = None,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Newest commits first on ``branch`` (the circuit's own by default); pass X-Next-Cursor back as ``cursor``."""
+    try:
+        page, next_cursor = repo.get_history_page(circuit_id, limit, cursor, branch)
+    except ValueError as e:
+        missing = circuit_id not in repo.circuits or (branch is not None and branch not in repo.heads)
+        raise HTTPException(status_code=404 if missing else 400, detail=str(e))
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return page
+
+@app.get("/commits/merge-base")
+async def get_merge_base(
+    first: str,
+    second: str,
+    current_user: User = Depends(get_current_active_user)
+):
+    try:
+        return {"merge_base": repo.merge_base(first, second)}
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@app.get("/commits/{ancestor_id}/is-ancestor-of/{commit_id}")
+async def get_is_ancestor(
+    ancestor_id: str,
+    commit_id: str,
+    current_user: User = Depends(get_current_active_user)
+):
+    try:
+        return {"is_ancestor": repo.is_ancestor(ancestor_id, commit_id)}
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@app.get("/commits/{commit_id}/content")
+async def get_commit_content(
+    commit_id: str,
     current_user: User = Depends(get_current_active_user)
 ):
-    return repo.get_circuit_history(circuit_id)
+    try:
+        return {"commit_id": commit_id, "content": repo.get_version(commit_id)}
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
@@ -0,0 +1,189 @@
+"""
+Three-way merge of circuit versions on their gate structure.
+
+Both sides are diffed against the merge base with the line deltas of
+``delta``; each run of changed lines is a hunk in base coordinates. Hunks
+of one side that overlap no hunk of the other side apply as they are.
+Overlapping hunks are compared by the qubits (and classical bits) their
+removed and inserted statements act on: identical changes apply once,
+changes on disjoint qubits are both applied, and changes sharing a qubit,
+or touching a declaration, are conflicts reported with that qubit and its
+step (how many base gates act on it before the change). Gates on different
+qubits commute, so edits that diff3 would flag only because they are on
+neighbouring lines merge cleanly.
+
+Apart from counting the step of a reported conflict, only the hunks and
+the copied runs of unchanged lines are visited, so a merge costs time
+linear in the size of the diffs plus the output.
+"""
+import re
+from typing import FrozenSet, List, Optional, Sequence, Tuple
+from .delta import diff_lines
+from .models import MergeConflict
+
+# Operands of a statement: (register, index or None for the whole register)
+Operand = Tuple[str, Optional[int]]
+
+_STATEMENT = re.compile(r"^\s*([A-Za-z_]\w*)\s*(\([^)]*\))?\s*([^;]*);\s*(//.*)?$")
+_OPERAND = re.compile(r"^([A-Za-z_]\w*)\s*(?:\[\s*(\d+)\s*\])?$")
+_DECLARATIONS = {"OPENQASM", "include", "qreg", "creg", "gate", "opaque", "if"}
+
+# A hunk: base start line, base end line (exclusive), inserted lines
+Hunk = Tuple[int, int, List[str]]
+
+def parse_operands(line: str) -> Optional[FrozenSet[Operand]]:
+    """
+    Qubits and bits a QASM statement acts on.
+
+    Returns an empty set for blank and comment lines and None for
+    declarations and anything else that is not a plain gate statement.
+    """
+    stripped = line.strip()
+    if not stripped or stripped.startswith("//"):
+        return frozenset()
+    match = _STATEMENT.match(stripped)
+    if match is None or match.group(1) in _DECLARATIONS:
+        return None
+    operands = set()
+    for operand in re.split(r",|->", match.group(3)):
+        parsed = _OPERAND.match(operand.strip())
+        if parsed is None:
+            return None
+        operands.add((parsed.group(1), int(parsed.group(2)) if parsed.group(2) is not None else None))
+    return frozenset(operands)
+
+def _hunks(base: Sequence[str], other: Sequence[str]) -> List[Hunk]:
+    hunks: List[Hunk] = []
+    position = 0
+    for tag, value in diff_lines(base, other):
+        if tag == '=':
+            position += value
+            continue
+        if hunks and hunks[-1][1] == position:
+            start, end, inserted = hunks[-1]
+        else:
+            start, end, inserted = position, position, []
+            hunks.append((start, end, inserted))
+        if tag == '-':
+            position += value
+            end = position
+        else:
+            inserted.extend(value)
+        hunks[-1] = (start, end, inserted)
+    return hunks
+
+def _overlaps(first: Hunk, second: Hunk) -> bool:
+    return first[0] == second[0] or (first[0] < second[1] and second[0] < first[1])
+
+def _footprint(base: Sequence[str], hunks: List[Hunk]) -> Optional[FrozenSet[Operand]]:
+    operands = set()
+    for start, end, inserted in hunks:
+        for line in list(base[start:end]) + inserted:
+            parsed = parse_operands(line)
+            if parsed is None:
+                return None
+            operands |= parsed
+    return frozenset(operands)
+
+def _shared(first: FrozenSet[Operand], second: FrozenSet[Operand]) -> List[Operand]:
+    shared = set()
+    for register, index in first:
+        for other_register, other_index in second:
+            if register == other_register and (index is None or other_index is None or index == other_index):
+                shared.add((register, index if index is not None else other_index))
+    return sorted(shared, key=lambda operand: (operand[0], -1 if operand[1] is None else operand[1]))
+
+def _label(operand: Operand) -> str:
+    register, index = operand
+    return register if index is None else f"{register}[{index}]"
+
+def _step(base: Sequence[str], line: int, operand: Operand) -> int:
+    register, index = operand
+    count = 0
+    for statement in base[:line]:
+        parsed = parse_operands(statement)
+        if parsed and any(
+            other_register == register and (index is None or other_index is None or other_index == index)
+            for other_register, other_index in parsed
+        ):
+            count += 1
+    return count
+
+def _apply(base: Sequence[str], start: int, end: int, hunks: List[Hunk], output: List[str]):
+    """Apply non-conflicting hunks of both sides to base lines [start, end)."""
+    removed = set()
+    insertions = {}
+    for hunk_start, hunk_end, inserted in hunks:
+        removed.update(range(hunk_start, hunk_end))
+        insertions.setdefault(hunk_start, []).extend(inserted)
+    for line in range(start, end + 1):
+        output.extend(insertions.get(line, []))
+        if line < end and line not in removed:
+            output.append(base[line])
+
+def three_way_merge(
+    base: Sequence[str], ours: Sequence[str], theirs: Sequence[str]
+) -> Tuple[List[str], List[MergeConflict]]:
+    """
+    Merge two descendants of ``base``, given as lists of lines.
+
+    Returns the merged lines and the conflicts; where a conflict occurred
+    the merged lines keep our side.
+    """
+    our_hunks, their_hunks = _hunks(base, ours), _hunks(base, theirs)
+    output: List[str] = []
+    conflicts: List[MergeConflict] = []
+    position = 0
+    i = j = 0
+    while i < len(our_hunks) or j < len(their_hunks):
+        # Start a cluster at the earliest hunk and grow it with every
+        # hunk of either side that overlaps it
+        if j >= len(their_hunks) or (i < len(our_hunks) and our_hunks[i][0] <= their_hunks[j][0]):
+            cluster_ours, cluster_theirs = [our_hunks[i]], []
+            i += 1
+        else:
+            cluster_ours, cluster_theirs = [], [their_hunks[j]]
+            j += 1
+        start = (cluster_ours or cluster_theirs)[0][0]
+        end = (cluster_ours or cluster_theirs)[0][1]
+        grown = True
+        while grown:
+            grown = False
+            bounds = (start, end, [])
+            if i < len(our_hunks) and _overlaps(bounds, our_hunks[i]):
+                cluster_ours.append(our_hunks[i])
+                end = max(end, our_hunks[i][1])
+                i += 1
+                grown = True
+            if j < len(their_hunks) and _overlaps(bounds, their_hunks[j]):
+                cluster_theirs.append(their_hunks[j])
+                end = max(end, their_hunks[j][1])
+                j += 1
+                grown = True
+
+        output.extend(base[position:start])
+        position = end
+        if not cluster_ours or not cluster_theirs or cluster_ours == cluster_theirs:
+            _apply(base, start, end, cluster_ours or cluster_theirs, output)
+            continue
+
+        our_operands, their_operands = _footprint(base, cluster_ours), _footprint(base, cluster_theirs)
+        if our_operands is None or their_operands is None:
+            shared: List[Optional[Operand]] = [None]
+        else:
+            shared = _shared(our_operands, their_operands)
+        if not shared:
+            _apply(base, start, end, cluster_ours + cluster_theirs, output)
+            continue
+        _apply(base, start, end, cluster_ours, output)
+        for operand in shared:
+            conflicts.append(MergeConflict(
+                line=start,
+                qubit=_label(operand) if operand else None,
+                step=_step(base, start, operand) if operand else None,
+                base=list(base[start:end]),
+                ours=[line for hunk in cluster_ours for line in hunk[2]],
+                theirs=[line for hunk in cluster_theirs for line in hunk[2]]
+            ))
+    output.extend(base[position:])
+    return output, conflicts
@@ -35,3 +35,21 @@ class Commit(BaseModel):
     parent_commit: Optional[str]
     created_at: datetime
     changes: dict  # Stores diff information
+    generation: int = 1  # Length of the longest path to a root commit, counting itself
+    merge_parent: Optional[str] = None  # Head of the merged branch, for merge commits
+
+class MergeConflict(BaseModel):
+    """Overlapping changes of both sides of a merge that act on a common qubit."""
+    line: int  # First base line of the conflicting changes
+    qubit: Optional[str]  # None when the changes touch a declaration
+    step: Optional[int]  # Base gates on the qubit before the changes
+    base: List[str]
+    ours: List[str]
+    theirs: List[str]
+
+class MergeResult(BaseModel):
+    """Outcome of merging one branch's version of a circuit into another's."""
+    status: str  # up_to_date, fast_forward, merged or conflict
+    head: Optional[str]  # Target branch head after the merge
+    commit: Optional[Commit] = None
+    conflicts: List[MergeConflict] = []
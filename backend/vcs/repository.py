@@ -1,14 +1,113 @@
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
+from collections import OrderedDict
 from datetime import datetime
+import heapq
+import json
+import os
 import uuid
-from .models import QuantumCircuit, Branch, Commit
+from .models import QuantumCircuit, Branch, Commit, MergeResult
+from .delta import apply_delta, delta_stats, diff_lines, split_lines
+from .index import CircuitIndex
+from .merge import three_way_merge
+from .storage import ObjectStore
 
 class QuantumRepository:
-    def __init__(self):
-        # Using in-memory storage as per workflow guidelines
+    def __init__(self, path: Optional[str] = None, snapshot_interval: int = 32, cache_size: int = 128):
+        """
+        Open a repository.
+
+        A commit stores the line delta from its parent's version; every
+        ``snapshot_interval`` commits along a circuit's history the full
+        content is also written to the content-addressed object store, which
+        bounds how many deltas rebuilding a version applies. The last
+        ``cache_size`` rebuilt versions are kept in memory.
+
+        Without a ``path`` everything stays in memory; with one, objects are
+        packed under ``<path>/objects`` and circuit, branch, commit and head records
+        are appended to ``<path>/journal.jsonl``, which is replayed on open.
+        """
+        if snapshot_interval < 1:
+            raise ValueError("Snapshot interval must be positive")
+        self.path = path
+        self.snapshot_interval = snapshot_interval
+        self.cache_size = cache_size
+        self._versions: OrderedDict = OrderedDict()
+        self.objects = ObjectStore(os.path.join(path, "objects") if path else None)
         self.circuits: dict = {}
         self.branches: dict = {}
         self.commits: dict = {}
+        # Head commit of each circuit on every branch; a circuit without
+        # one is at its initial content on that branch
+        self.heads: Dict[str, Dict[str, str]] = {"main": {}}
+        # First-parent ancestors 1, 2, 4, 8, ... steps above each commit
+        self._jumps: Dict[str, List[str]] = {}
+        # Nearest first-parent ancestor (or self) that is a merge or root
+        # commit; below it generations drop by exactly one per step
+        self._segments: Dict[str, str] = {}
+        # Secondary indexes for circuit queries
+        self.index = CircuitIndex()
+        self._journal = None
+        if path is not None:
+            journal_path = os.path.join(path, "journal.jsonl")
+            if os.path.exists(journal_path):
+                self._replay(journal_path)
+            self._journal = open(journal_path, "a", encoding="utf-8")
+
+    def _replay(self, journal_path: str):
+        with open(journal_path, encoding="utf-8") as journal:
+            for line in journal:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn final record from an interrupted write
+                    break
+                if record["kind"] == "circuit":
+                    self.circuits[record["data"]["id"]] = record["data"]
+                elif record["kind"] == "branch":
+                    self._add_branch(Branch.model_validate(record["data"]))
+                elif record["kind"] == "commit":
+                    commit = Commit.model_validate(record["data"])
+                    self.commits[commit.id] = commit
+                    self._index_commit(commit)
+                    self._advance(commit.branch, commit.circuit_id, commit.id)
+                elif record["kind"] == "head":
+                    self._advance(**record["data"])
+        # Contents are rebuilt once every circuit record is known
+        for circuit_id, data in self.circuits.items():
+            self.circuits[circuit_id] = QuantumCircuit.model_validate({**data, "content": ""})
+        for circuit in self.circuits.values():
+            last_commit = circuit.metadata.get("last_commit")
+            if last_commit:
+                circuit.content = self.get_version(last_commit)
+            else:
+                circuit.content = self.get_content(circuit.metadata["initial_content"])
+            self.index.add(circuit)
+
+    def _record(self, kind: str, data: dict, **fields):
+        if self._journal is None:
+            return
+        # Objects first, so the journal never references missing content
+        self.objects.flush()
+        self._journal.write(json.dumps({"kind": kind, "data": data, **fields}) + "\n")
+        self._journal.flush()
+
+    def _record_circuit(self, circuit: QuantumCircuit):
+        # Contents are rebuilt from the initial content and the commits
+        self._record("circuit", circuit.model_dump(mode="json", exclude={"content"}))
+
+    def _put_content(self, content: str) -> str:
+        return self.objects.put(content.encode("utf-8"))
+
+    def get_content(self, object_id: str) -> str:
+        """Circuit content stored under an object id."""
+        return self.objects.get(object_id).decode("utf-8")
+
+    def close(self):
+        """Seal the object store and close the journal."""
+        self.objects.close()
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
 
     def create_circuit(self, name: str, content: str, author: str, description: Optional[str] = None) -> QuantumCircuit:
         circuit_id = str(uuid.uuid4())
@@ -22,15 +121,19 @@ class QuantumRepository:
             author=author,
             created_at=datetime.now(),
             updated_at=datetime.now(),
-            metadata={},
+            metadata={"initial_content": self._put_content(content)},
             parent_version=None
         )
+        self._record_circuit(circuit)
         self.circuits[circuit_id] = circuit
+        self.index.add(circuit)
         return circuit
 
     def create_branch(self, name: str, base_branch: str, author: str, description: Optional[str] = None) -> Branch:
-        if name in self.branches:
+        if name in self.heads:
             raise ValueError(f"Branch {name} already exists")
+        if base_branch not in self.heads:
+            raise ValueError(f"Branch {base_branch} not found")
 
         branch = Branch(
             name=name,
@@ -40,15 +143,65 @@ class QuantumRepository:
             last_commit=None,
             author=author
         )
-        self.branches[name] = branch
+        self._record("branch", branch.model_dump(mode="json"))
+        self._add_branch(branch)
         return branch
 
-    def commit_changes(self, circuit_id: str, content: str, message: str, author: str) -> Commit:
+    def _add_branch(self, branch: Branch):
+        # The new branch starts at the base branch's current heads
+        self.branches[branch.name] = branch
+        self.heads[branch.name] = dict(self.heads[branch.base_branch or "main"])
+        for circuit_id in self.heads[branch.name]:
+            self.index.add_branch(circuit_id, branch.name)
+
+    def _advance(self, branch: str, circuit_id: str, commit: str):
+        self.heads[branch][circuit_id] = commit
+        self.index.add_branch(circuit_id, branch)
+        if branch in self.branches:
+            self.branches[branch].last_commit = commit
+
+    def get_branch_content(self, circuit_id: str, branch: str) -> str:
+        """Content of a circuit at the head of a branch."""
         if circuit_id not in self.circuits:
             raise ValueError(f"Circuit {circuit_id} not found")
-
+        if branch not in self.heads:
+            raise ValueError(f"Branch {branch} not found")
         circuit = self.circuits[circuit_id]
-        old_content = circuit.content
+        if branch == circuit.branch:
+            return circuit.content
+        head = self.heads[branch].get(circuit_id)
+        return self.get_version(head) if head else self.get_content(circuit.metadata["initial_content"])
+
+    def commit_changes(
+        self, circuit_id: str, content: str, message: str, author: str, branch: Optional[str] = None
+    ) -> Commit:
+        """Commit new content for a circuit on a branch (the circuit's own branch by default)."""
+        if circuit_id not in self.circuits:
+            raise ValueError(f"Circuit {circuit_id} not found")
+        branch = branch or self.circuits[circuit_id].branch
+        old_content = self.get_branch_content(circuit_id, branch)
+        return self._create_commit(
+            circuit_id, branch, self.heads[branch].get(circuit_id), old_content, content, message, author
+        )
+
+    def _create_commit(
+        self,
+        circuit_id: str,
+        branch: str,
+        parent_commit: Optional[str],
+        old_content: str,
+        content: str,
+        message: str,
+        author: str,
+        merge_parent: Optional[str] = None
+    ) -> Commit:
+        delta = diff_lines(split_lines(old_content), split_lines(content))
+        changes = {"delta": delta, **delta_stats(delta)}
+        depth = self.commits[parent_commit].changes["depth"] + 1 if parent_commit else 1
+        if depth >= self.snapshot_interval:
+            changes["snapshot"] = self._put_content(content)
+            depth = 0
+        changes["depth"] = depth
 
         # Create commit
         commit_id = str(uuid.uuid4())
@@ -56,31 +209,256 @@ class QuantumRepository:
             id=commit_id,
             message=message,
             author=author,
-            branch=circuit.branch,
+            branch=branch,
             circuit_id=circuit_id,
-            parent_commit=circuit.metadata.get("last_commit"),
+            parent_commit=parent_commit,
             created_at=datetime.now(),
-            changes={"old": old_content, "new": content}
+            changes=changes,
+            generation=max(
+                (self.commits[parent].generation for parent in (parent_commit, merge_parent) if parent),
+                default=0
+            ) + 1,
+            merge_parent=merge_parent
         )
 
-        # Update circuit
+        self._record("commit", commit.model_dump(mode="json"))
+        self.commits[commit_id] = commit
+        self._index_commit(commit)
+        self._advance(branch, circuit_id, commit_id)
+        self._cache_version(commit_id, content)
+        self._update_circuit(circuit_id, branch, commit_id, content)
+        return commit
+
+    def _update_circuit(self, circuit_id: str, branch: str, commit_id: str, content: str):
+        """Move the circuit itself along when its own branch advances."""
+        circuit = self.circuits[circuit_id]
+        if branch != circuit.branch:
+            return
         circuit.content = content
         circuit.updated_at = datetime.now()
         circuit.metadata["last_commit"] = commit_id
+        self._record_circuit(circuit)
+        self.index.add(circuit)
 
-        self.commits[commit_id] = commit
-        return commit
+    def merge(
+        self, circuit_id: str, source_branch: str, target_branch: str, author: str, message: Optional[str] = None
+    ) -> MergeResult:
+        """
+        Merge a circuit's version on ``source_branch`` into ``target_branch``.
 
-    def get_circuit_history(self, circuit_id: str) -> List[Commit]:
+        Fast-forwards when the target head is an ancestor of the source head;
+        otherwise merges both versions against their merge base and, unless
+        there are conflicts, records a merge commit on the target branch.
+        """
+        for branch in (source_branch, target_branch):
+            if branch not in self.heads:
+                raise ValueError(f"Branch {branch} not found")
         if circuit_id not in self.circuits:
             raise ValueError(f"Circuit {circuit_id} not found")
+        ours, theirs = self.heads[target_branch].get(circuit_id), self.heads[source_branch].get(circuit_id)
+        if theirs is None or theirs == ours or (ours is not None and self.is_ancestor(theirs, ours)):
+            return MergeResult(status="up_to_date", head=ours)
+        if ours is None or self.is_ancestor(ours, theirs):
+            self._record("head", {"branch": target_branch, "circuit_id": circuit_id, "commit": theirs})
+            self._advance(target_branch, circuit_id, theirs)
+            self._update_circuit(circuit_id, target_branch, theirs, self.get_version(theirs))
+            return MergeResult(status="fast_forward", head=theirs)
+
+        base_id = self.merge_base(ours, theirs)
+        if base_id is not None:
+            base = self.get_version(base_id)
+        else:
+            base = self.get_content(self.circuits[circuit_id].metadata["initial_content"])
+        our_content = self.get_branch_content(circuit_id, target_branch)
+        lines, conflicts = three_way_merge(
+            split_lines(base), split_lines(our_content), split_lines(self.get_version(theirs))
+        )
+        if conflicts:
+            return MergeResult(status="conflict", head=ours, conflicts=conflicts)
+        commit = self._create_commit(
+            circuit_id, target_branch, ours, our_content, "".join(lines),
+            message or f"Merge branch {source_branch} into {target_branch}", author, merge_parent=theirs
+        )
+        return MergeResult(status="merged", head=commit.id, commit=commit)
+
+    def query_circuits(
+        self, limit: int = 100, cursor: Optional[str] = None, **filters
+    ) -> Tuple[List[QuantumCircuit], Optional[str]]:
+        """
+        One page of the circuits matching ``filters``, served from the
+        secondary indexes; see ``CircuitIndex.query`` for the filters.
+
+        A circuit is on a branch when it was created there or has commits
+        on it, including those the branch started from.
+        """
+        ids, next_cursor = self.index.query(limit=limit, cursor=cursor, **filters)
+        return [self.circuits[circuit_id] for circuit_id in ids], next_cursor
+
+    def _index_commit(self, commit: Commit):
+        if commit.merge_parent is not None or commit.parent_commit is None:
+            self._segments[commit.id] = commit.id
+        else:
+            self._segments[commit.id] = self._segments[commit.parent_commit]
+        jumps = []
+        ancestor = commit.parent_commit
+        while ancestor is not None:
+            jumps.append(ancestor)
+            above = self._jumps[ancestor]
+            ancestor = above[len(jumps) - 1] if len(above) >= len(jumps) else None
+        self._jumps[commit.id] = jumps
+
+    def _lift(self, commit_id: str, generation: int) -> str:
+        """
+        First-parent ancestor of a commit at the given generation, in O(log n)
+        jumps; the generation must not be below the commit's segment.
+        """
+        while self.commits[commit_id].generation > generation:
+            distance = self.commits[commit_id].generation - generation
+            commit_id = self._jumps[commit_id][distance.bit_length() - 1]
+        return commit_id
+
+    def _get_commit(self, commit_id: str) -> Commit:
+        if commit_id not in self.commits:
+            raise ValueError(f"Commit {commit_id} not found")
+        return self.commits[commit_id]
 
-        history = []
-        current_commit = self.circuits[circuit_id].metadata.get("last_commit")
+    def is_ancestor(self, ancestor_id: str, commit_id: str) -> bool:
+        """Whether ``ancestor_id`` is ``commit_id`` or one of its ancestors."""
+        generation = self._get_commit(ancestor_id).generation
+        self._get_commit(commit_id)
+        # Jump through merge-free segments; only merge commits branch out,
+        # and nothing below the ancestor's generation can lead to it
+        pending, seen = [commit_id], set()
+        while pending:
+            current = pending.pop()
+            if current in seen or self.commits[current].generation < generation:
+                continue
+            seen.add(current)
+            segment = self.commits[self._segments[current]]
+            if segment.generation <= generation:
+                if self._lift(current, generation) == ancestor_id:
+                    return True
+                continue
+            pending.extend(parent for parent in (segment.parent_commit, segment.merge_parent) if parent)
+        return False
 
-        while current_commit:
-            commit = self.commits[current_commit]
-            history.append(commit)
-            current_commit = commit.parent_commit
+    def merge_base(self, first_id: str, second_id: str) -> Optional[str]:
+        """Nearest common ancestor of two commits, or None if they share no history."""
+        first, second = self._get_commit(first_id), self._get_commit(second_id)
+        if self.commits[self._segments[first_id]].parent_commit is not None or \
+                self.commits[self._segments[second_id]].parent_commit is not None:
+            return self._paint_merge_base(first_id, second_id)
+        # Linear histories down to their roots: lift to a common generation
+        generation = min(first.generation, second.generation)
+        first, second = self._lift(first_id, generation), self._lift(second_id, generation)
+        if first == second:
+            return first
+        # Jump both up by the largest steps that keep them apart
+        for level in range(len(self._jumps[first]) - 1, -1, -1):
+            if level < len(self._jumps[first]) and self._jumps[first][level] != self._jumps[second][level]:
+                first, second = self._jumps[first][level], self._jumps[second][level]
+        return self.commits[first].parent_commit
 
+    def _paint_merge_base(self, first_id: str, second_id: str) -> Optional[str]:
+        """
+        Merge base across merge commits: walk down from both commits in
+        decreasing generation, marking what each side reaches. The first
+        commit reached from both is a common ancestor of highest generation.
+        """
+        if first_id == second_id:
+            return first_id
+        # Bit 1: reached from the first commit, bit 2: from the second
+        reached = {first_id: 1, second_id: 2}
+        queue = [(-self.commits[commit_id].generation, commit_id) for commit_id in reached]
+        heapq.heapify(queue)
+        while queue:
+            _, current = heapq.heappop(queue)
+            if reached[current] == 3:
+                return current
+            commit = self.commits[current]
+            for parent in (commit.parent_commit, commit.merge_parent):
+                if parent is None:
+                    continue
+                marks = reached.get(parent, 0) | reached[current]
+                if marks != reached.get(parent, 0):
+                    reached[parent] = marks
+                    heapq.heappush(queue, (-self.commits[parent].generation, parent))
+        return None
+
+    def _cache_version(self, commit_id: str, content: str):
+        self._versions[commit_id] = content
+        self._versions.move_to_end(commit_id)
+        while len(self._versions) > self.cache_size:
+            self._versions.popitem(last=False)
+
+    def get_version(self, commit_id: str) -> str:
+        """Circuit content as of a commit."""
+        if commit_id not in self.commits:
+            raise ValueError(f"Commit {commit_id} not found")
+        if commit_id in self._versions:
+            self._versions.move_to_end(commit_id)
+            return self._versions[commit_id]
+
+        # Walk back to a cached version, a snapshot or the initial content,
+        # then replay the deltas forward
+        pending = []
+        current = commit_id
+        while True:
+            if current in self._versions:
+                lines = split_lines(self._versions[current])
+                break
+            commit = self.commits[current]
+            if "snapshot" in commit.changes:
+                lines = split_lines(self.get_content(commit.changes["snapshot"]))
+                break
+            pending.append(commit)
+            if commit.parent_commit is None:
+                initial_content = self.circuits[commit.circuit_id].metadata["initial_content"]
+                lines = split_lines(self.get_content(initial_content))
+                break
+            current = commit.parent_commit
+        for commit in reversed(pending):
+            lines = apply_delta(lines, commit.changes["delta"])
+
+        content = "".join(lines)
+        self._cache_version(commit_id, content)
+        return content
+
+    def get_circuit_history(self, circuit_id: str, branch: Optional[str] = None) -> List[Commit]:
+        """A circuit's whole history on a branch, newest first; see ``get_history_page``."""
+        history, _ = self.get_history_page(circuit_id, max(len(self.commits), 1), branch=branch)
         return history
+
+    def get_history_page(
+        self, circuit_id: str, limit: int = 100, cursor: Optional[str] = None, branch: Optional[str] = None
+    ) -> Tuple[List[Commit], Optional[str]]:
+        """
+        One page of a circuit's history on a branch (the circuit's own branch
+        by default), newest first.
+
+        History follows first parents back from the branch head, so a merge
+        commit is listed but the commits it merged in are not. The cursor is
+        the id of the first commit of the next page; commits never change
+        their parents, so it stays valid while new commits are added. Returns
+        the commits and the cursor of the next page, or None on the last page.
+        """
+        if circuit_id not in self.circuits:
+            raise ValueError(f"Circuit {circuit_id} not found")
+        if limit < 1:
+            raise ValueError("Limit must be positive")
+        branch = branch or self.circuits[circuit_id].branch
+        if branch not in self.heads:
+            raise ValueError(f"Branch {branch} not found")
+        current = self.heads[branch].get(circuit_id)
+        if cursor is not None:
+            commit = self.commits.get(cursor)
+            if commit is None or commit.circuit_id != circuit_id or current is None \
+                    or not self.is_ancestor(cursor, current):
+                raise ValueError(f"Invalid cursor {cursor}")
+            current = cursor
+        page = []
+        while current is not None and len(page) < limit:
+            commit = self.commits[current]
+            page.append(commit)
+            current = commit.parent_commit
+        return page, current
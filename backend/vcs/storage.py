@@ -0,0 +1,252 @@
+"""
+Content-addressed object store for circuit contents.
+
+Objects are keyed by the SHA-256 of their content, so identical contents are
+stored once however many circuits or commits refer to them. On disk objects
+are zlib-compressed and appended to pack files; each record is the digest,
+the compressed length and the compressed bytes, so a pack can be rescanned
+if its index is lost. When a pack is sealed (it grew past ``max_pack_size``
+or the store was closed) a sorted index of fixed-width (digest, offset,
+length) entries is written next to it. Reopening a store only memory-maps
+those indexes and looks objects up by binary search; only the objects of an
+unsealed pack are read into memory.
+"""
+import hashlib
+import mmap
+import os
+import re
+import struct
+import threading
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+_DIGEST_SIZE = 32
+# Pack record header: digest, compressed length
+_RECORD = struct.Struct(f">{_DIGEST_SIZE}sI")
+# Index entry: digest, record offset, compressed length
+_ENTRY = struct.Struct(f">{_DIGEST_SIZE}sQI")
+_INDEX_MAGIC = b"QVCSIDX1"
+_PACK_NAME = re.compile(r"^pack-(\d+)\.pack$")
+
+def object_id(data: bytes) -> str:
+    """Content address of ``data``."""
+    return hashlib.sha256(data).hexdigest()
+
+class _PackIndex:
+    """Memory-mapped sorted index of a sealed pack."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(_INDEX_MAGIC)] != _INDEX_MAGIC:
+            raise ValueError(f"{path} is not a pack index")
+        self._start = len(_INDEX_MAGIC)
+        self.count = (len(self._map) - self._start) // _ENTRY.size
+
+    def _digest_at(self, position: int) -> bytes:
+        offset = self._start + position * _ENTRY.size
+        return self._map[offset:offset + _DIGEST_SIZE]
+
+    def find(self, digest: bytes) -> Optional[Tuple[int, int]]:
+        """(offset, length) of an object's record, or None."""
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._digest_at(middle) < digest:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.count and self._digest_at(low) == digest:
+            _, offset, length = _ENTRY.unpack_from(self._map, self._start + low * _ENTRY.size)
+            return offset, length
+        return None
+
+    def close(self):
+        self._map.close()
+
+class ObjectStore:
+    """
+    Deduplicating, compressed blob store.
+
+    Without a ``path`` objects are kept compressed in memory, which is what
+    the repository uses when no data directory is configured.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_pack_size: int = 64 * 1024 * 1024, compression_level: int = 6):
+        self.path = path
+        self.max_pack_size = max_pack_size
+        self.compression_level = compression_level
+        self._lock = threading.Lock()
+        # Objects of the pack being written: digest -> (offset, length)
+        self._pending: Dict[bytes, Tuple[int, int]] = {}
+        self._memory: Dict[bytes, bytes] = {}
+        # Sealed packs, newest first: (pack number, index, memory-mapped pack)
+        self._sealed: List[Tuple[int, _PackIndex, mmap.mmap]] = []
+        self._pack = None
+        self._pack_number = 0
+        self._pack_size = 0
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+            self._open()
+
+    def _pack_path(self, number: int) -> str:
+        return os.path.join(self.path, f"pack-{number:06d}.pack")
+
+    def _index_path(self, number: int) -> str:
+        return os.path.join(self.path, f"pack-{number:06d}.idx")
+
+    def _open(self):
+        numbers = sorted(
+            int(match.group(1)) for match in map(_PACK_NAME.match, os.listdir(self.path)) if match
+        )
+        for number in numbers:
+            if os.path.exists(self._index_path(number)):
+                self._load_sealed(number)
+        unsealed = [number for number in numbers if not os.path.exists(self._index_path(number))]
+        # Normally at most one pack (the last) is unsealed; older ones are
+        # left over from a crash and get indexed now
+        for number in unsealed[:-1]:
+            self._pack_number = number
+            self._scan(number)
+            self._seal()
+        if unsealed:
+            self._pack_number = unsealed[-1]
+            self._scan(unsealed[-1])
+        else:
+            self._pack_number = numbers[-1] + 1 if numbers else 0
+        self._pack = open(self._pack_path(self._pack_number), "ab+")
+        self._pack_size = self._pack.tell()
+
+    def _load_sealed(self, number: int):
+        index = _PackIndex(self._index_path(number))
+        with open(self._pack_path(number), "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._sealed.insert(0, (number, index, data))
+
+    def _scan(self, number: int):
+        """Rebuild the objects of an unindexed pack, dropping a torn final record."""
+        self._pending = {}
+        path = self._pack_path(number)
+        with open(path, "rb") as f:
+            data = f.read()
+        offset = 0
+        while offset + _RECORD.size <= len(data):
+            digest, length = _RECORD.unpack_from(data, offset)
+            if offset + _RECORD.size + length > len(data):
+                break
+            self._pending[digest] = (offset, length)
+            offset += _RECORD.size + length
+        if offset < len(data):
+            with open(path, "r+b") as f:
+                f.truncate(offset)
+
+    def _seal(self):
+        """Write the sorted index of the current pack and start a new one."""
+        if self._pack is not None:
+            self._pack.flush()
+            os.fsync(self._pack.fileno())
+            self._pack.close()
+            self._pack = None
+        temporary = self._index_path(self._pack_number) + ".tmp"
+        with open(temporary, "wb") as f:
+            f.write(_INDEX_MAGIC)
+            for digest in sorted(self._pending):
+                f.write(_ENTRY.pack(digest, *self._pending[digest]))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, self._index_path(self._pack_number))
+        self._load_sealed(self._pack_number)
+        self._pending = {}
+        self._pack_number += 1
+        self._pack_size = 0
+
+    def _locate(self, digest: bytes) -> Optional[Tuple[Optional[mmap.mmap], int, int]]:
+        if digest in self._pending:
+            return (None,) + self._pending[digest]
+        for _, index, data in self._sealed:
+            found = index.find(digest)
+            if found is not None:
+                return (data,) + found
+        return None
+
+    def __contains__(self, oid: str) -> bool:
+        digest = bytes.fromhex(oid)
+        with self._lock:
+            if self.path is None:
+                return digest in self._memory
+            return self._locate(digest) is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            if self.path is None:
+                return len(self._memory)
+            return len(self._pending) + sum(index.count for _, index, _ in self._sealed)
+
+    def put(self, data: bytes) -> str:
+        """Store ``data`` unless an identical object exists, and return its id."""
+        oid = object_id(data)
+        digest = bytes.fromhex(oid)
+        with self._lock:
+            if self.path is None:
+                if digest not in self._memory:
+                    self._memory[digest] = zlib.compress(data, self.compression_level)
+                return oid
+            if self._locate(digest) is not None:
+                return oid
+            compressed = zlib.compress(data, self.compression_level)
+            if self._pack_size and self._pack_size + _RECORD.size + len(compressed) > self.max_pack_size:
+                self._seal()
+                self._pack = open(self._pack_path(self._pack_number), "ab+")
+            self._pack.write(_RECORD.pack(digest, len(compressed)) + compressed)
+            self._pending[digest] = (self._pack_size, len(compressed))
+            self._pack_size += _RECORD.size + len(compressed)
+        return oid
+
+    def get(self, oid: str) -> bytes:
+        """
+        Read an object.
+
+        Raises:
+            KeyError: If no object has this id
+        """
+        digest = bytes.fromhex(oid)
+        with self._lock:
+            if self.path is None:
+                if digest not in self._memory:
+                    raise KeyError(oid)
+                return zlib.decompress(self._memory[digest])
+            location = self._locate(digest)
+            if location is None:
+                raise KeyError(oid)
+            data, offset, length = location
+            start = offset + _RECORD.size
+            if data is None:
+                self._pack.flush()
+                compressed = os.pread(self._pack.fileno(), length, start)
+            else:
+                compressed = data[start:start + length]
+        return zlib.decompress(compressed)
+
+    def flush(self):
+        """Make every stored object durable."""
+        with self._lock:
+            if self._pack is not None:
+                self._pack.flush()
+                os.fsync(self._pack.fileno())
+
+    def close(self):
+        """Seal the current pack so the next open needs no rescan."""
+        with self._lock:
+            if self.path is None:
+                return
+            if self._pending:
+                self._seal()
+            elif self._pack is not None:
+                self._pack.close()
+                self._pack = None
+                if os.path.getsize(self._pack_path(self._pack_number)) == 0:
+                    os.remove(self._pack_path(self._pack_number))
+            for _, index, data in self._sealed:
+                index.close()
+                data.close()
+            self._sealed = []
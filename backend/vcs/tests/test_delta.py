@@ -0,0 +1,63 @@
+import random
+import pytest
+from ..delta import MAX_EDIT_DISTANCE, apply_delta, delta_stats, diff_lines, split_lines
+from ..repository import QuantumRepository
+
+HEADER = "OPENQASM 2.0;\ninclude \"qelib1.inc\";\nqreg q[8];\n"
+
+def test_delta_round_trips_random_edits():
+    rng = random.Random(7)
+    gates = [f"h q[{i}];\n" for i in range(8)] + [f"cx q[{i}],q[{i + 1}];\n" for i in range(7)]
+    for _ in range(200):
+        old = [rng.choice(gates) for _ in range(rng.randint(0, 30))]
+        new = list(old)
+        for _ in range(rng.randint(0, 6)):
+            position = rng.randint(0, len(new))
+            if new and rng.random() < 0.5:
+                del new[min(position, len(new) - 1)]
+            else:
+                new.insert(position, rng.choice(gates))
+        delta = diff_lines(old, new)
+        assert apply_delta(old, delta) == new
+
+def test_delta_is_minimal_and_compact():
+    old = split_lines(HEADER + "".join(f"h q[{i % 8}];\n" for i in range(1000)))
+    new = old[:500] + ["x q[3];\n"] + old[501:]
+    delta = diff_lines(old, new)
+    assert delta == [["=", 500], ["-", 1], ["+", ["x q[3];\n"]], ["=", len(old) - 501]]
+    assert delta_stats(delta) == {"added": 1, "removed": 1}
+
+def test_large_rewrites_fall_back_to_replacement():
+    old = [f"a{i}\n" for i in range(MAX_EDIT_DISTANCE)]
+    new = [f"b{i}\n" for i in range(MAX_EDIT_DISTANCE)]
+    assert diff_lines(old, new) == [["-", len(old)], ["+", new]]
+
+def test_delta_must_fit_its_base():
+    with pytest.raises(ValueError):
+        apply_delta(["a\n"], [["=", 2]])
+
+def test_versions_are_rebuilt_across_snapshots():
+    repo = QuantumRepository(snapshot_interval=4, cache_size=2)
+    circuit = repo.create_circuit("chain", HEADER, "alice")
+    expected = {}
+    content = HEADER
+    for i in range(11):
+        content += f"rz(0.{i}) q[{i % 8}];\n"
+        commit = repo.commit_changes(circuit.id, content, f"Step {i}", "alice")
+        expected[commit.id] = content
+        assert commit.changes["added"] == 1 and commit.changes["removed"] == 0
+    snapshots = [commit for commit in repo.commits.values() if "snapshot" in commit.changes]
+    assert len(snapshots) == 2
+    repo._versions.clear()
+    for commit_id, content in expected.items():
+        assert repo.get_version(commit_id) == content
+    assert len(repo._versions) == 2
+
+def test_history_stores_deltas_not_contents():
+    repo = QuantumRepository()
+    body = "".join(f"h q[{i % 8}];\n" for i in range(2000))
+    circuit = repo.create_circuit("large", HEADER + body, "alice")
+    commit = repo.commit_changes(circuit.id, HEADER + body + "measure q[0] -> c[0];\n", "Measure", "alice")
+    assert len(commit.model_dump_json()) < 500
+    with pytest.raises(ValueError):
+        repo.get_version("missing")
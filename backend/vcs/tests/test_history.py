@@ -0,0 +1,92 @@
+import pytest
+from fastapi.testclient import TestClient
+from ..auth import User
+from ..main import app, get_current_active_user, repo as app_repo
+from ..repository import QuantumRepository
+
+QASM = "OPENQASM 2.0;\ninclude \"qelib1.inc\";\nqreg q[2];\n"
+
+def build_history(repo: QuantumRepository, commits: int):
+    circuit = repo.create_circuit("chain", QASM, "alice")
+    content = QASM
+    for i in range(commits):
+        content += f"rz({i}) q[0];\n"
+        repo.commit_changes(circuit.id, content, f"Step {i}", "alice")
+    return circuit
+
+def test_pages_cover_history_newest_first():
+    repo = QuantumRepository()
+    circuit = build_history(repo, 25)
+    messages, cursor = [], None
+    while True:
+        page, cursor = repo.get_history_page(circuit.id, limit=10, cursor=cursor)
+        messages += [commit.message for commit in page]
+        if cursor is None:
+            break
+    assert messages == [f"Step {i}" for i in range(24, -1, -1)]
+    assert [commit.message for commit in repo.get_circuit_history(circuit.id)] == messages
+
+def test_cursor_is_stable_under_new_commits():
+    repo = QuantumRepository()
+    circuit = build_history(repo, 5)
+    first, cursor = repo.get_history_page(circuit.id, limit=2)
+    repo.commit_changes(circuit.id, QASM, "Reset", "alice")
+    second, _ = repo.get_history_page(circuit.id, limit=2, cursor=cursor)
+    assert [commit.message for commit in first + second] == ["Step 4", "Step 3", "Step 2", "Step 1"]
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        repo.get_history_page(circuit.id, cursor="x")
+
+def test_history_follows_the_branch():
+    repo = QuantumRepository()
+    circuit = build_history(repo, 2)
+    repo.create_branch("feature", "main", "alice")
+    feature = repo.commit_changes(circuit.id, QASM + "x q[1];\n", "On feature", "alice", "feature")
+    repo.commit_changes(circuit.id, QASM + "h q[1];\n", "On main", "alice")
+    assert [commit.message for commit in repo.get_circuit_history(circuit.id)] == ["On main", "Step 1", "Step 0"]
+    assert [commit.message for commit in repo.get_circuit_history(circuit.id, "feature")] == \
+        ["On feature", "Step 1", "Step 0"]
+    # A cursor from another branch's history is not part of this one
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        repo.get_history_page(circuit.id, cursor=feature.id)
+    with pytest.raises(ValueError, match="Branch missing not found"):
+        repo.get_history_page(circuit.id, branch="missing")
+    other = repo.create_circuit("other", QASM, "alice")
+    assert repo.get_circuit_history(other.id) == []
+
+def test_ancestry_queries():
+    repo = QuantumRepository()
+    circuit = build_history(repo, 100)
+    other = build_history(repo, 3)
+    ids = [commit.id for commit in reversed(repo.get_circuit_history(circuit.id))]
+    assert [repo.commits[commit_id].generation for commit_id in ids] == list(range(1, 101))
+    assert repo.is_ancestor(ids[0], ids[99])
+    assert repo.is_ancestor(ids[37], ids[37])
+    assert not repo.is_ancestor(ids[38], ids[37])
+    assert repo.merge_base(ids[12], ids[77]) == ids[12]
+    other_head = repo.get_circuit_history(other.id)[0].id
+    assert not repo.is_ancestor(ids[0], other_head)
+    assert repo.merge_base(ids[2], other_head) is None
+
+def test_history_endpoint_paginates():
+    app.dependency_overrides[get_current_active_user] = lambda: User(username="alice")
+    try:
+        circuit = build_history(app_repo, 7)
+        client = TestClient(app)
+        response = client.get(f"/circuits/{circuit.id}/history", params={"limit": 5})
+        assert response.status_code == 200
+        assert len(response.json()) == 5
+        cursor = response.headers["X-Next-Cursor"]
+        response = client.get(f"/circuits/{circuit.id}/history", params={"limit": 5, "cursor": cursor})
+        assert [commit["message"] for commit in response.json()] == ["Step 1", "Step 0"]
+        assert "X-Next-Cursor" not in response.headers
+        assert client.get("/circuits/missing/history").status_code == 404
+        assert client.get(f"/circuits/{circuit.id}/history", params={"branch": "missing"}).status_code == 404
+        assert client.get(f"/circuits/{circuit.id}/history", params={"cursor": "bogus"}).status_code == 400
+        app_repo.create_branch(f"history-{circuit.id}", "main", "alice")
+        app_repo.commit_changes(circuit.id, QASM, "Reset", "alice", f"history-{circuit.id}")
+        response = client.get(f"/circuits/{circuit.id}/history", params={"branch": f"history-{circuit.id}", "limit": 2})
+        assert [commit["message"] for commit in response.json()] == ["Reset", "Step 6"]
+        response = client.get(f"/circuits/{circuit.id}/history", params={"limit": 1})
+        assert [commit["message"] for commit in response.json()] == ["Step 6"]
+    finally:
+        app.dependency_overrides.clear()
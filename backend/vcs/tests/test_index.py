@@ -0,0 +1,115 @@
+import base64
+import json
+import pytest
+from fastapi.testclient import TestClient
+from ..auth import User
+from ..index import count_qubits
+from ..main import app, get_current_active_user, repo as app_repo
+from ..repository import QuantumRepository
+
+def qasm(qubits: int) -> str:
+    return f"OPENQASM 2.0;\ninclude \"qelib1.inc\";\nqreg q[{qubits}];\nh q[0];\n"
+
+def populate(repo: QuantumRepository):
+    circuits = {}
+    for name, author, qubits in [
+        ("Bell", "alice", 2), ("bernstein", "bob", 5), ("GHZ", "alice", 3),
+        ("grover", "bob", 4), ("teleport", "alice", 3)
+    ]:
+        circuits[name] = repo.create_circuit(name, qasm(qubits), author)
+    return circuits
+
+def names(circuits):
+    return [circuit.name for circuit in circuits]
+
+def test_count_qubits():
+    assert count_qubits(qasm(5)) == 5
+    assert count_qubits("qreg a[2];\nqreg b[3];\n// qreg c[9];\n") == 5
+    assert count_qubits("OPENQASM 3;\nqubit[4] q;\nqubit anc;\n") == 5
+    assert count_qubits("") == 0
+
+def test_filters_and_sorting():
+    repo = QuantumRepository()
+    populate(repo)
+    page, _ = repo.query_circuits(author="alice", sort="name", descending=False)
+    assert names(page) == ["Bell", "GHZ", "teleport"]
+    page, _ = repo.query_circuits(name_prefix="b", sort="name", descending=False)
+    assert names(page) == ["Bell", "bernstein"]
+    page, _ = repo.query_circuits(min_qubits=3, max_qubits=4, author="bob")
+    assert names(page) == ["grover"]
+    page, _ = repo.query_circuits(sort="qubits")
+    assert names(page)[:2] == ["bernstein", "grover"]
+    assert repo.query_circuits(author="carol") == ([], None)
+    with pytest.raises(ValueError, match="Cannot sort"):
+        repo.query_circuits(sort="author")
+
+def test_pages_and_cursor():
+    repo = QuantumRepository()
+    populate(repo)
+    seen, cursor = [], None
+    while True:
+        page, cursor = repo.query_circuits(limit=2, cursor=cursor, sort="name", descending=False)
+        seen += names(page)
+        if cursor is None:
+            break
+    assert seen == ["Bell", "bernstein", "GHZ", "grover", "teleport"]
+    page, cursor = repo.query_circuits(limit=1, author="alice", sort="name")
+    assert names(page) == ["teleport"]
+    page, _ = repo.query_circuits(limit=5, cursor=cursor, author="alice", sort="name")
+    assert names(page) == ["GHZ", "Bell"]
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        repo.query_circuits(cursor=cursor, sort="updated_at")
+
+def test_commits_update_indexes():
+    repo = QuantumRepository()
+    circuits = populate(repo)
+    repo.create_branch("feature", "main", "alice")
+    repo.commit_changes(circuits["Bell"].id, qasm(7), "Grow", "alice")
+    repo.commit_changes(circuits["grover"].id, qasm(6), "On feature", "bob", "feature")
+    page, _ = repo.query_circuits(min_qubits=6)
+    assert names(page) == ["Bell"]
+    page, _ = repo.query_circuits(limit=1)
+    assert names(page) == ["Bell"]
+    page, _ = repo.query_circuits(updated_after=circuits["Bell"].updated_at)
+    assert names(page) == ["Bell"]
+    page, _ = repo.query_circuits(branch="feature")
+    assert names(page) == ["grover"]
+
+def test_indexes_survive_reopening(tmp_path):
+    repo = QuantumRepository(str(tmp_path))
+    circuits = populate(repo)
+    repo.commit_changes(circuits["GHZ"].id, qasm(8), "Grow", "alice")
+    repo.close()
+
+    reopened = QuantumRepository(str(tmp_path))
+    page, _ = reopened.query_circuits(min_qubits=8)
+    assert names(page) == ["GHZ"]
+    assert len(reopened.index) == 5
+    reopened.close()
+
+def test_list_endpoint():
+    app.dependency_overrides[get_current_active_user] = lambda: User(username="alice")
+    try:
+        client = TestClient(app)
+        for name in ("indexed-a", "indexed-b", "indexed-c"):
+            app_repo.create_circuit(name, qasm(2), "indexer")
+        response = client.get("/circuits/", params={"author": "indexer", "sort": "name", "order": "asc", "limit": 2})
+        assert response.status_code == 200
+        assert [circuit["name"] for circuit in response.json()] == ["indexed-a", "indexed-b"]
+        response = client.get("/circuits/", params={
+            "author": "indexer", "sort": "name", "order": "asc", "cursor": response.headers["X-Next-Cursor"]
+        })
+        assert [circuit["name"] for circuit in response.json()] == ["indexed-c"]
+        assert "X-Next-Cursor" not in response.headers
+        assert client.get("/circuits/", params={"cursor": "bogus"}).status_code == 400
+        mismatched = base64.urlsafe_b64encode(json.dumps(["updated_at", 5, "x"]).encode()).decode()
+        assert client.get("/circuits/", params={"cursor": mismatched}).status_code == 400
+        mismatched = base64.urlsafe_b64encode(json.dumps(["qubits", "many", "x"]).encode()).decode()
+        assert client.get("/circuits/", params={"cursor": mismatched, "sort": "qubits"}).status_code == 400
+        response = client.get("/circuits/", params={"author": "indexer", "updated_after": "2020-01-01T00:00:00Z"})
+        assert response.status_code == 200 and len(response.json()) == 3
+        response = client.get("/circuits/", params={"author": "indexer", "updated_before": "2020-01-01T00:00:00+02:00"})
+        assert response.json() == []
+        assert client.get("/circuits/", params={"sort": "author"}).status_code == 422
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,140 @@
+from fastapi.testclient import TestClient
+from ..auth import User
+from ..main import app, get_current_active_user, repo as app_repo
+from ..merge import parse_operands, three_way_merge
+from ..repository import QuantumRepository
+
+HEADER = "OPENQASM 2.0;\ninclude \"qelib1.inc\";\nqreg q[3];\n"
+BASE = HEADER + "h q[0];\ncx q[0],q[1];\nx q[2];\n"
+
+def lines(text: str):
+    return text.splitlines(keepends=True)
+
+def test_parse_operands():
+    assert parse_operands("cx q[0], q[1];") == {("q", 0), ("q", 1)}
+    assert parse_operands("measure q[2] -> c[2];") == {("q", 2), ("c", 2)}
+    assert parse_operands("rz(pi/2) q;") == {("q", None)}
+    assert parse_operands("// comment") == frozenset()
+    assert parse_operands("qreg q[3];") is None
+
+def test_changes_on_different_qubits_merge_cleanly():
+    ours = BASE.replace("h q[0];\n", "h q[0];\nt q[0];\n")
+    theirs = BASE.replace("h q[0];\n", "h q[0];\ny q[2];\n")
+    merged, conflicts = three_way_merge(lines(BASE), lines(ours), lines(theirs))
+    assert conflicts == []
+    assert "".join(merged) == BASE.replace("h q[0];\n", "h q[0];\nt q[0];\ny q[2];\n")
+
+def test_changes_on_one_qubit_conflict():
+    ours = BASE.replace("cx q[0],q[1];", "cz q[0],q[1];")
+    theirs = BASE.replace("cx q[0],q[1];", "cx q[1],q[0];")
+    merged, conflicts = three_way_merge(lines(BASE), lines(ours), lines(theirs))
+    assert merged == lines(ours)
+    assert [(conflict.qubit, conflict.step) for conflict in conflicts] == [("q[0]", 1), ("q[1]", 0)]
+    assert conflicts[0].line == 4
+    assert conflicts[0].theirs == ["cx q[1],q[0];\n"]
+
+def test_identical_and_declaration_changes():
+    ours = BASE.replace("x q[2];", "z q[2];")
+    merged, conflicts = three_way_merge(lines(BASE), lines(ours), lines(ours))
+    assert (merged, conflicts) == (lines(ours), [])
+    grown = BASE.replace("qreg q[3];", "qreg q[4];")
+    merged, conflicts = three_way_merge(lines(BASE), lines(grown), lines(BASE.replace("qreg q[3];", "qreg q[5];")))
+    assert [conflict.qubit for conflict in conflicts] == [None]
+
+def test_branch_heads_and_fast_forward():
+    repo = QuantumRepository()
+    circuit = repo.create_circuit("bell", BASE, "alice")
+    repo.create_branch("feature", "main", "alice")
+    first = repo.commit_changes(circuit.id, BASE + "t q[1];\n", "On feature", "alice", branch="feature")
+    assert first.branch == "feature"
+    assert repo.circuits[circuit.id].content == BASE
+    assert repo.get_branch_content(circuit.id, "feature") == BASE + "t q[1];\n"
+    assert repo.branches["feature"].last_commit == first.id
+
+    result = repo.merge(circuit.id, "feature", "main", "alice")
+    assert (result.status, result.head) == ("fast_forward", first.id)
+    assert repo.circuits[circuit.id].content == BASE + "t q[1];\n"
+    assert repo.merge(circuit.id, "feature", "main", "alice").status == "up_to_date"
+
+def test_merge_commit_and_ancestry():
+    repo = QuantumRepository(snapshot_interval=2)
+    circuit = repo.create_circuit("bell", BASE, "alice")
+    root = repo.commit_changes(circuit.id, BASE + "s q[0];\n", "Root", "alice")
+    repo.create_branch("feature", "main", "alice")
+    ours = repo.commit_changes(circuit.id, BASE + "s q[0];\nt q[0];\n", "Ours", "alice")
+    theirs = repo.commit_changes(circuit.id, BASE.replace("x q[2];", "y q[2];") + "s q[0];\n", "Theirs", "alice", "feature")
+    assert repo.merge_base(ours.id, theirs.id) == root.id
+
+    result = repo.merge(circuit.id, "feature", "main", "alice")
+    assert result.status == "merged"
+    merge = result.commit
+    assert (merge.parent_commit, merge.merge_parent, merge.generation) == (ours.id, theirs.id, 3)
+    expected = BASE.replace("x q[2];", "y q[2];") + "s q[0];\nt q[0];\n"
+    assert repo.circuits[circuit.id].content == expected
+    assert repo.get_version(merge.id) == expected
+    assert repo.is_ancestor(theirs.id, merge.id) and repo.is_ancestor(root.id, merge.id)
+    assert not repo.is_ancestor(merge.id, theirs.id)
+
+    later = repo.commit_changes(circuit.id, expected + "h q[1];\n", "Later", "alice", "feature")
+    assert repo.merge_base(merge.id, later.id) == theirs.id
+    assert not repo.is_ancestor(later.id, merge.id)
+
+def test_conflicting_merge_leaves_target_unchanged():
+    repo = QuantumRepository()
+    circuit = repo.create_circuit("bell", BASE, "alice")
+    repo.create_branch("feature", "main", "alice")
+    ours = repo.commit_changes(circuit.id, BASE.replace("h q[0];", "x q[0];"), "Ours", "alice")
+    repo.commit_changes(circuit.id, BASE.replace("h q[0];", "y q[0];"), "Theirs", "alice", "feature")
+    result = repo.merge(circuit.id, "feature", "main", "alice")
+    assert (result.status, result.head, result.commit) == ("conflict", ours.id, None)
+    assert result.conflicts[0].qubit == "q[0]"
+    assert repo.circuits[circuit.id].metadata["last_commit"] == ours.id
+
+def test_heads_survive_reopening(tmp_path):
+    repo = QuantumRepository(str(tmp_path))
+    circuit = repo.create_circuit("bell", BASE, "alice")
+    repo.create_branch("feature", "main", "alice")
+    first = repo.commit_changes(circuit.id, BASE + "t q[1];\n", "On feature", "alice", "feature")
+    repo.create_branch("later", "feature", "alice")
+    repo.merge(circuit.id, "feature", "main", "alice")
+    repo.close()
+
+    reopened = QuantumRepository(str(tmp_path))
+    assert reopened.heads["main"][circuit.id] == first.id
+    assert reopened.heads["later"][circuit.id] == first.id
+    assert reopened.branches["feature"].last_commit == first.id
+    assert reopened.circuits[circuit.id].content == BASE + "t q[1];\n"
+    reopened.close()
+
+def test_merge_endpoint_reports_conflicts():
+    app.dependency_overrides[get_current_active_user] = lambda: User(username="alice")
+    try:
+        client = TestClient(app)
+        circuit = app_repo.create_circuit("bell", BASE, "alice")
+        app_repo.create_branch(f"topic-{circuit.id}", "main", "alice")
+        for branch, gate in (("main", "x"), (f"topic-{circuit.id}", "y")):
+            response = client.post(f"/circuits/{circuit.id}/commit", params={
+                "content": BASE.replace("h q[0];", f"{gate} q[0];"), "message": gate, "branch": branch
+            })
+            assert response.status_code == 200
+        response = client.post(
+            f"/circuits/{circuit.id}/merge", params={"source": f"topic-{circuit.id}", "target": "main"}
+        )
+        assert response.status_code == 409
+        assert response.json()["detail"]["conflicts"][0]["qubit"] == "q[0]"
+        response = client.post(f"/circuits/{circuit.id}/merge", params={"source": "missing", "target": "main"})
+        assert response.status_code == 404
+    finally:
+        app.dependency_overrides.clear()
+
+def test_create_branch_endpoint_errors():
+    app.dependency_overrides[get_current_active_user] = lambda: User(username="alice")
+    try:
+        client = TestClient(app)
+        response = client.post("/branches/", params={"name": "main", "base_branch": "main"})
+        assert response.status_code == 409
+        response = client.post("/branches/", params={"name": "orphan", "base_branch": "missing"})
+        assert response.status_code == 404
+        assert "orphan" not in app_repo.heads
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,66 @@
+import os
+import pytest
+from ..repository import QuantumRepository
+from ..storage import ObjectStore, object_id
+
+QASM = "OPENQASM 2.0;\ninclude \"qelib1.inc\";\nqreg q[2];\n"
+
+def test_objects_are_deduplicated(tmp_path):
+    store = ObjectStore(str(tmp_path))
+    first = store.put(b"h q[0];\n" * 100)
+    assert store.put(b"h q[0];\n" * 100) == first == object_id(b"h q[0];\n" * 100)
+    assert len(store) == 1
+    assert store.get(first) == b"h q[0];\n" * 100
+    # Stored compressed
+    assert os.path.getsize(tmp_path / "pack-000000.pack") < 200
+    with pytest.raises(KeyError):
+        store.get(object_id(b"missing"))
+
+def test_reopen_reads_sealed_packs(tmp_path):
+    store = ObjectStore(str(tmp_path), max_pack_size=256)
+    ids = [store.put(f"cx q[{i}],q[{i + 1}];\n".encode() * 20) for i in range(50)]
+    store.close()
+    assert len(list(tmp_path.glob("*.idx"))) > 1
+
+    reopened = ObjectStore(str(tmp_path))
+    assert len(reopened) == 50
+    assert all(reopened.get(oid) == f"cx q[{i}],q[{i + 1}];\n".encode() * 20 for i, oid in enumerate(ids))
+    assert reopened.put(b"new object") in reopened
+
+def test_unsealed_pack_is_recovered(tmp_path):
+    store = ObjectStore(str(tmp_path))
+    kept = store.put(b"kept")
+    store.flush()
+    # Simulate a crash: no index is written and the last record is torn
+    with open(tmp_path / "pack-000000.pack", "ab") as f:
+        f.write(b"\x00" * 10)
+    recovered = ObjectStore(str(tmp_path))
+    assert recovered.get(kept) == b"kept"
+    assert len(recovered) == 1
+
+def test_in_memory_store():
+    store = ObjectStore()
+    oid = store.put(b"data")
+    assert oid in store and store.get(oid) == b"data"
+
+def test_repository_survives_restart(tmp_path):
+    repo = QuantumRepository(str(tmp_path))
+    circuit = repo.create_circuit("bell", QASM, "alice")
+    for gate in ("h q[0];\n", "cx q[0],q[1];\n"):
+        repo.commit_changes(circuit.id, repo.circuits[circuit.id].content + gate, f"Add {gate.strip()}", "alice")
+    repo.create_branch("feature", "main", "alice")
+    repo.close()
+
+    reopened = QuantumRepository(str(tmp_path))
+    assert reopened.circuits[circuit.id].content == QASM + "h q[0];\ncx q[0],q[1];\n"
+    assert "feature" in reopened.branches
+    history = reopened.get_circuit_history(circuit.id)
+    assert [commit.message for commit in history] == ["Add cx q[0],q[1];", "Add h q[0];"]
+    assert reopened.get_version(history[1].id) == QASM + "h q[0];\n"
+
+def test_commits_share_unchanged_content():
+    repo = QuantumRepository()
+    circuit = repo.create_circuit("bell", QASM, "alice")
+    for _ in range(5):
+        repo.commit_changes(circuit.id, QASM, "No-op", "alice")
+    assert len(repo.objects) == 1